@@ -3,11 +3,22 @@
 自动获取和刷新Access Token
 """
 
+import asyncio
 import json
-from datetime import datetime, timedelta
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
 import httpx
 import os
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 try:
     from aliyunsdkcore.client import AcsClient
     from aliyunsdkcore.request import CommonRequest
@@ -15,6 +26,173 @@ except ImportError:
     AcsClient = None
     CommonRequest = None
 
+try:
+    from utils.http_pool import get_http_client
+except ImportError:
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+    from utils.http_pool import get_http_client
+
+
+# 每个AppKey允许的并发合成数（需不超过阿里云账号的并发额度）
+TTS_MAX_CONCURRENCY = int(os.getenv("ALIYUN_TTS_MAX_CONCURRENCY", "4"))
+# 单段合成失败后的重试次数
+TTS_MAX_RETRIES = int(os.getenv("ALIYUN_TTS_MAX_RETRIES", "2"))
+TTS_RETRY_BACKOFF = 0.5  # 首次重试等待秒数，之后翻倍
+
+# 单次合成的最大字符数（阿里云限制）
+TTS_MAX_SEGMENT_LENGTH = 300
+
+# 句末标点（含紧随其后的右引号/右括号和空格）。英文句点后接数字或字母时不是句末（如3.5、e.g.）
+_SENTENCE_END = re.compile(r'(?:[\n。！？!?；;]+|\.(?![0-9A-Za-z]))[”’"』」）)]*[ \t]*')
+# 句内可断开的位置（超长句子强制分割时优先在这些字符之后断开）
+_SOFT_BREAKS = frozenset('，,、：: \t')
+# 不能从中间断开的片段：数字、Markdown加粗/斜体/行内代码/链接、网址、列表序号
+_PROTECTED = re.compile(
+    r'\d+(?:[.,:：/-]\d+)*%?'
+    r'|\*\*[^*\n]+\*\*|__[^_\n]+__|\*[^*\n]+\*'
+    r'|`[^`\n]+`'
+    r'|!?\[[^\]\n]*\]\([^)\s]*\)'
+    r'|https?://[^\s）)]+'
+    r'|^[ \t]*(?:#{1,6}|[-*+]|\d+[.)])[ \t]+',
+    re.MULTILINE
+)
+
+
+def split_text_for_tts(text: str, max_length: int = TTS_MAX_SEGMENT_LENGTH) -> List[str]:
+    """
+    将文本按句子贪心打包成不超过max_length的分段（线性时间）
+
+    先按中英文句末标点切句，再把连续的句子合并到接近上限；单句超长时
+    在上限内最靠后的逗号/空格处断开，且不会从数字或Markdown标记中间断开。
+    只含空白的分段会被丢弃。
+
+    Args:
+        text: 原始文本
+        max_length: 每段最大字符数
+
+    Returns:
+        分段后的文本列表
+    """
+    if len(text) <= max_length:
+        return [text]
+
+    # unsafe[k]为1表示不能在位置k断开（k落在受保护片段内部）
+    unsafe = bytearray(len(text) + 1)
+    for match in _PROTECTED.finditer(text):
+        start, end = match.span()
+        if end - start > 1:
+            unsafe[start + 1:end] = b"\x01" * (end - start - 1)
+
+    # 句子边界（句末标点之后的位置）
+    boundaries = [m.end() for m in _SENTENCE_END.finditer(text) if not unsafe[m.start()]]
+    if not boundaries or boundaries[-1] != len(text):
+        boundaries.append(len(text))
+
+    segments = []
+    segment_start = 0
+    last_boundary = 0
+    for boundary in boundaries:
+        if boundary - segment_start <= max_length:
+            last_boundary = boundary
+            continue
+        if last_boundary > segment_start:
+            segments.append(text[segment_start:last_boundary])
+            segment_start = last_boundary
+        # 单句仍然超长时强制分割
+        while boundary - segment_start > max_length:
+            cut = _find_cut(text, unsafe, segment_start, segment_start + max_length)
+            segments.append(text[segment_start:cut])
+            segment_start = cut
+        last_boundary = boundary
+    if segment_start < len(text):
+        segments.append(text[segment_start:])
+
+    return [segment for segment in segments if segment.strip()]
+
+
+def _find_cut(text: str, unsafe: bytearray, start: int, limit: int) -> int:
+    """在(start, limit]内找断开位置：优先软断点，其次任意安全位置，实在没有则硬切"""
+    floor = start + (limit - start) // 2
+    for k in range(limit, floor, -1):
+        if text[k - 1] in _SOFT_BREAKS and not unsafe[k]:
+            return k
+    for k in range(limit, start, -1):
+        if not unsafe[k]:
+            return k
+    # 受保护片段本身超过上限，只能硬切
+    return limit
+
+
+# 按AppKey共享的并发限制，同一AppKey的所有请求共用
+_appkey_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def _get_appkey_semaphore(appkey: str) -> asyncio.Semaphore:
+    """获取AppKey对应的并发信号量"""
+    if appkey not in _appkey_semaphores:
+        _appkey_semaphores[appkey] = asyncio.Semaphore(TTS_MAX_CONCURRENCY)
+    return _appkey_semaphores[appkey]
+
+
+# Token续期配置
+TOKEN_CACHE_PATH = os.getenv("ALIYUN_TOKEN_CACHE_PATH", os.path.join("cache", "aliyun_tts_token.json"))
+TOKEN_REFRESH_MARGIN = 3600  # 后台任务在过期前1小时续期
+TOKEN_MIN_VALIDITY = 300  # 剩余不足5分钟时请求路径自行刷新（仅在后台续期失败时发生）
+TOKEN_RETRY_INTERVAL = 60  # 后台续期失败后的重试间隔（秒）
+
+
+@contextmanager
+def _token_file_lock(path: str):
+    """跨进程文件锁，保证同一时间只有一个worker调用CreateToken（Windows下退化为无锁）"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_shared_token(path: str, appkey: str) -> Optional[dict]:
+    """读取共享Token文件，文件不存在、损坏或属于其他AppKey时返回None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if data.get("appkey") != appkey or "token" not in data or "expire_time" not in data:
+        return None
+    return data
+
+
+def _write_shared_token(path: str, appkey: str, token: str, expire_time: float):
+    """原子写入共享Token文件（仅所有者可读）"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"appkey": appkey, "token": token, "expire_time": expire_time}, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class TTSRequestError(Exception):
+    """TTS接口返回错误"""
+
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def retryable(self) -> bool:
+        """限流和服务端错误可以重试，参数错误等客户端错误不重试"""
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
 
 class AliyunTTSClient:
     """阿里云TTS客户端"""
@@ -35,6 +213,7 @@ class AliyunTTSClient:
         self.region = region
         self.token = None
         self.expire_time = None
+        self._token_lock = asyncio.Lock()
 
         # TTS服务地址
         self.tts_urls = {
@@ -58,15 +237,73 @@ class AliyunTTSClient:
         """
         获取Access Token
 
+        正常情况下直接返回内存中的Token（由后台任务提前续期）；
+        只有Token即将过期且后台续期未完成时才会在此刷新，
+        刷新在线程中执行，不阻塞事件循环，同一时间只有一个刷新。
+
         Returns:
             Token字符串
         """
-        # 检查Token是否仍然有效（提前1小时刷新）
-        if self.token and self.expire_time:
-            if datetime.now() + timedelta(hours=1) < self.expire_time:
-                print(f"[TTS] 使用缓存的Token，过期时间: {self.expire_time}")
-                return self.token
+        if self._token_usable(TOKEN_MIN_VALIDITY):
+            return self.token
+
+        async with self._token_lock:
+            # 等锁期间可能已被其他请求刷新
+            if not self._token_usable(TOKEN_MIN_VALIDITY):
+                await asyncio.to_thread(self._load_or_create_token, TOKEN_MIN_VALIDITY)
+        return self.token
+
+    async def refresh_token_if_needed(self):
+        """Token剩余有效期少于TOKEN_REFRESH_MARGIN时续期（供后台任务调用）"""
+        if self._token_usable(TOKEN_REFRESH_MARGIN):
+            return
+        async with self._token_lock:
+            if not self._token_usable(TOKEN_REFRESH_MARGIN):
+                await asyncio.to_thread(self._load_or_create_token, TOKEN_REFRESH_MARGIN)
+
+    async def run_token_refresher(self):
+        """后台任务：在Token过期前提前续期，保证用户请求无需等待获取Token"""
+        while True:
+            try:
+                await self.refresh_token_if_needed()
+                # 在进入续期窗口时醒来
+                delay = self.expire_time.timestamp() - TOKEN_REFRESH_MARGIN - time.time()
+            except Exception as e:
+                print(f"[TTS] 后台续期Token失败: {e}")
+                delay = TOKEN_RETRY_INTERVAL
+            await asyncio.sleep(max(delay, TOKEN_RETRY_INTERVAL))
+
+    def _token_usable(self, min_validity: float) -> bool:
+        return bool(self.token and self.expire_time
+                    and self.expire_time.timestamp() - time.time() > min_validity)
+
+    def _load_or_create_token(self, min_validity: float):
+        """
+        从跨进程共享文件读取Token，不够新时再调用CreateToken（在线程中执行）
 
+        持有文件锁期间完成"读取-判断-获取-写入"，多个worker进程同时续期时
+        只有第一个会真正调用CreateToken，其余读取它写入的结果。
+        """
+        with _token_file_lock(TOKEN_CACHE_PATH + ".lock"):
+            shared = _read_shared_token(TOKEN_CACHE_PATH, self.appkey)
+            if shared and shared['expire_time'] - time.time() > min_validity:
+                self.token = shared['token']
+                self.expire_time = datetime.fromtimestamp(shared['expire_time'])
+                print(f"[TTS] 使用共享的Token，过期时间: {self.expire_time}")
+                return
+
+            token, expire_time = self._create_token()
+            _write_shared_token(TOKEN_CACHE_PATH, self.appkey, token, expire_time)
+            self.token = token
+            self.expire_time = datetime.fromtimestamp(expire_time)
+
+    def _create_token(self):
+        """
+        调用CreateToken获取新Token（同步阻塞调用）
+
+        Returns:
+            (Token字符串, 过期时间戳)
+        """
         print(f"[TTS] 获取新的Access Token...")
 
         if self.acs_client:
@@ -82,10 +319,9 @@ class AliyunTTSClient:
                 data = json.loads(response)
 
                 if 'Token' in data and 'Id' in data['Token']:
-                    self.token = data['Token']['Id']
-                    self.expire_time = datetime.fromtimestamp(data['Token']['ExpireTime'])
-                    print(f"[TTS] Token获取成功，过期时间: {self.expire_time}")
-                    return self.token
+                    expire_time = data['Token']['ExpireTime']
+                    print(f"[TTS] Token获取成功，过期时间: {datetime.fromtimestamp(expire_time)}")
+                    return data['Token']['Id'], expire_time
                 else:
                     raise Exception(f"获取Token失败: {data}")
             except Exception as e:
@@ -93,7 +329,7 @@ class AliyunTTSClient:
         else:
             raise Exception("未安装aliyun-python-sdk-core，请先安装: pip install aliyun-python-sdk-core==2.15.1")
     
-    def _split_text_for_tts(self, text: str, max_length: int = 300) -> list:
+    def _split_text_for_tts(self, text: str, max_length: int = TTS_MAX_SEGMENT_LENGTH) -> list:
         """
         将长文本分段，每段不超过最大长度
 
@@ -104,43 +340,9 @@ class AliyunTTSClient:
         Returns:
             分段后的文本列表
         """
-        if len(text) <= max_length:
-            return [text]
-
-        segments = []
-        current_segment = ""
-
-        # 按段落分割（换行符、句号等）
-        sentences = []
-        for char in text:
-            current_segment += char
-            if char in ['\n', '。', '！', '？', '.', '!', '?']:
-                sentences.append(current_segment)
-                current_segment = ""
-
-        if current_segment:
-            sentences.append(current_segment)
-
-        # 将句子合并成不超长的段落
-        result = []
-        current = ""
-        for sentence in sentences:
-            if len(current + sentence) <= max_length:
-                current += sentence
-            else:
-                if current:
-                    result.append(current)
-                # 如果单个句子太长，强制分割
-                if len(sentence) > max_length:
-                    for i in range(0, len(sentence), max_length):
-                        result.append(sentence[i:i + max_length])
-                else:
-                    current = sentence
-
-        if current:
-            result.append(current)
-
-        print(f"[TTS] 文本分段：原长度={len(text)}, 分成{len(result)}段")
+        result = split_text_for_tts(text, max_length)
+        if len(result) > 1:
+            print(f"[TTS] 文本分段：原长度={len(text)}, 分成{len(result)}段")
         return result
 
     async def text_to_speech(
@@ -176,21 +378,110 @@ class AliyunTTSClient:
         # 分割长文本
         text_segments = self._split_text_for_tts(text)
 
-        # 如果只有一段，直接合成
+        # 如果只有一段，直接合成（同样受AppKey并发限制）
         if len(text_segments) == 1:
-            return await self._synthesize_single(text_segments[0], token, format, sample_rate,
-                                                    voice, volume, speech_rate, pitch_rate)
+            async with _get_appkey_semaphore(self.appkey):
+                return await self._synthesize_with_retry(text_segments[0], token, format, sample_rate,
+                                                         voice, volume, speech_rate, pitch_rate)
+
+        # 多段并发合成，按原顺序拼接音频
+        tasks = self._start_segment_tasks(text_segments, token, format, sample_rate,
+                                          voice, volume, speech_rate, pitch_rate)
+        try:
+            audio_parts = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        audio_data = b"".join(audio_parts)
+        print(f"[TTS] 总共合成 {len(text_segments)} 段，总大小: {len(audio_data)} bytes")
+        return audio_data
+
+    async def stream_text_to_speech(
+        self,
+        text: str,
+        format: str = "mp3",
+        sample_rate: int = 16000,
+        voice: str = "chuangirl",
+        volume: int = 80,
+        speech_rate: int = 0,
+        pitch_rate: int = 0
+    ) -> AsyncIterator[bytes]:
+        """
+        流式文本转语音：各段并发合成，按原顺序逐段产出音频
 
-        # 多段合成，需要拼接音频
-        all_audio_data = bytearray()
-        for i, segment in enumerate(text_segments):
-            print(f"[TTS] 合成第 {i+1}/{len(text_segments)} 段，长度={len(segment)}")
-            audio_data = await self._synthesize_single(segment, token, format, sample_rate,
-                                                        voice, volume, speech_rate, pitch_rate)
-            all_audio_data.extend(audio_data)
+        第一段合成完成即可产出，无需等待全部分段。调用方提前停止迭代时，
+        尚未完成的分段任务会被取消。
 
-        print(f"[TTS] 总共合成 {len(text_segments)} 段，总大小: {len(all_audio_data)} bytes")
-        return bytes(all_audio_data)
+        Args:
+            同text_to_speech
+
+        Yields:
+            每段的音频数据（bytes）
+        """
+        print(f"[TTS] stream_text_to_speech调用参数: text长度={len(text)}, voice={voice}, format={format}")
+
+        token = await self.get_token()
+        text_segments = self._split_text_for_tts(text)
+        tasks = self._start_segment_tasks(text_segments, token, format, sample_rate,
+                                          voice, volume, speech_rate, pitch_rate)
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _start_segment_tasks(
+        self,
+        segments: List[str],
+        token: str,
+        format: str,
+        sample_rate: int,
+        voice: str,
+        volume: int,
+        speech_rate: int,
+        pitch_rate: int
+    ) -> List[asyncio.Task]:
+        """
+        为每段文本创建合成任务，并发数受AppKey信号量限制
+
+        Returns:
+            与segments顺序一致的任务列表
+        """
+        semaphore = _get_appkey_semaphore(self.appkey)
+
+        async def synthesize(index: int, segment: str) -> bytes:
+            async with semaphore:
+                print(f"[TTS] 合成第 {index + 1}/{len(segments)} 段，长度={len(segment)}")
+                return await self._synthesize_with_retry(segment, token, format, sample_rate,
+                                                         voice, volume, speech_rate, pitch_rate)
+
+        return [asyncio.create_task(synthesize(i, segment)) for i, segment in enumerate(segments)]
+
+    async def _synthesize_with_retry(self, text: str, token: str, *args) -> bytes:
+        """
+        合成单段文本，限流、服务端错误和网络错误时按指数退避重试
+
+        Args:
+            text: 待合成文本
+            token: 访问令牌
+            args: 其余参数同_synthesize_single
+
+        Returns:
+            音频数据（bytes）
+        """
+        for attempt in range(TTS_MAX_RETRIES + 1):
+            try:
+                return await self._synthesize_single(text, token, *args)
+            except (TTSRequestError, httpx.TransportError) as e:
+                retryable = not isinstance(e, TTSRequestError) or e.retryable
+                if not retryable or attempt == TTS_MAX_RETRIES:
+                    raise
+                delay = TTS_RETRY_BACKOFF * (2 ** attempt)
+                print(f"[TTS] 分段合成失败，{delay}秒后重试（第{attempt + 1}次）: {e}")
+                await asyncio.sleep(delay)
 
     async def _synthesize_single(
         self,
@@ -229,19 +520,21 @@ class AliyunTTSClient:
             "pitch_rate": pitch_rate
         }
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                tts_url,
-                json=payload,
-                headers={"Content-Type": "application/json"}
-            )
-
-            if response.status_code != 200:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
-                print(f"[TTS] 错误响应: {error_data}")
-                raise Exception(f"TTS调用失败: {error_data}")
-
-            return response.content
+        # 复用应用级连接池，避免每段重新建立TCP/TLS连接
+        client = get_http_client("tts")
+        response = await client.post(
+            tts_url,
+            json=payload,
+            headers={"Content-Type": "application/json"},
+            timeout=60.0
+        )
+
+        if response.status_code != 200:
+            error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
+            print(f"[TTS] 错误响应: {error_data}")
+            raise TTSRequestError(f"TTS调用失败: {error_data}", response.status_code)
+
+        return response.content
 
 
 # 全局客户端实例
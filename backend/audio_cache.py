@@ -0,0 +1,147 @@
+"""
+TTS音频缓存模块
+按(文本, 语音, 格式, 采样率, 音量, 语速, 语调)的哈希命名音频文件，
+相同内容只合成一次；文件登记到媒体登记表，由统一的清理任务按配额淘汰
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Optional
+
+try:
+    from backend.media_registry import MediaRegistry
+except ImportError:
+    from media_registry import MediaRegistry
+
+
+class AudioCache:
+    """内容寻址的TTS音频文件缓存"""
+
+    KIND = "audio"
+
+    def __init__(self, root: str, url_prefix: str, registry: MediaRegistry):
+        """
+        初始化音频缓存
+
+        Args:
+            root: 缓存根目录（位于静态文件目录下）
+            url_prefix: 根目录对应的URL前缀
+            registry: 媒体登记表（负责"audio"类型的配额淘汰）
+        """
+        self.root = root
+        self.url_prefix = url_prefix.rstrip("/")
+        self.registry = registry
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def key_for(text: str, voice: str, format: str, sample_rate: int,
+                volume: int, speech_rate: int, pitch_rate: int) -> str:
+        """
+        计算音频内容的哈希键
+
+        Returns:
+            十六进制SHA-256摘要
+        """
+        params = {
+            "text": text,
+            "voice": voice,
+            "format": format,
+            "sample_rate": sample_rate,
+            "volume": volume,
+            "speech_rate": speech_rate,
+            "pitch_rate": pitch_rate
+        }
+        canonical = json.dumps(params, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _relative_path(self, key: str, format: str) -> str:
+        # 两级分片目录，避免单个目录下文件过多
+        return f"{key[:2]}/{key[2:4]}/{key}.{format}"
+
+    def path_for(self, key: str, format: str) -> str:
+        """返回缓存文件的磁盘路径"""
+        return os.path.join(self.root, self._relative_path(key, format))
+
+    def url_for(self, key: str, format: str) -> str:
+        """返回缓存文件的访问URL"""
+        return f"{self.url_prefix}/{self._relative_path(key, format)}"
+
+    def lookup(self, key: str, format: str) -> Optional[str]:
+        """
+        查找已缓存的音频
+
+        Returns:
+            音频URL，未缓存时返回None
+        """
+        path = self.path_for(key, format)
+        if not os.path.exists(path):
+            return None
+        # 记录最近访问时间；未登记的文件（如登记库被删除）补登记
+        if not self.registry.touch(path):
+            self.registry.register(path, self.KIND)
+        return self.url_for(key, format)
+
+    def store(self, key: str, format: str, data: bytes) -> str:
+        """
+        写入音频数据（先写临时文件再原子替换）
+
+        Returns:
+            音频URL
+        """
+        writer = self.writer(key, format)
+        try:
+            writer.write(data)
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.commit()
+
+    def writer(self, key: str, format: str) -> "AudioCacheWriter":
+        """
+        创建分块写入器，用于边合成边写入缓存
+
+        Returns:
+            AudioCacheWriter实例，写完后调用commit()，失败时调用abort()
+        """
+        return AudioCacheWriter(self, key, format)
+
+
+class AudioCacheWriter:
+    """分块写入缓存文件；commit()前文件对外不可见"""
+
+    def __init__(self, cache: AudioCache, key: str, format: str):
+        self.cache = cache
+        self.key = key
+        self.format = format
+        self.path = cache.path_for(key, format)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, data: bytes):
+        """追加一块音频数据"""
+        self._file.write(data)
+
+    def commit(self) -> str:
+        """
+        完成写入并原子替换为正式缓存文件
+
+        Returns:
+            音频URL
+        """
+        try:
+            self._file.close()
+            os.replace(self.tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+        self.cache.registry.register(self.path, AudioCache.KIND)
+        return self.cache.url_for(self.key, self.format)
+
+    def abort(self):
+        """放弃写入并删除临时文件"""
+        self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.unlink(self.tmp_path)
@@ -1,20 +1,22 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from fastapi.responses import StreamingResponse, RedirectResponse, FileResponse, Response
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, AsyncIterator
 import uvicorn
 import os
 import tempfile
-import uuid
 import sys
 import shutil
-import httpx
-from PIL import Image
 from dotenv import load_dotenv
 import asyncio
-import time
-from pathlib import Path
+import functools
+import json
+import mimetypes
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
 
 # Load environment variables from .env file
 load_dotenv()
@@ -22,20 +24,61 @@ load_dotenv()
 # Add src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
 
-from core.travel_functions import generate_destination_recommendation, generate_itinerary_plan, generate_checklist as create_checklist
-from core.video_editor import create_ai_video
-from api.openai_client import OpenAIClient
+from core.travel_functions import generate_destination_recommendation_async, generate_itinerary_plan_async, generate_checklist_async
+from core.travel_functions import stream_destination_recommendation, stream_itinerary_plan, stream_checklist, format_checklist_response
+from core.video_editor import create_ai_video, normalize_image, RENDERERS, RENDER_PROFILES, RENDERER_VERSION
+from core.render_pool import RenderPool, plan_render_capacity
+from core.tour_guide import get_explanation_store
+from data.poi_index import get_poi_index
+from config.config import POI_QUERY_MAX_RADIUS, POI_QUERY_MAX_LIMIT
+from api.openai_client import close_async_client
+from utils.cache import get_response_cache, get_image_description_cache
+from utils.concurrency import SingleFlight
+from utils.http_pool import get_http_client, close_http_clients, http_client_stats
 try:
     from backend.aliyun_tts import get_tts_client
+    from backend.audio_cache import AudioCache
+    from backend.media_registry import MediaRegistry
+    from backend.media_store import MediaStore, classify_static_file, is_public_static_path
+    from backend.video_cache import VideoCache
+    from backend.video_jobs import VideoJob, VideoJobQueue, QueueFullError
 except ImportError:
     from aliyun_tts import get_tts_client
+    from audio_cache import AudioCache
+    from media_registry import MediaRegistry
+    from media_store import MediaStore, classify_static_file, is_public_static_path
+    from video_cache import VideoCache
+    from video_jobs import VideoJob, VideoJobQueue, QueueFullError
+
+# HLS分片（fMP4）的MIME类型，Python标准库未收录
+mimetypes.add_type("video/iso.segment", ".m4s")
 
 app = FastAPI(title="银发族智能旅行助手 API", version="1.0.0")
 
-# 音频文件清理配置
-AUDIO_CLEANUP_INTERVAL = 3600  # 每小时检查一次
-AUDIO_FILE_TTL = 600  # 音频文件10分钟后过期（单位：秒）
+# 生成媒体文件清理配置
+MEDIA_SWEEP_INTERVAL = 3600  # 每小时清理一次
+MEDIA_REGISTRY_PATH = os.getenv("MEDIA_REGISTRY_PATH", os.path.join("cache", "media.sqlite3"))
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("TTS_AUDIO_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))  # 音频缓存磁盘上限1GB
+VIDEO_MAX_BYTES = int(os.getenv("MEDIA_VIDEO_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))  # 生成视频磁盘上限2GB
+VIDEO_TTL = int(os.getenv("MEDIA_VIDEO_TTL", str(24 * 3600)))  # 生成视频保留24小时
+VIDEO_CACHE_MAX_BYTES = int(os.getenv("VIDEO_CACHE_MAX_BYTES", str(5 * 1024 * 1024 * 1024)))  # 视频缓存磁盘上限5GB
 STATIC_DIR = "static"
+MEDIA_ORPHAN_MAX_AGE = 3600  # 超过1小时未修改的临时文件视为中断遗留
+MEDIA_URL_PREFIX = "/api/media"
+# 设置后由Nginx发送媒体文件（X-Accel-Redirect到该internal前缀），未设置时由后端直接发送
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv("MEDIA_ACCEL_REDIRECT_PREFIX", "")
+
+# 视频生成任务配置
+VIDEO_JOB_MAX_CONCURRENT = int(os.getenv("VIDEO_JOB_MAX_CONCURRENT", "2"))  # 同时渲染的任务数
+VIDEO_JOB_MAX_PENDING = int(os.getenv("VIDEO_JOB_MAX_PENDING", "10"))  # 最多排队的任务数
+VIDEO_JOB_RETRY_AFTER = 30  # 队列满时建议客户端重试的等待秒数
+VIDEO_RENDERER = os.getenv("VIDEO_RENDERER", "numpy")  # 默认渲染方式：numpy / ffmpeg / moviepy
+VIDEO_RENDER_PROFILE = os.getenv("VIDEO_RENDER_PROFILE", "standard")  # 默认渲染档位：draft / standard / high
+VIDEO_PREVIEW_TTL = 3600  # 预览视频保留1小时
+VIDEO_HLS = os.getenv("VIDEO_HLS", "false").lower() == "true"  # 默认是否同时输出HLS分片
+VIDEO_HLS_LOW_RENDITION = os.getenv("VIDEO_HLS_LOW_RENDITION", "true").lower() == "true"  # HLS附加低码率档
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 上传文件分块写入大小
+VIDEO_RENDER_RECYCLE_AFTER = int(os.getenv("VIDEO_RENDER_RECYCLE_AFTER", "10"))  # 每个渲染进程处理多少个任务后替换
 
 # TTS方言配置
 TTS_VOICE_OPTIONS = {
@@ -49,37 +92,54 @@ TTS_VOICE_OPTIONS = {
 DEFAULT_VOICE = os.getenv("ALIYUN_TTS_DEFAULT_VOICE", "xiaoyun")
 
 
-async def cleanup_old_audio_files():
-    """清理过期的音频文件"""
+# 生成媒体登记表：写入时登记大小、类型和过期时间，清理时无需遍历目录
+media_registry = MediaRegistry(MEDIA_REGISTRY_PATH, {
+    "audio": AUDIO_CACHE_MAX_BYTES, "video": VIDEO_MAX_BYTES, "video_cache": VIDEO_CACHE_MAX_BYTES
+})
+
+# 生成媒体存储：渲染直接写入static下的临时文件，完成后原子替换并登记
+media_store = MediaStore(STATIC_DIR, media_registry)
+
+# TTS音频缓存：按内容哈希命名，相同文本和语音参数只合成一次
+audio_cache = AudioCache(os.path.join(STATIC_DIR, "tts"), "/static/tts", media_registry)
+tts_in_flight = SingleFlight()
+
+# 生成视频缓存：相同图片、音频和渲染参数的提交直接返回已渲染的视频
+video_cache = VideoCache(media_store, "videos", f"{MEDIA_URL_PREFIX}/videos")
+token_refresher_task = None
+
+
+async def cleanup_media_files():
+    """删除到期的生成媒体和中断遗留的临时文件，并按配额淘汰最久未访问的文件"""
     try:
-        static_path = Path(STATIC_DIR)
-        if not static_path.exists():
-            return
-
-        current_time = time.time()
-        deleted_count = 0
-
-        for file in static_path.glob("tour_audio_*.mp3"):
-            file_age = current_time - file.stat().st_mtime
-            if file_age > AUDIO_FILE_TTL:
-                try:
-                    file.unlink()
-                    deleted_count += 1
-                    print(f"[Cleanup] 删除过期音频文件: {file.name}")
-                except Exception as e:
-                    print(f"[Cleanup] 删除文件失败 {file.name}: {e}")
-
-        if deleted_count > 0:
-            print(f"[Cleanup] 清理完成，删除了 {deleted_count} 个音频文件")
+        await asyncio.to_thread(media_store.remove_orphans, MEDIA_ORPHAN_MAX_AGE)
+        await asyncio.to_thread(media_registry.sweep)
     except Exception as e:
         print(f"[Cleanup] 清理任务错误: {e}")
 
 
 async def start_cleanup_task():
-    """启动定期清理任务"""
+    """启动定期清理任务；多个worker中只有持有清理锁的一个实际执行"""
     while True:
-        await asyncio.sleep(AUDIO_CLEANUP_INTERVAL)
-        await cleanup_old_audio_files()
+        if media_registry.try_become_sweeper():
+            await asyncio.to_thread(media_registry.adopt_directory, STATIC_DIR,
+                                    functools.partial(classify_static_file, video_ttl=VIDEO_TTL))
+            await cleanup_media_files()
+        await asyncio.sleep(MEDIA_SWEEP_INTERVAL)
+
+
+async def start_token_refresher():
+    """启动TTS Token后台续期任务，用户请求无需等待获取Token"""
+    global token_refresher_task
+    try:
+        tts_client = await get_tts_client()
+    except ValueError as e:
+        print(f"[Startup] 未启动Token续期任务: {e}")
+        return
+    if tts_client.acs_client is None:
+        print("[Startup] 未安装aliyun-python-sdk-core，未启动Token续期任务")
+        return
+    token_refresher_task = asyncio.create_task(tts_client.run_token_refresher())
 
 
 @app.on_event("startup")
@@ -88,8 +148,25 @@ async def startup_event():
     print("[Startup] ========== TTS配置信息 ==========")
     print(f"[Startup] 默认语音: {DEFAULT_VOICE} ({TTS_VOICE_OPTIONS.get(DEFAULT_VOICE, '未知')})")
     print(f"[Startup] 支持的语音: {', '.join([f'{k}({v})' for k, v in TTS_VOICE_OPTIONS.items()])}")
-    print("[Startup] 启动音频文件清理任务...")
+    print("[Startup] 启动媒体文件清理任务...")
     asyncio.create_task(start_cleanup_task())
+    # 预先创建共享连接池，整个应用生命周期内复用
+    get_http_client("tts")
+    get_http_client("dashscope")
+    await start_token_refresher()
+    print(f"[Startup] 视频渲染进程池: {render_pool.workers} 个进程，每个ffmpeg {render_pool.threads} 线程")
+    video_jobs.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时的处理"""
+    if token_refresher_task is not None:
+        token_refresher_task.cancel()
+    await video_jobs.stop()
+    render_pool.shutdown()
+    await close_async_client()
+    await close_http_clients()
 
 # 配置CORS
 app.add_middleware(
@@ -100,9 +177,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 静态文件服务（用于提供生成的视频）
+class PublicStaticFiles(StaticFiles):
+    """static目录的公开部分：生成的视频和写入中的临时文件只能经/api/media访问"""
+
+    async def get_response(self, path: str, scope):
+        if not is_public_static_path(path):
+            raise StarletteHTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+
+# 静态文件服务（用于提供TTS音频；生成的视频经/api/media访问）
 os.makedirs("static", exist_ok=True)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", PublicStaticFiles(directory="static"), name="static")
 
 # 请求模型
 class DestinationRequest(BaseModel):
@@ -129,7 +215,7 @@ class ChecklistRequest(BaseModel):
 @app.post("/api/recommend-destinations")
 async def recommend_destinations(request: DestinationRequest):
     try:
-        result = generate_destination_recommendation(
+        result = await generate_destination_recommendation_async(
             season=request.season,
             health_status=request.health,
             budget=request.budget,
@@ -143,7 +229,7 @@ async def recommend_destinations(request: DestinationRequest):
 @app.post("/api/generate-itinerary")
 async def generate_itinerary(request: ItineraryRequest):
     try:
-        result = generate_itinerary_plan(
+        result = await generate_itinerary_plan_async(
             destination=request.destination,
             duration=request.duration,
             mobility=request.mobility,
@@ -157,7 +243,7 @@ async def generate_itinerary(request: ItineraryRequest):
 @app.post("/api/generate-checklist")
 async def generate_checklist_api(request: ChecklistRequest):
     try:
-        result = create_checklist(
+        result = await generate_checklist_async(
             origin=request.origin,
             destination=request.destination,
             duration=request.duration,
@@ -169,54 +255,275 @@ async def generate_checklist_api(request: ChecklistRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# 流式输出（Server-Sent Events）
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """格式化一条SSE消息"""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """返回SSE响应，并关闭代理缓冲以便逐字推送"""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def stream_text_events(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """将文本块转换为delta事件，结束时发送包含完整结果的done事件"""
+    parts = []
+    async for chunk in chunks:
+        parts.append(chunk)
+        yield sse_event({"delta": chunk})
+    yield sse_event({"result": "".join(parts)}, event="done")
+
+
+@app.post("/api/recommend-destinations/stream")
+async def recommend_destinations_stream(request: DestinationRequest):
+    return sse_response(stream_text_events(stream_destination_recommendation(
+        season=request.season,
+        health_status=request.health,
+        budget=request.budget,
+        interests=request.interests
+    )))
+
+
+@app.post("/api/generate-itinerary/stream")
+async def generate_itinerary_stream(request: ItineraryRequest):
+    return sse_response(stream_text_events(stream_itinerary_plan(
+        destination=request.destination,
+        duration=request.duration,
+        mobility=request.mobility,
+        health_focus=request.health_focus
+    )))
+
+
+@app.post("/api/generate-checklist/stream")
+async def generate_checklist_stream(request: ChecklistRequest):
+    async def events():
+        # 清单需要完整JSON才能排版，先推送原始文本，结束时推送HTML
+        parts = []
+        async for chunk in stream_checklist(
+            origin=request.origin,
+            destination=request.destination,
+            duration=request.duration,
+            departure_date=request.departure_date,
+            special_needs=request.needs,
+            itinerary_text=request.itinerary_content
+        ):
+            parts.append(chunk)
+            yield sse_event({"delta": chunk})
+        result = format_checklist_response("".join(parts), request.departure_date,
+                                           request.origin, request.destination, request.duration)
+        yield sse_event({"result": result}, event="done")
+
+    return sse_response(events())
+
 # 视频制作API
-@app.post("/api/create-video")
-async def create_video(images: List[UploadFile] = File(...), audio: Optional[UploadFile] = File(None)):
+def run_video_job(job: VideoJob) -> dict:
+    """在执行器中运行视频流水线：图片预处理，命中缓存时直接返回；否则AI分析、脚本生成、渲染并存入缓存"""
+    params = job.params
+    job.report("preparing", 0.0)
+    # 每张图片只解码一次：按EXIF方向摆正，直接缩放裁剪为目标尺寸的画面
+    frame_paths = []
+    for i, upload_path in enumerate(params["uploads"]):
+        frame_path = os.path.join(job.work_dir, f"frame_{i}.jpg")
+        normalize_image(upload_path, frame_path, params["target_width"], params["target_height"])
+        os.unlink(upload_path)
+        frame_paths.append(frame_path)
+        job.report("preparing", 0.0)
+
+    # 缓存键基于规范化后的画面，同一张照片无论原始编码、EXIF方向如何都得到相同的键
+    render_params = {
+        "profile": params["profile"],
+        "renderer": params["renderer"],
+        "target_width": params["target_width"],
+        "target_height": params["target_height"]
+    }
+    if params["hls"]:
+        # HLS输出的视频关键帧间隔不同，单独缓存
+        render_params["hls"] = "with_low_rendition" if params["hls_low_rendition"] else "single"
+    cache_key = VideoCache.key_for(frame_paths, params.get("audio"), render_params, RENDERER_VERSION)
+
+    # 预览和完整视频都直接渲染到static下的最终目录，完成后原子替换，无需中转和复制
+    preview_filename = f"travel_video_{job.id}_preview.mp4"
+    preview_writer = media_store.writer(preview_filename, "video", ttl=VIDEO_PREVIEW_TTL)
+
+    def publish_preview(preview_path: str):
+        """预览渲染完成后立即发布，客户端可在完整视频渲染期间先播放"""
+        preview_writer.commit()
+        job.preview = {"video_path": f"{MEDIA_URL_PREFIX}/{preview_filename}"}
+
+    # 相同提交（重试、重复点击）排队等待前一个完成，随后直接命中缓存
     try:
-        # 创建临时目录
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # 保存上传的图片
-            image_paths = []
-            for i, image in enumerate(images):
-                image_path = os.path.join(temp_dir, f"image_{i}.jpg")
-                with open(image_path, "wb") as f:
-                    f.write(await image.read())
-                # 调整图片尺寸，处理RGBA转RGB
-                with Image.open(image_path) as img:
-                    if img.mode == 'RGBA':
-                        img = img.convert('RGB')
-                    img.save(image_path, "JPEG")
-                image_paths.append(image_path)
-            # 保存上传的音频
-            audio_path = None
-            if audio:
-                audio_path = os.path.join(temp_dir, "audio.mp3")
-                with open(audio_path, "wb") as f:
-                    f.write(await audio.read())
-
-            # 使用AI视频生成
-            result = create_ai_video(
-                images=image_paths,
-                audio=audio_path,
-                target_width=720,
-                target_height=1280  # 9:16 竖屏比例
-            )
-
-            # 复制视频到static目录
-            video_id = str(uuid.uuid4())
-            video_filename = f"travel_video_{video_id}.mp4"
-            video_dest = os.path.join("static", video_filename)
-            shutil.copy(result['video_path'], video_dest)
-
-            return {
-                "message": "AI视频生成成功！",
-                "video_path": f"/static/{video_filename}",
-                "script": result.get('script', ''),
-                "image_descriptions": result.get('image_descriptions', [])
-            }
+        with video_cache.lock(cache_key, on_wait=lambda: job.report("preparing", 0.0)):
+            cached = video_cache.lookup(cache_key)
+            if cached is not None:
+                return {"message": "AI视频生成成功！", **cached, "cached": True}
+
+            video_writer = video_cache.writer(cache_key)
+            # HLS播放列表和分片直接写入缓存目录旁的临时目录，与视频一起发布
+            hls_writer = video_cache.hls_writer(cache_key) if params["hls"] else None
+            try:
+                # 使用AI视频生成：先出低分辨率预览，再渲染完整视频
+                result = create_ai_video(
+                    images=frame_paths,
+                    audio=params.get("audio"),
+                    target_width=params["target_width"],
+                    target_height=params["target_height"],
+                    progress_callback=job.report,
+                    render=render_pool.render,
+                    renderer=params["renderer"],
+                    profile=params["profile"],
+                    preview_callback=publish_preview,
+                    output_path=video_writer.tmp_path,
+                    preview_path=preview_writer.tmp_path,
+                    hls_dir=hls_writer.tmp_path if hls_writer is not None else None,
+                    hls_low_rendition=params["hls_low_rendition"]
+                )
+                stored = video_cache.commit(cache_key, video_writer, {
+                    "script": result.get('script', ''),
+                    "image_descriptions": result.get('image_descriptions', [])
+                }, hls_writer=hls_writer)
+            finally:
+                video_writer.abort()
+                if hls_writer is not None:
+                    hls_writer.abort()
+    finally:
+        preview_writer.abort()
+
+    return {"message": "AI视频生成成功！", **stored, "cached": False}
+
+
+# 渲染在独立进程中执行，按CPU核数和并发任务数分配进程数与ffmpeg线程数
+render_pool = RenderPool(*plan_render_capacity(VIDEO_JOB_MAX_CONCURRENT), recycle_after=VIDEO_RENDER_RECYCLE_AFTER)
+
+# 视频生成任务队列：限制同时渲染数，排队满时拒绝新任务
+video_jobs = VideoJobQueue(
+    run_video_job,
+    ThreadPoolExecutor(max_workers=VIDEO_JOB_MAX_CONCURRENT, thread_name_prefix="video-job"),
+    max_concurrent=VIDEO_JOB_MAX_CONCURRENT,
+    max_pending=VIDEO_JOB_MAX_PENDING
+)
+
+
+async def save_upload(upload: UploadFile, path: str):
+    """分块把上传文件写入磁盘，不把整个文件读入内存"""
+    with open(path, "wb") as f:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            f.write(chunk)
+
+
+# AI视频生成API - 提交任务，立即返回任务ID
+@app.post("/api/create-video", status_code=202)
+async def create_video(images: List[UploadFile] = File(...), audio: Optional[UploadFile] = File(None),
+                       renderer: Optional[str] = Form(None), profile: Optional[str] = Form(None),
+                       hls: Optional[bool] = Form(None)):
+    renderer = renderer or VIDEO_RENDERER
+    if renderer not in RENDERERS:
+        raise HTTPException(status_code=400, detail=f"renderer必须是以下之一: {', '.join(RENDERERS)}")
+    profile = profile or VIDEO_RENDER_PROFILE
+    if profile not in RENDER_PROFILES:
+        raise HTTPException(status_code=400, detail=f"profile必须是以下之一: {', '.join(RENDER_PROFILES)}")
+    work_dir = tempfile.mkdtemp(prefix="video_job_")
+    try:
+        # 分块保存上传的图片，解码和缩放在任务中进行
+        upload_paths = []
+        for i, image in enumerate(images):
+            upload_path = os.path.join(work_dir, f"upload_{i}")
+            await save_upload(image, upload_path)
+            upload_paths.append(upload_path)
+        # 保存上传的音频
+        audio_path = None
+        if audio:
+            audio_path = os.path.join(work_dir, "audio.mp3")
+            await save_upload(audio, audio_path)
+
+        job = video_jobs.submit({
+            "uploads": upload_paths,
+            "audio": audio_path,
+            "target_width": RENDER_PROFILES[profile]["width"],
+            "target_height": RENDER_PROFILES[profile]["height"],  # 9:16 竖屏比例
+            "renderer": renderer,
+            "profile": profile,
+            "hls": VIDEO_HLS if hls is None else hls,
+            "hls_low_rendition": VIDEO_HLS_LOW_RENDITION
+        }, work_dir=work_dir)
+    except QueueFullError as e:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(VIDEO_JOB_RETRY_AFTER)})
     except Exception as e:
+        shutil.rmtree(work_dir, ignore_errors=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+    return {**job.to_dict(), "position": video_jobs.position(job), "status_url": f"/api/video-jobs/{job.id}"}
+
+# 视频任务状态与进度API
+@app.get("/api/video-jobs/{job_id}")
+async def get_video_job(job_id: str):
+    job = video_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在或已过期")
+    return {**job.to_dict(), "position": video_jobs.position(job)}
+
+# 取消视频任务API
+@app.delete("/api/video-jobs/{job_id}")
+async def cancel_video_job(job_id: str):
+    job = video_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="任务不存在或已过期")
+    return job.to_dict()
+
+# 视频任务队列统计API
+@app.get("/api/video-jobs")
+async def video_job_stats():
+    return video_jobs.stats()
+
+# 响应缓存统计API
+@app.get("/api/cache/stats")
+async def cache_stats():
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    stats = await asyncio.to_thread(cache.stats)
+    description_cache = get_image_description_cache()
+    if description_cache is not None:
+        stats["image_descriptions"] = await asyncio.to_thread(description_cache.stats)
+    return {"enabled": True, **stats}
+
+# 生成媒体磁盘占用统计API
+@app.get("/api/media/stats")
+async def media_stats():
+    return await asyncio.to_thread(media_registry.stats)
+
+# 生成媒体下载API：只发送已登记的文件，支持Range和ETag
+@app.api_route(MEDIA_URL_PREFIX + "/{relative_path:path}", methods=["GET", "HEAD"])
+async def get_media(relative_path: str, download: bool = False):
+    path = await asyncio.to_thread(media_store.resolve, relative_path)
+    if path is None:
+        raise HTTPException(status_code=404, detail="文件不存在或已过期")
+    # 缓存视频按内容哈希命名，内容不会变化，可长期缓存
+    immutable = relative_path.startswith(video_cache.subdir + "/")
+    headers = {"Cache-Control": "public, max-age=31536000, immutable" if immutable else "public, max-age=3600"}
+    if download:
+        headers["Content-Disposition"] = f"attachment; filename=\"travel_video{os.path.splitext(path)[1]}\""
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if MEDIA_ACCEL_REDIRECT_PREFIX:
+        # 由Nginx发送文件内容（sendfile、Range、ETag），Python不传输视频数据
+        headers["X-Accel-Redirect"] = MEDIA_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + quote(relative_path)
+        return Response(headers=headers, media_type=media_type)
+    return FileResponse(path, headers=headers, media_type=media_type)
+
+# 共享HTTP连接池统计API（按主机统计请求数、连接复用率和当前连接数）
+@app.get("/api/http/stats")
+async def http_stats():
+    return http_client_stats()
+
 # 健康评估API
 @app.get("/api/health-assessment")
 async def health_assessment():
@@ -231,16 +538,29 @@ async def health_assessment():
 
 # 智能导游API - 获取附近POI
 @app.get("/api/tour-guide/pois")
-async def get_nearby_pois(lng: float, lat: float, radius: int = 1000):
+async def get_nearby_pois(lng: float, lat: float, radius: int = 1000, types: Optional[str] = None, limit: int = 50):
     try:
-        # 这里应该调用高德地图API获取POI数据
-        # 暂时使用模拟数据
+        if not (-180 <= lng <= 180 and -90 <= lat <= 90):
+            raise HTTPException(status_code=400, detail="经纬度超出范围")
+        if not (0 < radius <= POI_QUERY_MAX_RADIUS):
+            raise HTTPException(status_code=400, detail=f"radius需在1~{POI_QUERY_MAX_RADIUS}米之间")
+        limit = max(1, min(limit, POI_QUERY_MAX_LIMIT))
+
+        poi_index = get_poi_index()
+        if poi_index is not None:
+            # 本地POI数据集的网格索引，查询在毫秒内完成，无需放到线程中
+            type_list = [t for t in types.split(",") if t] if types else None
+            return {"pois": poi_index.query(lng, lat, radius, types=type_list, limit=limit)}
+
+        # 未构建POI索引时使用示例数据
         pois = [
             {"id": "1", "name": "故宫博物院", "type": "旅游景点", "lng": 116.3970, "lat": 39.9087, "address": "北京市东城区景山前街4号"},
             {"id": "2", "name": "天安门广场", "type": "旅游景点", "lng": 116.4038, "lat": 39.9042, "address": "北京市东城区天安门广场"},
             {"id": "3", "name": "颐和园", "type": "旅游景点", "lng": 116.2750, "lat": 39.9917, "address": "北京市海淀区新建宫门路19号"}
         ]
         return {"pois": pois}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -248,52 +568,61 @@ async def get_nearby_pois(lng: float, lat: float, radius: int = 1000):
 @app.get("/api/tour-guide/explanation")
 async def get_tour_explanation(poi_name: str):
     try:
-        client = OpenAIClient()
-        system_prompt = "你是一个专业的导游，为银发族游客提供详细、生动的景点讲解。讲解内容要通俗易懂，富有感染力，同时考虑老年人的特点，语速适中，重点突出历史文化和景点特色。"
-        user_prompt = f"请为{poi_name}编写一段导游讲解词，适合银发族游客。讲解要详细介绍景点的历史背景、主要特色和参观要点。"
-        explanation = client.generate_response(system_prompt, user_prompt, use_modelscope=True)
-        return {"explanation": explanation}
+        # 优先返回已保存的讲解词，过期的在后台刷新
+        return await get_explanation_store().get_explanation(poi_name)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# 智能导游API - 查看已保存的讲解词
+@app.get("/api/tour-guide/explanations")
+async def list_tour_explanations(limit: int = 100):
+    store = get_explanation_store()
+    # SQLite查询放到线程中执行，避免阻塞事件循环
+    entries = await asyncio.to_thread(store.list_entries, limit=limit)
+    stats = await asyncio.to_thread(store.cache.stats)
+    return {"entries": entries, "stats": stats}
+
+# 智能导游API - 清除已保存的讲解词（不指定poi_name则全部清除）
+@app.delete("/api/tour-guide/explanations")
+async def purge_tour_explanations(poi_name: Optional[str] = None):
+    removed = await asyncio.to_thread(get_explanation_store().purge, poi_name)
+    return {"removed": removed}
+
+def tour_audio_params(voice: str) -> dict:
+    """导游词语音合成参数（同时决定音频缓存键）"""
+    return dict(format="mp3", sample_rate=16000, voice=voice, volume=80, speech_rate=0, pitch_rate=0)
+
 # 智能导游API - 播放导游词（TTS）
 @app.get("/api/tour-guide/play-audio")
 async def play_tour_audio(text: str, voice: str = "xiaoyun"):
     try:
-        print(f"[TTS] 开始生成语音，文本: {text}, 语音: {voice}")
-        # 获取阿里云TTS客户端
-        tts_client = await get_tts_client()
+        tts_params = tour_audio_params(voice)
+        audio_key = AudioCache.key_for(text=text, **tts_params)
 
-        # 调用TTS
-        print(f"[TTS] 调用text_to_speech...")
-        audio_data = await tts_client.text_to_speech(
-            text=text,
-            format="mp3",
-            sample_rate=16000,
-            voice=voice,
-            volume=80,
-            speech_rate=0,
-            pitch_rate=0
-        )
-        print(f"[TTS] 音频数据生成成功，大小: {len(audio_data)} bytes")
+        # 相同文本和参数已合成过时直接返回
+        audio_url = await asyncio.to_thread(audio_cache.lookup, audio_key, "mp3")
+        cached = audio_url is not None
 
-        # 保存音频文件
-        audio_id = str(uuid.uuid4())
-        audio_filename = f"tour_audio_{audio_id}.mp3"
-        audio_path = os.path.join("static", audio_filename)
+        if not cached:
+            print(f"[TTS] 开始生成语音，文本: {text}, 语音: {voice}")
 
-        with open(audio_path, "wb") as f:
-            f.write(audio_data)
+            async def synthesize() -> str:
+                # 获取阿里云TTS客户端
+                tts_client = await get_tts_client()
+                audio_data = await tts_client.text_to_speech(text=text, **tts_params)
+                print(f"[TTS] 音频数据生成成功，大小: {len(audio_data)} bytes")
+                return await asyncio.to_thread(audio_cache.store, audio_key, "mp3", audio_data)
 
-        print(f"[TTS] 音频文件已保存: {audio_filename} (将在 {AUDIO_FILE_TTL} 秒后自动清理)")
+            # 同一内容的并发请求只合成一次
+            audio_url = await tts_in_flight.do(audio_key, synthesize)
 
         return {
             "message": "音频生成成功",
-            "audio_url": f"/static/{audio_filename}",
+            "audio_url": audio_url,
             "format": "mp3",
             "sample_rate": 16000,
             "voice": voice,
-            "ttl": AUDIO_FILE_TTL
+            "cached": cached
         }
     except HTTPException:
         raise
@@ -303,6 +632,48 @@ async def play_tour_audio(text: str, voice: str = "xiaoyun"):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+# 智能导游API - 流式播放导游词（TTS）
+# 第一段合成完成即开始返回音频，同时写入音频缓存；已缓存时重定向到静态文件
+@app.get("/api/tour-guide/audio-stream")
+async def stream_tour_audio(text: str, voice: str = "xiaoyun"):
+    tts_params = tour_audio_params(voice)
+    audio_key = AudioCache.key_for(text=text, **tts_params)
+
+    audio_url = await asyncio.to_thread(audio_cache.lookup, audio_key, "mp3")
+    if audio_url is not None:
+        return RedirectResponse(audio_url)
+
+    try:
+        # 先取得Token，配置或鉴权错误时仍能返回错误状态码
+        tts_client = await get_tts_client()
+        await tts_client.get_token()
+    except Exception as e:
+        print(f"[TTS] 流式合成错误: {type(e).__name__}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def audio_chunks() -> AsyncIterator[bytes]:
+        # 分段合成任务在开始发送响应体时才启动，客户端提前断开时不会留下无人等待的任务
+        segments = tts_client.stream_text_to_speech(text=text, **tts_params)
+        writer = None
+        try:
+            writer = await asyncio.to_thread(audio_cache.writer, audio_key, "mp3")
+            async for segment in segments:
+                await asyncio.to_thread(writer.write, segment)
+                yield segment
+            await asyncio.to_thread(writer.commit)
+            writer = None
+        except BaseException as e:
+            # 客户端断开或合成失败：不留下不完整的缓存文件
+            print(f"[TTS] 流式播放中断: {type(e).__name__}")
+            raise
+        finally:
+            # 取消尚未完成的分段任务
+            await segments.aclose()
+            if writer is not None:
+                writer.abort()
+
+    return StreamingResponse(audio_chunks(), media_type="audio/mpeg")
+
 # 安全提示API
 @app.get("/api/safety-tips")
 async def safety_tips():
@@ -324,25 +695,26 @@ class ImageGenerationRequest(BaseModel):
 async def generate_cartoon_map(request: ImageGenerationRequest):
     try:
         api_key = os.getenv("DASHSCOPE_API_KEY")
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                "https://dashscope.aliyuncs.com/api/v1/services/aigc/multimodal-generation/generation",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
+        client = get_http_client("dashscope")
+        response = await client.post(
+            "https://dashscope.aliyuncs.com/api/v1/services/aigc/multimodal-generation/generation",
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": "qwen-image-edit-plus-2025-10-30",
+                "input": {
+                    "messages": [{
+                        "role": "user",
+                        "content": [{"image": request.image_url}, {"text": request.prompt}]
+                    }]
                 },
-                json={
-                    "model": "qwen-image-edit-plus-2025-10-30",
-                    "input": {
-                        "messages": [{
-                            "role": "user",
-                            "content": [{"image": request.image_url}, {"text": request.prompt}]
-                        }]
-                    },
-                    "parameters": {"n": 1, "negative_prompt": "低质量", "prompt_extend": True, "watermark": False}
-                }
-            )
-            return response.json()
+                "parameters": {"n": 1, "negative_prompt": "低质量", "prompt_extend": True, "watermark": False}
+            },
+            timeout=120.0
+        )
+        return response.json()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
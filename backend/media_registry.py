@@ -0,0 +1,250 @@
+"""
+生成媒体文件登记模块
+写入音频、视频时登记路径、类型、大小和过期时间；清理时按过期时间索引
+删除到期文件，再按各类型的磁盘配额以最近访问时间淘汰，无需遍历static目录。
+多个worker进程共用一个登记库，只有持有清理锁的进程执行定期清理。
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def disk_usage(path: str) -> int:
+    """文件大小，或目录中所有文件的总大小"""
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(directory, name))
+               for directory, _, names in os.walk(path) for name in names)
+
+
+class MediaRegistry:
+    """基于SQLite的媒体文件登记表（WAL模式，多进程共享）"""
+
+    def __init__(self, path: str, quotas: Dict[str, int]):
+        """
+        打开（或创建）登记库
+
+        Args:
+            path: SQLite数据库文件路径
+            quotas: 各类型的磁盘配额（字节），如 {"audio": 1GB, "video": 2GB}
+        """
+        self.path = path
+        self.quotas = quotas
+        self._lock = threading.Lock()
+        self._sweeper_lock_file = None
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS media (
+                path TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                expires_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_media_expires ON media (expires_at) WHERE expires_at IS NOT NULL;
+            CREATE INDEX IF NOT EXISTS idx_media_kind_accessed ON media (kind, accessed_at);
+
+            -- 按类型汇总的占用，由触发器维护，检查配额时无需SUM全表
+            CREATE TABLE IF NOT EXISTS usage (
+                kind TEXT PRIMARY KEY,
+                bytes INTEGER NOT NULL DEFAULT 0,
+                files INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+
+            CREATE TRIGGER IF NOT EXISTS media_after_insert AFTER INSERT ON media BEGIN
+                INSERT INTO usage (kind, bytes, files) VALUES (NEW.kind, NEW.size, 1)
+                ON CONFLICT (kind) DO UPDATE SET bytes = bytes + NEW.size, files = files + 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS media_after_delete AFTER DELETE ON media BEGIN
+                UPDATE usage SET bytes = bytes - OLD.size, files = files - 1 WHERE kind = OLD.kind;
+            END;
+            CREATE TRIGGER IF NOT EXISTS media_after_update AFTER UPDATE OF kind, size ON media BEGIN
+                UPDATE usage SET bytes = bytes - OLD.size, files = files - 1 WHERE kind = OLD.kind;
+                INSERT INTO usage (kind, bytes, files) VALUES (NEW.kind, NEW.size, 1)
+                ON CONFLICT (kind) DO UPDATE SET bytes = bytes + NEW.size, files = files + 1;
+            END;
+        """)
+
+    def register(self, path: str, kind: str, ttl: Optional[float] = None, size: Optional[int] = None):
+        """
+        登记（或更新）一个已写入的文件；目录（如HLS分片）作为一个整体登记和淘汰
+
+        Args:
+            path: 文件或目录路径
+            kind: 类型，对应quotas中的键
+            ttl: 有效期（秒），None表示只受配额淘汰
+            size: 文件大小，默认读取文件（目录为其中文件的总大小）
+        """
+        now = time.time()
+        size = disk_usage(path) if size is None else size
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO media (path, kind, size, created_at, accessed_at, expires_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET kind = excluded.kind, size = excluded.size, "
+                "accessed_at = excluded.accessed_at, expires_at = excluded.expires_at",
+                (os.path.normpath(path), kind, size, now, now, expires_at)
+            )
+
+    def touch(self, path: str) -> bool:
+        """更新最近访问时间。返回文件是否已登记"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE media SET accessed_at = ? WHERE path = ?", (time.time(), os.path.normpath(path))
+            )
+            return cursor.rowcount > 0
+
+    def forget(self, path: str) -> bool:
+        """删除登记（不删除文件）。返回是否存在"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM media WHERE path = ?", (os.path.normpath(path),))
+            return cursor.rowcount > 0
+
+    def sweep(self, batch: int = 500) -> Dict[str, int]:
+        """
+        删除到期文件，再按配额淘汰最久未访问的文件
+
+        每批只读取需要删除的行，耗时与删除数量成正比，与目录大小无关。
+
+        Returns:
+            {"expired": 到期删除数, "evicted": 超配额淘汰数}
+        """
+        counts = {"expired": 0, "evicted": 0}
+        while True:
+            rows = self._query(
+                "SELECT path, size FROM media WHERE expires_at IS NOT NULL AND expires_at <= ? "
+                "ORDER BY expires_at LIMIT ?", (time.time(), batch)
+            )
+            counts["expired"] += self._remove(rows)
+            if len(rows) < batch:
+                break
+
+        for kind, quota in self.quotas.items():
+            while True:
+                excess = self.usage(kind)["bytes"] - quota
+                if excess <= 0:
+                    break
+                victims = []
+                for path, size in self._query(
+                    "SELECT path, size FROM media WHERE kind = ? ORDER BY accessed_at LIMIT ?", (kind, batch)
+                ):
+                    victims.append((path, size))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                if not victims:
+                    break
+                counts["evicted"] += self._remove(victims)
+
+        if counts["expired"] or counts["evicted"]:
+            print(f"[Media] 清理完成：到期删除 {counts['expired']} 个，超配额淘汰 {counts['evicted']} 个")
+        return counts
+
+    def usage(self, kind: str) -> Dict[str, int]:
+        """返回某类型的总字节数和文件数"""
+        rows = self._query("SELECT bytes, files FROM usage WHERE kind = ?", (kind,))
+        bytes_used, files = rows[0] if rows else (0, 0)
+        return {"bytes": bytes_used, "files": files}
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """返回各类型的占用和配额"""
+        kinds = set(self.quotas) | {row[0] for row in self._query("SELECT kind FROM usage", ())}
+        return {kind: {**self.usage(kind), "max_bytes": self.quotas.get(kind)} for kind in sorted(kinds)}
+
+    def adopt_directory(self, root: str, classify) -> int:
+        """
+        一次性登记目录中已有但未登记的文件（升级前生成的文件）
+
+        只在首次运行时遍历一次目录，之后不再扫描。
+
+        Args:
+            root: 目录
+            classify: 函数(相对路径) -> (类型, 有效期) 或 None（不登记）
+
+        Returns:
+            新登记的文件数
+        """
+        if self._query("SELECT value FROM meta WHERE key = ?", (f"adopted:{root}",)):
+            return 0
+
+        adopted = 0
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                result = classify(os.path.relpath(path, root))
+                if result is None:
+                    continue
+                kind, ttl = result
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                with self._lock:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO media (path, kind, size, created_at, accessed_at, expires_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (os.path.normpath(path), kind, stat.st_size, stat.st_mtime, stat.st_mtime,
+                         stat.st_mtime + ttl if ttl is not None else None)
+                    )
+                adopted += cursor.rowcount
+
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (f"adopted:{root}", str(time.time())))
+        print(f"[Media] 已登记 {root} 下的 {adopted} 个历史文件")
+        return adopted
+
+    def try_become_sweeper(self) -> bool:
+        """
+        尝试获取清理锁（非阻塞）；获取后本进程持有直到退出
+
+        进程退出时操作系统自动释放锁，其他worker下次尝试时接替。
+        Windows下没有fcntl，每个进程都执行清理（SQLite事务保证安全）。
+        """
+        if self._sweeper_lock_file is not None or fcntl is None:
+            return True
+        lock_file = open(self.path + ".sweeper.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._sweeper_lock_file = lock_file
+        return True
+
+    def _query(self, sql: str, params: Tuple) -> List[Tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _remove(self, rows: List[Tuple[str, int]]) -> int:
+        for path, _ in rows:
+            try:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.unlink(path)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._conn.executemany("DELETE FROM media WHERE path = ?", [(path,) for path, _ in rows])
+        return len(rows)
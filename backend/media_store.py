@@ -0,0 +1,244 @@
+"""
+生成媒体存储模块
+渲染器直接写入目标目录下的临时文件，完成后原子替换为正式文件并登记，
+不再经由/tmp中转和整文件复制；进程中断留下的临时文件由定期清理删除。
+对外提供按相对路径查找已发布文件的接口，供下载路由交给Nginx发送。
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from typing import Optional
+
+try:
+    from backend.media_registry import MediaRegistry
+except ImportError:
+    from media_registry import MediaRegistry
+
+# 写入中的临时文件（目录）标记：视频临时文件保留扩展名（ffmpeg按扩展名选择封装格式）
+PART_MARKER = ".part"
+TEMP_SUFFIX = ".tmp"
+HLS_DIR_SUFFIX = "_hls"  # HLS输出目录（播放列表和分片）作为整体登记
+
+
+def is_temp_file(name: str) -> bool:
+    """是否为写入中的临时文件或目录（包括音频缓存的.tmp文件）"""
+    return name.endswith((TEMP_SUFFIX, PART_MARKER)) or PART_MARKER + "." in name
+
+
+def is_public_static_path(relative_path: str) -> bool:
+    """
+    static目录下的路径能否由/static直接访问
+
+    写入中的临时文件不可访问；生成的视频（缓存视频、HLS分片和预览）只经/api/media发送，
+    以便校验登记状态并记录访问时间。
+    """
+    parts = os.path.normpath(relative_path).split(os.sep)
+    if any(is_temp_file(part) for part in parts):
+        return False
+    if parts[0] == "videos":
+        return False
+    return not (len(parts) == 1 and parts[0].startswith("travel_video_"))
+
+
+def classify_static_file(relative_path: str, video_ttl: float):
+    """
+    登记升级前已存在的static文件
+
+    Args:
+        relative_path: 相对于static目录的路径
+        video_ttl: 旧版按任务生成的视频的有效期（秒）
+
+    Returns:
+        (类型, 有效期)，不属于生成媒体时返回None
+    """
+    name = os.path.basename(relative_path)
+    if is_temp_file(name):
+        return None
+    if relative_path.startswith("tts" + os.sep):
+        return "audio", None
+    if relative_path.startswith("videos" + os.sep):
+        # HLS目录作为整体登记（命中缓存时补登记），其中的文件不单独登记
+        if HLS_DIR_SUFFIX + os.sep in relative_path:
+            return None
+        return "video_cache", None
+    if name.startswith("travel_video_") and name.endswith(".mp4"):
+        return "video", video_ttl
+    if os.sep not in relative_path and name.startswith("tour_audio_") and name.endswith(".mp3"):
+        # 旧版按请求生成的导游词音频（tour_audio_{uuid}.mp3），已被内容寻址缓存取代，立即到期
+        return "audio", 0
+    return None
+
+
+class MediaStore:
+    """static目录下的生成媒体文件存储"""
+
+    def __init__(self, root: str, registry: MediaRegistry):
+        """
+        初始化媒体存储
+
+        Args:
+            root: 存储根目录（静态文件目录）
+            registry: 媒体登记表
+        """
+        self.root = root
+        self.registry = registry
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, relative_path: str) -> str:
+        """返回相对路径对应的磁盘路径"""
+        return os.path.join(self.root, relative_path)
+
+    def writer(self, relative_path: str, kind: str, ttl: Optional[float] = None) -> "MediaWriter":
+        """
+        在目标目录下创建临时文件，供渲染器直接写入
+
+        Args:
+            relative_path: 正式文件相对于根目录的路径
+            kind: 登记类型
+            ttl: 有效期（秒），None表示只受配额淘汰
+
+        Returns:
+            MediaWriter实例，写完后调用commit()，失败时调用abort()
+        """
+        return MediaWriter(self.path_for(relative_path), self.registry, kind, ttl)
+
+    def dir_writer(self, relative_path: str, kind: str, ttl: Optional[float] = None) -> "MediaDirWriter":
+        """
+        在目标位置旁创建临时目录，供多文件输出（如HLS播放列表和分片）直接写入
+
+        Returns:
+            MediaDirWriter实例，写完后调用commit()，失败时调用abort()
+        """
+        return MediaDirWriter(self.path_for(relative_path), self.registry, kind, ttl)
+
+    def resolve(self, relative_path: str) -> Optional[str]:
+        """
+        查找已发布的媒体文件，并记录最近访问时间
+
+        只返回根目录内、已登记（或位于已登记目录中）且仍存在的文件，
+        写入中的临时文件不会被访问到。
+
+        Returns:
+            磁盘路径，不存在时返回None
+        """
+        path = os.path.normpath(self.path_for(relative_path))
+        real_root = os.path.realpath(self.root)
+        if not os.path.realpath(path).startswith(real_root + os.sep):
+            return None
+        if any(is_temp_file(part) for part in os.path.normpath(relative_path).split(os.sep)):
+            return None
+        if not os.path.isfile(path):
+            return None
+        # 登记表中的路径与写入时一致（基于root），不做realpath；目录中的文件记在目录的访问时间上
+        root = os.path.normpath(self.root)
+        candidate = path
+        while candidate != root and candidate.startswith(root):
+            if self.registry.touch(candidate):
+                return path
+            candidate = os.path.dirname(candidate)
+        return None
+
+    def remove_orphans(self, max_age: float) -> int:
+        """
+        删除超过max_age秒未修改的临时文件（进程中断时遗留）
+
+        Returns:
+            删除的文件数
+        """
+        cutoff = time.time() - max_age
+        removed = 0
+        for directory, subdirs, names in os.walk(self.root):
+            for name in [name for name in subdirs if is_temp_file(name)]:
+                # 临时目录按其中最近修改的文件判断，不再向下遍历
+                path = os.path.join(directory, name)
+                subdirs.remove(name)
+                mtimes = [os.path.getmtime(os.path.join(d, n)) for d, _, ns in os.walk(path) for n in ns]
+                if max(mtimes, default=os.path.getmtime(path)) < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+            for name in names:
+                if not is_temp_file(name):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.unlink(path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+
+class MediaWriter:
+    """目标目录下的临时文件；commit()前文件对外不可见"""
+
+    def __init__(self, path: str, registry: MediaRegistry, kind: str, ttl: Optional[float] = None):
+        self.path = path
+        self.registry = registry
+        self.kind = kind
+        self.ttl = ttl
+        directory, name = os.path.split(path)
+        os.makedirs(directory, exist_ok=True)
+        stem, ext = os.path.splitext(name)
+        fd, self.tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{stem}.", suffix=PART_MARKER + ext)
+        os.close(fd)
+
+    def commit(self) -> str:
+        """
+        原子替换为正式文件并登记
+
+        Returns:
+            正式文件路径
+        """
+        try:
+            # mkstemp创建的文件仅属主可读，Nginx以其他用户读取
+            os.chmod(self.tmp_path, 0o644)
+            os.replace(self.tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+        self.registry.register(self.path, self.kind, ttl=self.ttl)
+        return self.path
+
+    def abort(self):
+        """放弃写入并删除临时文件"""
+        if os.path.exists(self.tmp_path):
+            os.unlink(self.tmp_path)
+
+
+class MediaDirWriter:
+    """目标位置旁的临时目录；commit()时整体原子替换"""
+
+    def __init__(self, path: str, registry: MediaRegistry, kind: str, ttl: Optional[float] = None):
+        self.path = path
+        self.registry = registry
+        self.kind = kind
+        self.ttl = ttl
+        directory, name = os.path.split(path)
+        os.makedirs(directory, exist_ok=True)
+        self.tmp_path = tempfile.mkdtemp(dir=directory, prefix=f"{name}.", suffix=PART_MARKER)
+
+    def commit(self) -> str:
+        """
+        原子替换为正式目录并登记（已存在的同名目录先删除）
+
+        Returns:
+            正式目录路径
+        """
+        try:
+            # mkdtemp创建的目录仅属主可访问，Nginx以其他用户读取
+            os.chmod(self.tmp_path, 0o755)
+            if os.path.isdir(self.path):
+                shutil.rmtree(self.path)
+            os.replace(self.tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+        self.registry.register(self.path, self.kind, ttl=self.ttl)
+        return self.path
+
+    def abort(self):
+        """放弃写入并删除临时目录"""
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
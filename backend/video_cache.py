@@ -0,0 +1,200 @@
+"""
+生成视频缓存模块
+按(规范化后的图片哈希, 音频哈希, 渲染参数, 渲染器版本)的哈希保存最终视频和脚本，
+相同的提交（超时重试、重复点击）直接返回已有视频，跳过图片分析、脚本生成和编码；
+文件登记到媒体登记表，由统一的清理任务按磁盘配额淘汰最久未访问的视频
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from backend.media_store import MediaStore, MediaWriter, MediaDirWriter, HLS_DIR_SUFFIX
+except ImportError:
+    from media_store import MediaStore, MediaWriter, MediaDirWriter, HLS_DIR_SUFFIX
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """分块计算文件的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class VideoCache:
+    """内容寻址的生成视频缓存"""
+
+    KIND = "video_cache"
+    HLS_SUFFIX = HLS_DIR_SUFFIX
+    HLS_PLAYLIST = "master.m3u8"  # 与core.hls.MASTER_PLAYLIST一致
+
+    def __init__(self, store: MediaStore, subdir: str, url_prefix: str):
+        """
+        初始化视频缓存
+
+        Args:
+            store: 媒体存储（其登记表负责"video_cache"类型的配额淘汰）
+            subdir: 缓存目录相对于存储根目录的路径
+            url_prefix: 缓存目录对应的URL前缀
+        """
+        self.store = store
+        self.registry = store.registry
+        self.subdir = subdir
+        self.url_prefix = url_prefix.rstrip("/")
+        self._locks: Dict[str, List] = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(store.path_for(subdir), exist_ok=True)
+
+    @staticmethod
+    def key_for(images: List[str], audio: Optional[str], params: Dict[str, Any], renderer_version: str) -> str:
+        """
+        计算视频缓存键
+
+        Args:
+            images: 规范化后的图片路径（按顺序）
+            audio: 音频路径
+            params: 影响输出的渲染参数（档位、渲染方式、分辨率等）
+            renderer_version: 渲染器版本，渲染输出变化时递增
+
+        Returns:
+            十六进制SHA-256摘要
+        """
+        inputs = {
+            "images": [hash_file(path) for path in images],
+            "audio": hash_file(audio) if audio else None,
+            "params": params,
+            "renderer_version": renderer_version
+        }
+        canonical = json.dumps(inputs, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _relative_path(self, key: str, suffix: str) -> str:
+        return f"{key[:2]}/{key}{suffix}"
+
+    def path_for(self, key: str, suffix: str = ".mp4") -> str:
+        """返回缓存文件的磁盘路径（视频为.mp4，脚本等结果为.json，HLS分片目录为_hls）"""
+        return self.store.path_for(os.path.join(self.subdir, self._relative_path(key, suffix)))
+
+    def url_for(self, key: str) -> str:
+        """返回缓存视频的访问URL"""
+        return f"{self.url_prefix}/{self._relative_path(key, '.mp4')}"
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        查找已缓存的视频
+
+        Returns:
+            保存时的结果字典（video_path为视频URL），未缓存时返回None
+        """
+        video_path, meta_path = self.path_for(key), self.path_for(key, ".json")
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                result = json.load(f)
+        except (FileNotFoundError, ValueError):
+            result = None
+        paths = [video_path, meta_path]
+        if result is not None and result.get("hls"):
+            paths.append(self.path_for(key, self.HLS_SUFFIX))
+        if result is None or not all(os.path.exists(path) for path in paths):
+            # 视频、HLS分片和结果任一被淘汰时，整条缓存作废
+            self._discard(key)
+            return None
+        for path in paths:
+            if not self.registry.touch(path):
+                self.registry.register(path, self.KIND)
+        return self._with_urls(key, result)
+
+    def writer(self, key: str) -> MediaWriter:
+        """
+        创建视频写入器，渲染器直接写入其tmp_path（与缓存文件同目录）
+
+        Returns:
+            MediaWriter实例，渲染完成后调用commit()，失败时调用abort()
+        """
+        return self.store.writer(os.path.join(self.subdir, self._relative_path(key, ".mp4")), self.KIND)
+
+    def hls_writer(self, key: str) -> MediaDirWriter:
+        """
+        创建HLS输出目录写入器，播放列表和分片直接写入其tmp_path
+
+        Returns:
+            MediaDirWriter实例，随commit()一起发布，失败时调用abort()
+        """
+        return self.store.dir_writer(os.path.join(self.subdir, self._relative_path(key, self.HLS_SUFFIX)), self.KIND)
+
+    def commit(self, key: str, writer: MediaWriter, result: Dict[str, Any],
+               hls_writer: Optional[MediaDirWriter] = None) -> Dict[str, Any]:
+        """
+        发布渲染好的视频（及HLS输出），并保存结果（脚本、图片描述等）
+
+        结果文件最后写入，写入完成前lookup不会命中。
+
+        Args:
+            key: 缓存键
+            writer: writer()返回的写入器，视频已写入其tmp_path
+            result: 需要随视频返回的结果字段
+            hls_writer: hls_writer()返回的写入器，HLS输出已写入其tmp_path
+
+        Returns:
+            result加上video_path（视频URL），有HLS输出时加上hls_path（主播放列表URL）
+        """
+        writer.commit()
+        if hls_writer is not None:
+            hls_writer.commit()
+        result = {**result, "hls": hls_writer is not None}
+        meta_writer = self.store.writer(os.path.join(self.subdir, self._relative_path(key, ".json")), self.KIND)
+        try:
+            with open(meta_writer.tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+        except BaseException:
+            meta_writer.abort()
+            raise
+        meta_writer.commit()
+        return self._with_urls(key, result)
+
+    @contextmanager
+    def lock(self, key: str, on_wait: Optional[Callable[[], None]] = None):
+        """
+        同一缓存键的任务依次执行，后到的任务等前一个完成后直接命中缓存
+
+        Args:
+            key: 缓存键
+            on_wait: 等待期间每秒调用一次（可抛出异常放弃等待，例如任务被取消）
+        """
+        with self._locks_guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            while not entry[0].acquire(timeout=1.0):
+                if on_wait is not None:
+                    on_wait()
+            try:
+                yield
+            finally:
+                entry[0].release()
+        finally:
+            with self._locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def _with_urls(self, key: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        result = dict(result)
+        if result.pop("hls", False):
+            result["hls_path"] = f"{self.url_prefix}/{self._relative_path(key, self.HLS_SUFFIX)}/{self.HLS_PLAYLIST}"
+        return {**result, "video_path": self.url_for(key)}
+
+    def _discard(self, key: str):
+        for path in (self.path_for(key), self.path_for(key, ".json"), self.path_for(key, self.HLS_SUFFIX)):
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.exists(path):
+                os.unlink(path)
+            self.registry.forget(path)
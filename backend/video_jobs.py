@@ -0,0 +1,206 @@
+"""
+视频生成任务队列模块
+提交后立即返回任务ID，视频流水线在独立的执行器中运行，不阻塞事件循环；
+限制同时渲染的任务数，排队任务数达到上限时拒绝新提交（由接口返回503）。
+任务状态保存在API进程内存中。
+"""
+
+import asyncio
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional
+
+
+class QueueFullError(Exception):
+    """排队任务数已达上限"""
+
+
+class JobCancelled(Exception):
+    """任务已被取消（由进度回调抛出以中止流水线）"""
+
+
+class VideoJob:
+    """单个视频生成任务的状态"""
+
+    def __init__(self, params: Dict[str, Any], work_dir: Optional[str] = None):
+        """
+        Args:
+            params: 流水线参数（图片路径、音频路径、分辨率等）
+            work_dir: 任务临时目录，任务结束后删除
+        """
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.work_dir = work_dir
+        self.status = "queued"  # queued / running / succeeded / failed / cancelled
+        self.stage = "queued"
+        self.progress = 0.0
+        self.result: Optional[Dict[str, Any]] = None
+        self.preview: Optional[Dict[str, Any]] = None  # 低分辨率预览，完整视频完成前可先播放
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def report(self, stage: str, progress: float):
+        """
+        更新阶段和进度（在执行器线程中调用）
+
+        任务已请求取消时抛出JobCancelled，流水线据此尽快停止。
+        """
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+        self.stage = stage
+        self.progress = max(self.progress, min(progress, 1.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(self.progress, 4),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+        if self.preview is not None:
+            data["preview"] = self.preview
+        if self.result is not None:
+            data["result"] = self.result
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class VideoJobQueue:
+    """有界的视频任务队列，固定数量的消费者协程把任务交给执行器运行"""
+
+    def __init__(self, run_job: Callable[[VideoJob], Dict[str, Any]], executor: Executor,
+                 max_concurrent: int, max_pending: int, retention: float = 3600):
+        """
+        Args:
+            run_job: 同步执行任务的函数，返回结果字典
+            executor: 运行run_job的执行器
+            max_concurrent: 同时运行的任务数
+            max_pending: 最多排队（未开始）的任务数
+            retention: 已结束任务的状态保留时间（秒）
+        """
+        self.run_job = run_job
+        self.executor = executor
+        self.max_concurrent = max_concurrent
+        self.max_pending = max_pending
+        self.retention = retention
+        self.jobs: Dict[str, VideoJob] = {}
+        self._pending: List[VideoJob] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        """启动消费者协程（需在事件循环中调用）"""
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrent)]
+
+    async def stop(self):
+        """停止消费者并请求取消运行中的任务"""
+        for job in self.jobs.values():
+            if not job.finished:
+                job.cancel_event.set()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    def submit(self, params: Dict[str, Any], work_dir: Optional[str] = None) -> VideoJob:
+        """
+        提交任务
+
+        Raises:
+            QueueFullError: 排队任务数已达上限
+        """
+        self._forget_finished()
+        if len(self._pending) >= self.max_pending:
+            raise QueueFullError(f"当前排队任务已达上限（{self.max_pending}），请稍后再试")
+        job = VideoJob(params, work_dir)
+        self.jobs[job.id] = job
+        self._pending.append(job)
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[VideoJob]:
+        return self.jobs.get(job_id)
+
+    def position(self, job: VideoJob) -> int:
+        """返回任务在队列中的位置（从1开始），不在排队中时返回0"""
+        try:
+            return self._pending.index(job) + 1
+        except ValueError:
+            return 0
+
+    def cancel(self, job_id: str) -> Optional[VideoJob]:
+        """
+        取消任务：排队中的任务直接取消，运行中的任务在下一次进度回调时停止
+
+        Returns:
+            任务对象，不存在时返回None
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_event.set()
+        if job in self._pending:
+            self._pending.remove(job)
+            self._finish(job, "cancelled")
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        running = sum(1 for job in self.jobs.values() if job.status == "running")
+        return {
+            "running": running,
+            "pending": len(self._pending),
+            "max_concurrent": self.max_concurrent,
+            "max_pending": self.max_pending
+        }
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            if job.finished:
+                continue
+            self._pending.remove(job)
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = await loop.run_in_executor(self.executor, self.run_job, job)
+                self._finish(job, "succeeded")
+            except asyncio.CancelledError:
+                job.cancel_event.set()
+                self._finish(job, "cancelled")
+                raise
+            except Exception as e:
+                if job.cancel_event.is_set():
+                    self._finish(job, "cancelled")
+                else:
+                    print(f"[VideoJob] 任务 {job.id} 失败: {e}")
+                    job.error = str(e)
+                    self._finish(job, "failed")
+
+    def _finish(self, job: VideoJob, status: str):
+        job.status = status
+        job.stage = status
+        if status == "succeeded":
+            job.progress = 1.0
+        job.finished_at = time.time()
+        if job.work_dir:
+            shutil.rmtree(job.work_dir, ignore_errors=True)
+
+    def _forget_finished(self):
+        cutoff = time.time() - self.retention
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self.jobs[job_id]
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+POI空间索引查询微基准
+
+生成百万级随机POI（集中在中国东部城市群），构建索引后统计不同半径查询的耗时分位数。
+
+Usage:
+    python benchmarks/bench_poi_index.py [--count 1000000] [--queries 2000]
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from data.poi_index import build_index, POIIndex
+
+# 城市中心（经度, 纬度）
+CITIES = [(116.40, 39.90), (121.47, 31.23), (113.26, 23.13), (114.06, 22.54), (120.16, 30.27), (104.07, 30.57)]
+TYPES = ["旅游景点", "餐饮", "医院", "公园", "博物馆", "酒店"]
+
+
+def write_dataset(path: str, count: int, seed: int = 0):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "type", "lng", "lat", "address"])
+        for i in range(count):
+            lng, lat = rng.choice(CITIES)
+            writer.writerow([i, f"POI{i}", rng.choice(TYPES), lng + rng.gauss(0, 0.3), lat + rng.gauss(0, 0.3), f"地址{i}"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="POI空间索引查询微基准")
+    parser.add_argument("--count", type=int, default=1_000_000, help="POI数量")
+    parser.add_argument("--queries", type=int, default=2000, help="每种半径的查询次数")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "pois.csv")
+        write_dataset(source, args.count)
+        start = time.perf_counter()
+        build_index(source, os.path.join(temp_dir, "index"))
+        print(f"构建 {args.count} 条索引耗时 {time.perf_counter() - start:.1f}s")
+        index = POIIndex(os.path.join(temp_dir, "index"))
+
+        print(f"{'半径(m)':>8} {'平均结果数':>10} {'p50(ms)':>9} {'p99(ms)':>9}")
+        for radius in (500, 1000, 3000, 10000):
+            timings, results = [], 0
+            for _ in range(args.queries):
+                lng, lat = rng.choice(CITIES)
+                lng, lat = lng + rng.gauss(0, 0.2), lat + rng.gauss(0, 0.2)
+                start = time.perf_counter()
+                results += len(index.query(lng, lat, radius, limit=50))
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            print(f"{radius:>8} {results / args.queries:>10.1f} "
+                  f"{timings[len(timings) // 2] * 1000:>9.3f} {timings[int(len(timings) * 0.99)] * 1000:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+TTS文本分段微基准
+
+对比原来逐字符拼接的分段实现与当前线性分段实现在10k~100k字符文本上的耗时。
+
+Usage:
+    python benchmarks/bench_tts_segmenter.py [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from aliyun_tts import split_text_for_tts
+
+
+def legacy_split(text: str, max_length: int = 300) -> list:
+    """原实现：逐字符拼接句子，再用 len(current + sentence) 打包"""
+    if len(text) <= max_length:
+        return [text]
+
+    sentences = []
+    current_segment = ""
+    for char in text:
+        current_segment += char
+        if char in ['\n', '。', '！', '？', '.', '!', '?']:
+            sentences.append(current_segment)
+            current_segment = ""
+    if current_segment:
+        sentences.append(current_segment)
+
+    result = []
+    current = ""
+    for sentence in sentences:
+        if len(current + sentence) <= max_length:
+            current += sentence
+        else:
+            if current:
+                result.append(current)
+            if len(sentence) > max_length:
+                for i in range(0, len(sentence), max_length):
+                    result.append(sentence[i:i + max_length])
+            else:
+                current = sentence
+    if current:
+        result.append(current)
+    return result
+
+
+def make_itinerary_text(length: int, seed: int = 0) -> str:
+    """生成近似行程单的Markdown文本（标题、列表、加粗、时间和价格）"""
+    rng = random.Random(seed)
+    pieces = [
+        "## 第{day}天：抵达杭州\n",
+        "- **上午**：游览西湖，乘船约{n}分钟，门票{price}元。\n",
+        "- 下午在茶园休息，品尝龙井茶，注意补充水分！\n",
+        "午餐推荐清淡的杭帮菜，避免油腻；饭后可以在湖边散步{n}分钟。",
+        "行程强度适中，适合需要少量休息的长辈，每隔1.5小时安排一次休息。",
+        "Tip: book tickets 3 days ahead, e.g. via the official site. ",
+    ]
+    parts, total, day = [], 0, 1
+    while total < length:
+        piece = rng.choice(pieces).format(day=day, n=rng.randint(10, 90), price=f"{rng.randint(20, 300)}.{rng.randint(0, 99):02d}")
+        if piece.startswith("##"):
+            day += 1
+        parts.append(piece)
+        total += len(piece)
+    return "".join(parts)[:length]
+
+
+def best_time(func, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS文本分段微基准")
+    parser.add_argument("--repeat", type=int, default=5, help="每种规模重复次数（取最快一次）")
+    args = parser.parse_args()
+
+    print(f"{'字符数':>8} {'原实现(ms)':>12} {'线性实现(ms)':>14} {'加速比':>8} {'原段数':>7} {'新段数':>7}")
+    for length in (10_000, 20_000, 50_000, 100_000):
+        text = make_itinerary_text(length)
+        legacy = best_time(legacy_split, text, args.repeat)
+        linear = best_time(split_text_for_tts, text, args.repeat)
+        print(f"{length:>8} {legacy * 1000:>12.2f} {linear * 1000:>14.2f} {legacy / linear:>7.1f}x "
+              f"{len(legacy_split(text)):>7} {len(split_text_for_tts(text)):>7}")
+
+
+if __name__ == "__main__":
+    main()
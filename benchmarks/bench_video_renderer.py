@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+视频渲染基准
+
+用合成的720x1280图片，分别以moviepy合成、NumPy帧生成+ffmpeg管道、纯ffmpeg
+滤镜图三种方式渲染fade、zoom、pan三种动画，对比耗时、每秒渲染帧数和峰值内存。
+
+每次渲染在独立子进程中运行，峰值内存分别统计Python进程和ffmpeg进程（RSS）。
+
+Usage:
+    python benchmarks/bench_video_renderer.py [--images 5] [--fps 24] [--threads 4]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import numpy as np
+from PIL import Image
+
+RENDERERS = ("moviepy", "numpy", "ffmpeg")
+
+
+def make_images(directory: str, count: int, width: int, height: int) -> list:
+    """生成带渐变和色块的测试图片（避免纯色图片让编码器过于轻松）"""
+    rng = np.random.default_rng(0)
+    paths = []
+    y, x = np.mgrid[0:height, 0:width]
+    for i in range(count):
+        base = rng.integers(0, 256, 3)
+        pixels = np.stack([(x * 255 // width + base[0]) % 256,
+                           (y * 255 // height + base[1]) % 256,
+                           ((x + y) * 255 // (width + height) + base[2]) % 256], axis=-1).astype(np.uint8)
+        pixels += rng.integers(0, 16, pixels.shape, dtype=np.uint8)
+        path = os.path.join(directory, f"image_{i}.jpg")
+        Image.fromarray(pixels).save(path, "JPEG", quality=90)
+        paths.append(path)
+    return paths
+
+
+def run_worker(args):
+    """子进程：渲染一次，输出耗时和峰值内存（JSON）"""
+    # moviepy 1.0.3的resize依赖Image.ANTIALIAS，Pillow 10起已移除
+    if not hasattr(Image, "ANTIALIAS"):
+        Image.ANTIALIAS = Image.LANCZOS
+    from core.video_editor import create_video_from_images
+
+    start = time.perf_counter()
+    output = create_video_from_images(
+        args.worker_images, fps=args.fps, duration_per_image=args.duration, animation_type=args.animation,
+        threads=args.threads, progress_callback=lambda fraction: None, renderer=args.renderer
+    )
+    elapsed = time.perf_counter() - start
+    os.unlink(output)
+    # Linux下ru_maxrss单位为KB；RUSAGE_CHILDREN为已结束子进程（ffmpeg）中的最大值
+    print(json.dumps({
+        "elapsed": elapsed,
+        "python_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "ffmpeg_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="视频渲染基准")
+    parser.add_argument("--images", type=int, default=5, help="图片数量")
+    parser.add_argument("--fps", type=int, default=24, help="帧率")
+    parser.add_argument("--duration", type=float, default=3.0, help="每张图片时长（秒）")
+    parser.add_argument("--threads", type=int, default=4, help="ffmpeg线程数")
+    parser.add_argument("--renderer", choices=RENDERERS, help=argparse.SUPPRESS)
+    parser.add_argument("--animation", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-images", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_images:
+        run_worker(args)
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        images = make_images(temp_dir, args.images, 720, 1280)
+        frames = int(round(args.images * args.duration * args.fps))
+        print(f"{args.images} 张图片，{frames} 帧，720x1280@{args.fps}fps，ffmpeg {args.threads} 线程")
+        print(f"{'动画':>6} {'渲染方式':>8} {'耗时(s)':>9} {'帧/秒':>8} {'加速比':>7} {'Python峰值(MB)':>15} {'ffmpeg峰值(MB)':>15}")
+        for animation_type in ("fade", "zoom", "pan"):
+            baseline = None
+            for renderer in RENDERERS:
+                result = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--fps", str(args.fps), "--duration", str(args.duration),
+                     "--threads", str(args.threads), "--renderer", renderer, "--animation", animation_type,
+                     "--worker-images", *images],
+                    capture_output=True, text=True, check=True
+                )
+                stats = json.loads(result.stdout.strip().splitlines()[-1])
+                baseline = baseline or stats["elapsed"]
+                print(f"{animation_type:>6} {renderer:>8} {stats['elapsed']:>9.2f} {frames / stats['elapsed']:>8.1f} "
+                      f"{baseline / stats['elapsed']:>6.1f}x {stats['python_rss_mb']:>15.0f} {stats['ffmpeg_rss_mb']:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import React, { useState } from 'react'
 import ReactMarkdown from 'react-markdown'
 import remarkGfm from 'remark-gfm'
+import { postEventStream } from '../sse'
 
 function DestinationRecommendation({ selectedVoice = 'xiaoyun' }) {
   const [season, setSeason] = useState('秋季')
@@ -78,15 +79,9 @@ function DestinationRecommendation({ selectedVoice = 'xiaoyun' }) {
     e.preventDefault()
     setLoading(true)
     try {
-      const response = await fetch('/api/recommend-destinations', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ season, health: healthStatus, budget, interests }),
-      })
-      const data = await response.json()
-      setRecommendation(data.result)
+      // 流式接收，生成过程中逐步显示内容
+      const result = await postEventStream('/api/recommend-destinations/stream', { season, health: healthStatus, budget, interests }, setRecommendation)
+      setRecommendation(result)
     } catch (error) {
       console.error('Error generating destination:', error)
       setRecommendation('抱歉，生成推荐时出现了错误。')
@@ -2,6 +2,7 @@ import React, { useState, useRef } from 'react'
 import ReactMarkdown from 'react-markdown'
 import remarkGfm from 'remark-gfm'
 import html2pdf from 'html2pdf.js'
+import { postEventStream } from '../sse'
 
 function ItineraryPlan({ selectedVoice = 'xiaoyun', onImportToChecklist }) {
   const [destination, setDestination] = useState('')
@@ -80,15 +81,9 @@ function ItineraryPlan({ selectedVoice = 'xiaoyun', onImportToChecklist }) {
     e.preventDefault()
     setLoading(true)
     try {
-      const response = await fetch('/api/generate-itinerary', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ destination, duration, mobility, health_focus: healthFocus }),
-      })
-      const data = await response.json()
-      setItinerary(data.result)
+      // 流式接收，生成过程中逐步显示内容
+      const result = await postEventStream('/api/generate-itinerary/stream', { destination, duration, mobility, health_focus: healthFocus }, setItinerary)
+      setItinerary(result)
     } catch (error) {
       console.error('Error generating itinerary:', error)
       setItinerary('抱歉，生成行程时出现了错误。')
@@ -124,24 +124,22 @@ function SmartTourGuide({ selectedVoice }) {
     setIsPlaying(true)
     setLoading(true)
     setLoadingText('正在生成语音...')
-    try {
-      const response = await fetch(`http://localhost:8001/api/tour-guide/play-audio?text=${encodeURIComponent(text)}&voice=${voice}`)
-      const data = await response.json()
-      if (data.audio_url) {
-        setAudioUrl(data.audio_url)
-        const audio = new Audio(`http://localhost:8001${data.audio_url}`)
-        audio.onended = () => setIsPlaying(false)
-        audio.onerror = () => {
-          setIsPlaying(false)
-          alert('音频播放失败')
-        }
-        audio.play()
-      }
-    } catch (error) {
-      console.error('TTS调用错误:', error)
-      alert('TTS调用失败，请检查后端配置')
+    // 流式接口在第一段合成完成后即开始返回音频，边下载边播放
+    const streamPath = `/api/tour-guide/audio-stream?text=${encodeURIComponent(text)}&voice=${voice}`
+    setAudioUrl(streamPath)
+    const audio = new Audio(`http://localhost:8001${streamPath}`)
+    audio.onplaying = () => setLoading(false)
+    audio.onended = () => setIsPlaying(false)
+    audio.onerror = () => {
+      setIsPlaying(false)
+      setLoading(false)
+      alert('音频播放失败')
     }
-    setLoading(false)
+    audio.play().catch(error => {
+      console.error('TTS调用错误:', error)
+      setIsPlaying(false)
+      setLoading(false)
+    })
   }
 
 
@@ -4,8 +4,49 @@ function VideoEditor() {
   const [images, setImages] = useState([])
   const [audio, setAudio] = useState(null)
   const [videoUrl, setVideoUrl] = useState('')
+  const [isPreview, setIsPreview] = useState(false)
   const [message, setMessage] = useState('')
   const [loading, setLoading] = useState(false)
+  const [progress, setProgress] = useState(null)
+  const [jobId, setJobId] = useState(null)
+
+  const stageLabels = {
+    queued: '排队中',
+    preparing: '准备图片',
+    analyzing: '分析图片',
+    scripting: '生成脚本',
+    previewing: '生成预览',
+    rendering: '渲染高清视频'
+  }
+
+  // 支持HLS的播放器（iOS Safari、安卓浏览器）边下边播，并按网速切换清晰度
+  const supportsHls = typeof document !== 'undefined' &&
+    document.createElement('video').canPlayType('application/vnd.apple.mpegurl') !== ''
+
+  const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms))
+
+  // 轮询任务状态直到结束
+  const waitForJob = async (id) => {
+    while (true) {
+      await sleep(1500)
+      const response = await fetch(`/api/video-jobs/${id}`)
+      const job = await response.json()
+      if (!response.ok) throw new Error(job.detail || '查询任务失败')
+      setProgress(job)
+      // 预览先出来就先播放，完整视频完成后替换
+      if (job.preview && job.status === 'running') {
+        setVideoUrl(current => current || `http://localhost:8001${job.preview.video_path}`)
+        setIsPreview(true)
+      }
+      if (['succeeded', 'failed', 'cancelled'].includes(job.status)) return job
+    }
+  }
+
+  const handleCancel = async () => {
+    if (jobId) {
+      await fetch(`/api/video-jobs/${jobId}`, { method: 'DELETE' })
+    }
+  }
 
   const handleImageChange = (e) => {
     setImages(Array.from(e.target.files))
@@ -22,6 +63,8 @@ function VideoEditor() {
       return
     }
     setLoading(true)
+    setVideoUrl('')
+    setIsPreview(false)
     try {
       const formData = new FormData()
       images.forEach((image, index) => {
@@ -30,22 +73,39 @@ function VideoEditor() {
       if (audio) {
         formData.append('audio', audio)
       }
+      if (supportsHls) {
+        formData.append('hls', 'true')
+      }
       const response = await fetch('/api/create-video', {
         method: 'POST',
         body: formData,
       })
       const data = await response.json()
-      if (response.ok) {
-        setVideoUrl(`http://localhost:8001${data.video_path}`)
-        setMessage(data.message)
+      if (!response.ok) {
+        setMessage(response.status === 503 ? '当前生成视频的人较多，请稍后再试' : (data.detail || data.error))
+        return
+      }
+      setJobId(data.job_id)
+      setProgress(data)
+      const job = await waitForJob(data.job_id)
+      if (job.status === 'succeeded') {
+        setVideoUrl(`http://localhost:8001${(supportsHls && job.result.hls_path) || job.result.video_path}`)
+        setIsPreview(false)
+        setMessage(job.result.message)
+      } else if (job.status === 'cancelled') {
+        setVideoUrl('')
+        setMessage('已取消视频生成')
       } else {
-        setMessage(data.error)
+        setVideoUrl('')
+        setMessage(job.error || '抱歉，生成视频时出现了错误。')
       }
     } catch (error) {
       console.error('Error creating video:', error)
       setMessage('抱歉，生成视频时出现了错误。')
     } finally {
       setLoading(false)
+      setJobId(null)
+      setProgress(null)
     }
   }
 
@@ -84,13 +144,36 @@ function VideoEditor() {
         >
           {loading ? '🎬 生成视频中...' : '🎬 生成视频'}
         </button>
+        {loading && jobId && (
+          <button
+            type="button"
+            onClick={handleCancel}
+            style={{ marginLeft: '10px', background: '#BDBDBD', color: 'white', border: 'none', padding: '15px 30px', fontSize: '18px', borderRadius: '10px', cursor: 'pointer' }}
+          >
+            取消
+          </button>
+        )}
       </form>
+      {progress && (
+        <div style={{ marginTop: '20px', textAlign: 'left' }}>
+          <p style={{ fontSize: '16px', marginBottom: '8px' }}>
+            {stageLabels[progress.stage] || progress.stage}
+            {progress.position > 0 ? `（前面还有 ${progress.position - 1} 个任务）` : ''}
+            {` ${Math.round(progress.progress * 100)}%`}
+          </p>
+          <div style={{ height: '10px', background: '#eee', borderRadius: '5px' }}>
+            <div style={{ width: `${Math.round(progress.progress * 100)}%`, height: '100%', background: '#667eea', borderRadius: '5px', transition: 'width 0.5s ease' }} />
+          </div>
+        </div>
+      )}
       {message && (
         <p style={{ marginTop: '20px', fontSize: '16px', color: message.includes('成功') ? 'green' : 'red' }}>{message}</p>
       )}
       {videoUrl && (
         <div style={{ marginTop: '30px' }}>
-          <label style={{ fontSize: '18px', marginBottom: '10px', display: 'block', textAlign: 'left' }}>🎬 生成的视频</label>
+          <label style={{ fontSize: '18px', marginBottom: '10px', display: 'block', textAlign: 'left' }}>
+            {isPreview ? '🎬 预览（高清版本生成中，完成后自动替换）' : '🎬 生成的视频'}
+          </label>
           <video 
             src={videoUrl} 
             controls 
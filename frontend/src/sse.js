@@ -0,0 +1,50 @@
+// 读取后端的Server-Sent Events流式响应
+// onText在每次收到新内容时回调当前累计的全文，返回最终结果
+export async function postEventStream(url, body, onText) {
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(body),
+  })
+  if (!response.ok || !response.body) {
+    throw new Error(`请求失败: ${response.status}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder('utf-8')
+  let buffer = ''
+  let text = ''
+  let result = null
+
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const message = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+
+      let event = 'message'
+      let data = ''
+      message.split('\n').forEach((line) => {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) data += line.slice(5).trim()
+      })
+      if (!data) continue
+
+      const payload = JSON.parse(data)
+      if (event === 'done') {
+        result = payload.result
+      } else if (payload.delta) {
+        text += payload.delta
+        onText(text)
+      }
+    }
+  }
+
+  return result !== null ? result : text
+}
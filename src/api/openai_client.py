@@ -3,15 +3,26 @@ OpenAI API client module for the travel assistant application.
 Handles all API communications with the AI model, including ModelScope API.
 """
 
+import asyncio
+import hashlib
+import io
+import threading
 import openai
 import base64
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, AsyncIterator
+from PIL import Image, ImageOps
 try:
     from ..config.config import (
         API_KEY, API_BASE, MODEL_NAME, MAX_TOKENS, TEMPERATURE,
         MODELSCOPE_API_KEY, MODELSCOPE_BASE_URL,
-        QWEN_MODEL_NAME, DEEPSEEK_MODEL_NAME
+        QWEN_MODEL_NAME, DEEPSEEK_MODEL_NAME,
+        IMAGE_ANALYSIS_CONCURRENCY, IMAGE_ANALYSIS_MAX_EDGE,
+        DESTINATION_SYSTEM_PROMPT, ITINERARY_SYSTEM_PROMPT, CHECKLIST_SYSTEM_PROMPT
     )
+    from ..utils.cache import get_response_cache, get_image_description_cache, make_cache_key, hash_text
+    from ..utils.concurrency import SingleFlight
+    from ..utils.http_pool import get_http_client, get_sync_http_client
 except ImportError:
     # Handle direct execution
     import sys
@@ -20,8 +31,263 @@ except ImportError:
     from config.config import (
         API_KEY, API_BASE, MODEL_NAME, MAX_TOKENS, TEMPERATURE,
         MODELSCOPE_API_KEY, MODELSCOPE_BASE_URL,
-        QWEN_MODEL_NAME, DEEPSEEK_MODEL_NAME
+        QWEN_MODEL_NAME, DEEPSEEK_MODEL_NAME,
+        IMAGE_ANALYSIS_CONCURRENCY, IMAGE_ANALYSIS_MAX_EDGE,
+        DESTINATION_SYSTEM_PROMPT, ITINERARY_SYSTEM_PROMPT, CHECKLIST_SYSTEM_PROMPT
     )
+    from utils.cache import get_response_cache, get_image_description_cache, make_cache_key, hash_text
+    from utils.concurrency import SingleFlight
+    from utils.http_pool import get_http_client, get_sync_http_client
+
+
+def response_cache_key(base_url: str,
+                       model: str,
+                       system_prompt: str,
+                       user_prompt: str,
+                       max_tokens: int,
+                       temperature: float) -> str:
+    """
+    Build the response cache key for a model call.
+    
+    The system prompt is included by hash, so editing a system prompt in the
+    configuration invalidates every entry generated with the old one.
+    """
+    return make_cache_key({
+        'base_url': str(base_url),
+        'model': model,
+        'system_prompt_sha256': hash_text(system_prompt),
+        'user_prompt': user_prompt,
+        'max_tokens': max_tokens,
+        'temperature': temperature
+    })
+
+
+def build_destination_prompt(season: str, health_status: str, budget: str, interests: str) -> str:
+    """Build the user prompt for destination recommendations."""
+    return f"""
+请根据以下条件推荐适合银发族的国内旅行目的地：
+
+1. 季节：{season}
+2. 健康状况：{health_status}
+3. 预算范围：{budget}
+4. 兴趣偏好：{interests}
+
+请推荐3-5个目的地，并说明推荐理由，考虑以下因素：
+- 气候适宜性
+- 交通便利程度
+- 医疗条件
+- 住宿条件
+- 景点特色
+- 适合老年人的活动
+- 安全因素
+
+请用温暖、耐心的语气，像对待长辈一样详细说明每个推荐地的特点。
+
+**重要：请使用Markdown格式返回内容，使用#、##、###等标题符号，使用-或1.列表符号，使用**粗体**等Markdown语法。不要使用任何JSON格式。**
+"""
+
+
+def build_itinerary_prompt(destination: str, duration: str, mobility: str, health_focus: str) -> str:
+    """Build the user prompt for itinerary planning."""
+    return f"""
+请为银发族制定一份详细的旅行行程计划：
+
+1. 目的地：{destination}
+2. 旅行时长：{duration}
+3. 行动能力：{mobility}
+4. 健康关注点：{health_focus}
+
+请制定一份详细的行程计划，包括：
+- 每日具体安排（时间、地点、活动）
+- 交通方式和路线
+- 住宿推荐
+- 餐饮建议
+- 休息安排
+- 注意事项
+- 应急准备
+
+请特别考虑银发族自己的特点，安排充足的休息时间，避免过于紧凑的行程。
+请用温暖、关怀的语气，为银发族自己规划旅行，让旅行舒适安全。
+
+**重要：请使用Markdown格式返回内容，使用#、##、###等标题符号，使用-或1.列表符号，使用**粗体**等Markdown语法。不要使用任何JSON格式。**
+"""
+
+
+def build_checklist_prompt(origin: str,
+                           destination: str,
+                           duration: str,
+                           departure_date: str = "",
+                           special_needs: str = "",
+                           itinerary_text: str = "") -> str:
+    """Build the user prompt for the travel checklist."""
+    itinerary_context = f"\n参考行程：{itinerary_text}" if itinerary_text else ""
+    
+    # Add booking dates information if departure date is provided
+    booking_dates_info = ""
+    if departure_date:
+        booking_dates_info = f"""
+5. 出发日期：{departure_date}
+
+重要提醒：
+- 机票/火车票：请提前购买，建议购买{departure_date}当天的票
+- 酒店预订：请预订{departure_date}入住的酒店，根据{duration}时长选择退房日期
+- 景点门票：请提前预订{departure_date}之后的门票，避免现场排队
+"""
+    
+    return f"""
+请为银发族生成一份详细的旅行清单：
+
+1. 出发地：{origin}
+2. 目的地：{destination}
+3. 旅行时长：{duration}
+4. 特殊需求：{special_needs}
+{booking_dates_info}
+{itinerary_context}
+
+请生成一份详细的旅行清单，包括：
+- 证件类（身份证、医保卡、老年证等）
+- 衣物类（根据季节和目的地气候）
+- 药品类（常用药品、应急药品）
+- 生活用品类
+- 电子设备类
+- 财务准备
+- 安全用品
+- 娱乐用品
+- 特殊用品（根据健康状况）
+
+请严格按照JSON格式返回，必须包含以下所有字段：
+- documents: 数组，包含证件类清单项
+- clothing: 数组，包含衣物类清单项
+- medications: 数组，包含药物类清单项
+- daily_items: 数组，包含生活用品清单项
+- electronics: 数组，包含电子设备清单项
+- financial: 数组，包含财务准备清单项
+- safety: 数组，包含安全用品清单项
+- entertainment: 数组，包含娱乐用品清单项
+- special_items: 数组，包含特殊用品清单项
+- booking_guides: 对象，必须包含transport、hotel、tickets三个子对象
+  - transport: 对象，包含title(机票/火车票预订)、platforms(数组)、notes(数组)
+  - hotel: 对象，包含title(酒店预订)、platforms(数组)、notes(数组)
+  - tickets: 对象，包含title(景点门票)、platforms(数组)、notes(数组)
+- tips: 数组，包含温馨提示
+
+**重要要求：**
+1. 必须返回booking_guides字段，且包含transport、hotel、tickets三个分类，每个分类必须有title、platforms、notes三个子字段
+2. 所有数组类型的字段必须包含至少1个元素
+3. 不要使用任何代码块标记（如或```），直接返回纯JSON数据
+
+请用温暖、细致的语气，像为父母准备行李一样周到贴心。
+
+**重要：请返回纯JSON格式的数据，不要包含任何额外的文字说明，不要使用Markdown代码块标记（不要使用```json或```），直接返回JSON数据即可。**
+"""
+
+
+IMAGE_ANALYSIS_PROMPT = "请详细描述这张图片的内容，包括场景、物体、颜色、氛围等信息，为视频制作提供参考。"
+
+_vision_client: Optional[openai.OpenAI] = None
+_vision_client_lock = threading.Lock()
+
+
+def get_vision_client() -> openai.OpenAI:
+    """Get the shared ModelScope client used for image analysis."""
+    global _vision_client
+    with _vision_client_lock:
+        if _vision_client is None:
+            _vision_client = openai.OpenAI(
+                api_key=MODELSCOPE_API_KEY,
+                base_url=MODELSCOPE_BASE_URL,
+                http_client=get_sync_http_client("vision", timeout=120.0)
+            )
+        return _vision_client
+
+
+def encode_image_for_analysis(img_path: str, max_edge: int = IMAGE_ANALYSIS_MAX_EDGE) -> bytes:
+    """
+    Downscale an image to ``max_edge`` on its long side and encode it as JPEG.
+
+    The vision model does not benefit from more pixels than this, and the
+    request body shrinks from megabytes to ~100-200 KB per photo.
+
+    Args:
+        img_path: Path to the image
+        max_edge: Maximum width or height in pixels
+
+    Returns:
+        JPEG bytes of the upright, downscaled image
+    """
+    with Image.open(img_path) as img:
+        img.draft("RGB", (max_edge, max_edge))
+        img = ImageOps.exif_transpose(img)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS, reducing_gap=3.0)
+        buffer = io.BytesIO()
+        img.save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def image_description_cache_key(base_url: str, model: str, prompt: str, image_bytes: bytes) -> str:
+    """
+    Build the description cache key for an image.
+
+    Hashes the downscaled JPEG sent to the model rather than the uploaded
+    file, so any upload that normalizes to the same frame shares an entry.
+    """
+    return make_cache_key({
+        'base_url': str(base_url),
+        'model': model,
+        'prompt_sha256': hash_text(prompt),
+        'image_sha256': hashlib.sha256(image_bytes).hexdigest()
+    })
+
+
+def describe_image(client: openai.OpenAI, img_path: str, use_cache: bool = True) -> str:
+    """
+    Describe one image with Qwen3-VL.
+
+    Args:
+        client: ModelScope client
+        img_path: Path to the image
+        use_cache: Reuse a stored description of the same image, model and prompt
+
+    Returns:
+        Image description
+    """
+    image_bytes = encode_image_for_analysis(img_path)
+    cache = get_image_description_cache() if use_cache else None
+    if cache is not None:
+        cache_key = image_description_cache_key(client.base_url, QWEN_MODEL_NAME, IMAGE_ANALYSIS_PROMPT, image_bytes)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    img_base64 = base64.b64encode(image_bytes).decode("utf-8")
+    response = client.chat.completions.create(
+        model=QWEN_MODEL_NAME,
+        messages=[
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": IMAGE_ANALYSIS_PROMPT
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:image/jpeg;base64,{img_base64}"
+                        }
+                    }
+                ]
+            }
+        ],
+        max_tokens=512,
+        temperature=0.3
+    )
+    description = response.choices[0].message.content.strip()
+    if cache is not None and description:
+        cache.set(cache_key, description)
+    return description
 
 
 class OpenAIClient:
@@ -30,16 +296,25 @@ class OpenAIClient:
     def __init__(self):
         """Initialize the OpenAI client with configuration."""
         self.client = None
+        self.modelscope_client = None
         self._initialize_client()
     
     def _initialize_client(self):
-        """Initialize the OpenAI client with API key and base URL."""
+        """Initialize the default and ModelScope clients on the shared "model" pool."""
         if not API_KEY:
             raise ValueError("API密钥未设置。请在.env文件中设置MODEL_API_KEY")
         
+        # Both endpoints share one keep-alive pool; timeouts come from the openai client
+        http_client = get_sync_http_client("model", timeout=None)
         self.client = openai.OpenAI(
             api_key=API_KEY,
-            base_url=API_BASE
+            base_url=API_BASE,
+            http_client=http_client
+        )
+        self.modelscope_client = openai.OpenAI(
+            api_key=MODELSCOPE_API_KEY,
+            base_url=MODELSCOPE_BASE_URL,
+            http_client=http_client
         )
     
     def generate_response(self, 
@@ -48,7 +323,8 @@ class OpenAIClient:
                          max_tokens: Optional[int] = None,
                          temperature: Optional[float] = None,
                          model_name: Optional[str] = None,
-                         use_modelscope: bool = False) -> str:
+                         use_modelscope: bool = False,
+                         use_cache: bool = False) -> str:
         """
         Generate a response using the OpenAI API or ModelScope API.
         
@@ -59,6 +335,7 @@ class OpenAIClient:
             temperature: Temperature for response generation (overrides default)
             model_name: Name of the model to use (overrides default)
             use_modelscope: Whether to use ModelScope API instead of OpenAI API
+            use_cache: Whether to serve and store the result in the response cache
             
         Returns:
             The generated response text
@@ -69,25 +346,37 @@ class OpenAIClient:
         try:
             # Determine which API to use
             if use_modelscope:
-                client = openai.OpenAI(
-                    api_key=MODELSCOPE_API_KEY,
-                    base_url=MODELSCOPE_BASE_URL
-                )
+                client = self.modelscope_client
                 model = model_name or QWEN_MODEL_NAME
             else:
                 client = self.client
                 model = model_name or MODEL_NAME
             
+            max_tokens = max_tokens or MAX_TOKENS
+            temperature = temperature or TEMPERATURE
+            
+            cache = get_response_cache() if use_cache else None
+            if cache is not None:
+                cache_key = response_cache_key(client.base_url, model, system_prompt, user_prompt,
+                                               max_tokens, temperature)
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
             response = client.chat.completions.create(
                 model=model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
-                max_tokens=max_tokens or MAX_TOKENS,
-                temperature=temperature or TEMPERATURE
+                max_tokens=max_tokens,
+                temperature=temperature
             )
-            return response.choices[0].message.content.strip()
+            content = response.choices[0].message.content.strip()
+            
+            if cache is not None and content:
+                cache.set(cache_key, content)
+            return content
         except Exception as e:
             raise Exception(f"API调用失败: {str(e)}")
     
@@ -108,34 +397,8 @@ class OpenAIClient:
         Returns:
             Generated destination recommendations
         """
-        try:
-            from ..config.config import DESTINATION_SYSTEM_PROMPT
-        except ImportError:
-            from config.config import DESTINATION_SYSTEM_PROMPT
-        
-        user_prompt = f"""
-请根据以下条件推荐适合银发族的国内旅行目的地：
-
-1. 季节：{season}
-2. 健康状况：{health_status}
-3. 预算范围：{budget}
-4. 兴趣偏好：{interests}
-
-请推荐3-5个目的地，并说明推荐理由，考虑以下因素：
-- 气候适宜性
-- 交通便利程度
-- 医疗条件
-- 住宿条件
-- 景点特色
-- 适合老年人的活动
-- 安全因素
-
-请用温暖、耐心的语气，像对待长辈一样详细说明每个推荐地的特点。
-
-**重要：请使用Markdown格式返回内容，使用#、##、###等标题符号，使用-或1.列表符号，使用**粗体**等Markdown语法。不要使用任何JSON格式。**
-"""
-        
-        return self.generate_response(DESTINATION_SYSTEM_PROMPT, user_prompt)
+        user_prompt = build_destination_prompt(season, health_status, budget, interests)
+        return self.generate_response(DESTINATION_SYSTEM_PROMPT, user_prompt, use_cache=True)
     
     def generate_itinerary_plan(self, 
                               destination: str, 
@@ -154,35 +417,8 @@ class OpenAIClient:
         Returns:
             Generated itinerary plan
         """
-        try:
-            from ..config.config import ITINERARY_SYSTEM_PROMPT
-        except ImportError:
-            from config.config import ITINERARY_SYSTEM_PROMPT
-        
-        user_prompt = f"""
-请为银发族制定一份详细的旅行行程计划：
-
-1. 目的地：{destination}
-2. 旅行时长：{duration}
-3. 行动能力：{mobility}
-4. 健康关注点：{health_focus}
-
-请制定一份详细的行程计划，包括：
-- 每日具体安排（时间、地点、活动）
-- 交通方式和路线
-- 住宿推荐
-- 餐饮建议
-- 休息安排
-- 注意事项
-- 应急准备
-
-请特别考虑银发族自己的特点，安排充足的休息时间，避免过于紧凑的行程。
-请用温暖、关怀的语气，为银发族自己规划旅行，让旅行舒适安全。
-
-**重要：请使用Markdown格式返回内容，使用#、##、###等标题符号，使用-或1.列表符号，使用**粗体**等Markdown语法。不要使用任何JSON格式。**
-"""
-        
-        return self.generate_response(ITINERARY_SYSTEM_PROMPT, user_prompt)
+        user_prompt = build_itinerary_prompt(destination, duration, mobility, health_focus)
+        return self.generate_response(ITINERARY_SYSTEM_PROMPT, user_prompt, use_cache=True)
     
     def generate_checklist(self, 
                           origin: str, 
@@ -205,72 +441,8 @@ class OpenAIClient:
         Returns:
             Generated travel checklist
         """
-        try:
-            from ..config.config import CHECKLIST_SYSTEM_PROMPT
-        except ImportError:
-            from config.config import CHECKLIST_SYSTEM_PROMPT
-        
-        itinerary_context = f"\n参考行程：{itinerary_text}" if itinerary_text else ""
-        
-        # Add booking dates information if departure date is provided
-        booking_dates_info = ""
-        if departure_date:
-            booking_dates_info = f"""
-5. 出发日期：{departure_date}
-
-重要提醒：
-- 机票/火车票：请提前购买，建议购买{departure_date}当天的票
-- 酒店预订：请预订{departure_date}入住的酒店，根据{duration}时长选择退房日期
-- 景点门票：请提前预订{departure_date}之后的门票，避免现场排队
-"""
-        
-        user_prompt = f"""
-请为银发族生成一份详细的旅行清单：
-
-1. 出发地：{origin}
-2. 目的地：{destination}
-3. 旅行时长：{duration}
-4. 特殊需求：{special_needs}
-{booking_dates_info}
-{itinerary_context}
-
-请生成一份详细的旅行清单，包括：
-- 证件类（身份证、医保卡、老年证等）
-- 衣物类（根据季节和目的地气候）
-- 药品类（常用药品、应急药品）
-- 生活用品类
-- 电子设备类
-- 财务准备
-- 安全用品
-- 娱乐用品
-- 特殊用品（根据健康状况）
-
-请严格按照JSON格式返回，必须包含以下所有字段：
-- documents: 数组，包含证件类清单项
-- clothing: 数组，包含衣物类清单项
-- medications: 数组，包含药物类清单项
-- daily_items: 数组，包含生活用品清单项
-- electronics: 数组，包含电子设备清单项
-- financial: 数组，包含财务准备清单项
-- safety: 数组，包含安全用品清单项
-- entertainment: 数组，包含娱乐用品清单项
-- special_items: 数组，包含特殊用品清单项
-- booking_guides: 对象，必须包含transport、hotel、tickets三个子对象
-  - transport: 对象，包含title(机票/火车票预订)、platforms(数组)、notes(数组)
-  - hotel: 对象，包含title(酒店预订)、platforms(数组)、notes(数组)
-  - tickets: 对象，包含title(景点门票)、platforms(数组)、notes(数组)
-- tips: 数组，包含温馨提示
-
-**重要要求：**
-1. 必须返回booking_guides字段，且包含transport、hotel、tickets三个分类，每个分类必须有title、platforms、notes三个子字段
-2. 所有数组类型的字段必须包含至少1个元素
-3. 不要使用任何代码块标记（如或```），直接返回纯JSON数据
-
-请用温暖、细致的语气，像为父母准备行李一样周到贴心。
-
-**重要：请返回纯JSON格式的数据，不要包含任何额外的文字说明，不要使用Markdown代码块标记（不要使用```json或```），直接返回JSON数据即可。**
-"""
-        
+        user_prompt = build_checklist_prompt(origin, destination, duration,
+                                             departure_date, special_needs, itinerary_text)
         return self.generate_response(CHECKLIST_SYSTEM_PROMPT, user_prompt)
 
 
@@ -278,57 +450,27 @@ class OpenAIClient:
         """
         Analyze images using Qwen3-VL model to generate descriptions.
         
+        Images are downscaled before encoding and analyzed concurrently
+        (at most IMAGE_ANALYSIS_CONCURRENCY requests at a time) over one
+        shared connection pool. Descriptions are cached by image content,
+        so re-rendering with the same photos skips the model calls.
+        
         Args:
             images: List of image file paths to analyze
             
         Returns:
-            List of image descriptions
+            List of image descriptions, in the same order as ``images``
             
         Raises:
             Exception: If image analysis fails
         """
         try:
-            image_descriptions = []
-            
-            for img_path in images:
-                # Read and encode image to base64
-                with open(img_path, "rb") as img_file:
-                    img_base64 = base64.b64encode(img_file.read()).decode("utf-8")
-                
-                # Create client for ModelScope API
-                client = openai.OpenAI(
-                    api_key=MODELSCOPE_API_KEY,
-                    base_url=MODELSCOPE_BASE_URL
-                )
-                
-                # Generate image description using Qwen3-VL
-                response = client.chat.completions.create(
-                    model=QWEN_MODEL_NAME,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": "请详细描述这张图片的内容，包括场景、物体、颜色、氛围等信息，为视频制作提供参考。"
-                                },
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/jpeg;base64,{img_base64}"
-                                    }
-                                }
-                            ]
-                        }
-                    ],
-                    max_tokens=512,
-                    temperature=0.3
-                )
-                
-                description = response.choices[0].message.content.strip()
-                image_descriptions.append(description)
-            
-            return image_descriptions
+            if not images:
+                return []
+            client = get_vision_client()
+            with ThreadPoolExecutor(max_workers=min(IMAGE_ANALYSIS_CONCURRENCY, len(images)),
+                                    thread_name_prefix="image-analysis") as executor:
+                return list(executor.map(lambda img_path: describe_image(client, img_path), images))
         except Exception as e:
             raise Exception(f"图片分析失败: {str(e)}")
     
@@ -388,12 +530,272 @@ class OpenAIClient:
             raise Exception(f"视频脚本生成失败: {str(e)}")
 
 
+class AsyncOpenAIClient:
+    """
+    Asynchronous OpenAI API client for the FastAPI backend.
+
+    Built on ``openai.AsyncOpenAI`` so model calls are awaited instead of
+    blocking the event loop. Both API clients are created once and share the
+    "model" keep-alive pool, which lets a single worker keep many calls in flight.
+    Identical concurrent requests are coalesced into one upstream call.
+    """
+    
+    def __init__(self):
+        """Initialize the async OpenAI clients with configuration."""
+        self.client = None
+        self.modelscope_client = None
+        self._in_flight = SingleFlight()
+        self._initialize_client()
+    
+    def _initialize_client(self):
+        """Initialize the default and ModelScope async clients."""
+        if not API_KEY:
+            raise ValueError("API密钥未设置。请在.env文件中设置MODEL_API_KEY")
+        
+        # Both endpoints share one keep-alive pool; timeouts come from the openai client
+        http_client = get_http_client("model", timeout=None)
+        self.client = openai.AsyncOpenAI(
+            api_key=API_KEY,
+            base_url=API_BASE,
+            http_client=http_client
+        )
+        self.modelscope_client = openai.AsyncOpenAI(
+            api_key=MODELSCOPE_API_KEY,
+            base_url=MODELSCOPE_BASE_URL,
+            http_client=http_client
+        )
+    
+    def _resolve_client(self, use_modelscope: bool, model_name: Optional[str]):
+        """Return the API client and model name for a call."""
+        if use_modelscope:
+            return self.modelscope_client, model_name or QWEN_MODEL_NAME
+        return self.client, model_name or MODEL_NAME
+    
+    def cache_key(self, 
+                  system_prompt: str, 
+                  user_prompt: str, 
+                  max_tokens: Optional[int] = None,
+                  temperature: Optional[float] = None,
+                  model_name: Optional[str] = None,
+                  use_modelscope: bool = False) -> str:
+        """Return the response cache key that :meth:`generate_response` uses for these arguments."""
+        client, model = self._resolve_client(use_modelscope, model_name)
+        return response_cache_key(client.base_url, model, system_prompt, user_prompt,
+                                  max_tokens or MAX_TOKENS, temperature or TEMPERATURE)
+    
+    async def generate_response(self, 
+                                system_prompt: str, 
+                                user_prompt: str, 
+                                max_tokens: Optional[int] = None,
+                                temperature: Optional[float] = None,
+                                model_name: Optional[str] = None,
+                                use_modelscope: bool = False,
+                                use_cache: bool = False) -> str:
+        """
+        Generate a response using the OpenAI API or ModelScope API.
+        
+        Args:
+            system_prompt: The system prompt to guide the AI behavior
+            user_prompt: The user's input prompt
+            max_tokens: Maximum tokens for the response (overrides default)
+            temperature: Temperature for response generation (overrides default)
+            model_name: Name of the model to use (overrides default)
+            use_modelscope: Whether to use ModelScope API instead of OpenAI API
+            use_cache: Whether to serve and store the result in the response cache
+            
+        Returns:
+            The generated response text
+            
+        Raises:
+            Exception: If API call fails
+        """
+        try:
+            client, model = self._resolve_client(use_modelscope, model_name)
+            max_tokens = max_tokens or MAX_TOKENS
+            temperature = temperature or TEMPERATURE
+            request_key = response_cache_key(client.base_url, model, system_prompt, user_prompt,
+                                             max_tokens, temperature)
+            
+            cache = get_response_cache() if use_cache else None
+            if cache is not None:
+                cached = await asyncio.to_thread(cache.get, request_key)
+                if cached is not None:
+                    return cached
+            
+            async def call_model() -> str:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+                content = response.choices[0].message.content.strip()
+                
+                if cache is not None and content:
+                    await asyncio.to_thread(cache.set, request_key, content)
+                return content
+            
+            # Concurrent identical requests share one upstream call
+            return await self._in_flight.do(request_key, call_model)
+        except Exception as e:
+            raise Exception(f"API调用失败: {str(e)}")
+    
+    async def stream_response(self, 
+                              system_prompt: str, 
+                              user_prompt: str, 
+                              max_tokens: Optional[int] = None,
+                              temperature: Optional[float] = None,
+                              model_name: Optional[str] = None,
+                              use_modelscope: bool = False,
+                              use_cache: bool = False) -> AsyncIterator[str]:
+        """
+        Stream a response token by token.
+        
+        Takes the same arguments as :meth:`generate_response` but calls the
+        model with ``stream=True`` and yields text deltas as they arrive. A
+        cached response is yielded as a single chunk; a completed stream is
+        stored in the cache.
+        
+        Yields:
+            Raw text deltas from the model
+            
+        Raises:
+            Exception: If API call fails
+        """
+        try:
+            client, model = self._resolve_client(use_modelscope, model_name)
+            max_tokens = max_tokens or MAX_TOKENS
+            temperature = temperature or TEMPERATURE
+            
+            cache = get_response_cache() if use_cache else None
+            if cache is not None:
+                cache_key = response_cache_key(client.base_url, model, system_prompt, user_prompt,
+                                               max_tokens, temperature)
+                cached = await asyncio.to_thread(cache.get, cache_key)
+                if cached is not None:
+                    yield cached
+                    return
+            
+            stream = await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True
+            )
+            parts = []
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+            
+            content = "".join(parts).strip()
+            if cache is not None and content:
+                await asyncio.to_thread(cache.set, cache_key, content)
+        except Exception as e:
+            raise Exception(f"API调用失败: {str(e)}")
+    
+    async def generate_destination_recommendations(self, 
+                                                   season: str, 
+                                                   health_status: str, 
+                                                   budget: str, 
+                                                   interests: str) -> str:
+        """Async variant of :meth:`OpenAIClient.generate_destination_recommendations`."""
+        user_prompt = build_destination_prompt(season, health_status, budget, interests)
+        return await self.generate_response(DESTINATION_SYSTEM_PROMPT, user_prompt, use_cache=True)
+    
+    async def generate_itinerary_plan(self, 
+                                      destination: str, 
+                                      duration: str, 
+                                      mobility: str, 
+                                      health_focus: str) -> str:
+        """Async variant of :meth:`OpenAIClient.generate_itinerary_plan`."""
+        user_prompt = build_itinerary_prompt(destination, duration, mobility, health_focus)
+        return await self.generate_response(ITINERARY_SYSTEM_PROMPT, user_prompt, use_cache=True)
+    
+    async def generate_checklist(self, 
+                                 origin: str, 
+                                 destination: str, 
+                                 duration: str, 
+                                 departure_date: str = "",
+                                 special_needs: str = "",
+                                 itinerary_text: str = "") -> str:
+        """Async variant of :meth:`OpenAIClient.generate_checklist`."""
+        user_prompt = build_checklist_prompt(origin, destination, duration,
+                                             departure_date, special_needs, itinerary_text)
+        return await self.generate_response(CHECKLIST_SYSTEM_PROMPT, user_prompt)
+    
+    def stream_destination_recommendations(self, 
+                                           season: str, 
+                                           health_status: str, 
+                                           budget: str, 
+                                           interests: str) -> AsyncIterator[str]:
+        """Streaming variant of :meth:`generate_destination_recommendations`."""
+        user_prompt = build_destination_prompt(season, health_status, budget, interests)
+        return self.stream_response(DESTINATION_SYSTEM_PROMPT, user_prompt, use_cache=True)
+    
+    def stream_itinerary_plan(self, 
+                              destination: str, 
+                              duration: str, 
+                              mobility: str, 
+                              health_focus: str) -> AsyncIterator[str]:
+        """Streaming variant of :meth:`generate_itinerary_plan`."""
+        user_prompt = build_itinerary_prompt(destination, duration, mobility, health_focus)
+        return self.stream_response(ITINERARY_SYSTEM_PROMPT, user_prompt, use_cache=True)
+    
+    def stream_checklist(self, 
+                         origin: str, 
+                         destination: str, 
+                         duration: str, 
+                         departure_date: str = "",
+                         special_needs: str = "",
+                         itinerary_text: str = "") -> AsyncIterator[str]:
+        """Streaming variant of :meth:`generate_checklist`."""
+        user_prompt = build_checklist_prompt(origin, destination, duration,
+                                             departure_date, special_needs, itinerary_text)
+        return self.stream_response(CHECKLIST_SYSTEM_PROMPT, user_prompt)
+    
+    async def close(self):
+        """
+        Release the API clients.
+
+        The shared "model" pool is left open for its other users; it is closed
+        by ``close_http_clients()`` at application shutdown.
+        """
+        self.client = None
+        self.modelscope_client = None
+
+
 # Global client instance
 _client_instance = None
+_async_client_instance = None
 
 def get_client() -> OpenAIClient:
     """Get the global OpenAI client instance."""
     global _client_instance
     if _client_instance is None:
         _client_instance = OpenAIClient()
-    return _client_instance
\ No newline at end of file
+    return _client_instance
+
+def get_async_client() -> AsyncOpenAIClient:
+    """Get the global async OpenAI client instance."""
+    global _async_client_instance
+    if _async_client_instance is None:
+        _async_client_instance = AsyncOpenAIClient()
+    return _async_client_instance
+
+async def close_async_client():
+    """Close the global async OpenAI client if it was created."""
+    global _async_client_instance
+    if _async_client_instance is not None:
+        await _async_client_instance.close()
+        _async_client_instance = None
@@ -19,6 +19,25 @@ MODELSCOPE_BASE_URL = "https://api-inference.modelscope.cn/v1/"
 QWEN_MODEL_NAME = "Qwen/Qwen3-VL-8B-Instruct"
 DEEPSEEK_MODEL_NAME = "deepseek-ai/DeepSeek-V3.2"
 
+# Image Analysis Configuration
+IMAGE_ANALYSIS_CONCURRENCY = int(os.getenv("IMAGE_ANALYSIS_CONCURRENCY", "4"))  # 同时进行的图片分析请求数
+IMAGE_ANALYSIS_MAX_EDGE = int(os.getenv("IMAGE_ANALYSIS_MAX_EDGE", "1024"))  # 发送给视觉模型前缩放到的最长边
+
+# Response Cache Configuration
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", os.path.join("cache", "responses.sqlite3"))
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))  # 7天
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))  # 200MB
+IMAGE_DESCRIPTION_CACHE_PATH = os.getenv("IMAGE_DESCRIPTION_CACHE_PATH", os.path.join("cache", "image_descriptions.sqlite3"))
+IMAGE_DESCRIPTION_CACHE_TTL = int(os.getenv("IMAGE_DESCRIPTION_CACHE_TTL", str(30 * 24 * 3600)))  # 30天
+IMAGE_DESCRIPTION_CACHE_MAX_BYTES = int(os.getenv("IMAGE_DESCRIPTION_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))  # 50MB
+
+# Shared HTTP Client Pool Configuration
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20"))
+HTTP_POOL_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY", "30"))  # 空闲连接保留秒数
+HTTP_CLIENT_HTTP2 = os.getenv("HTTP_CLIENT_HTTP2", "true").lower() not in ("0", "false", "no")  # 需安装h2
+
 # Application Settings
 APP_TITLE = "🧳 银发族智能旅行助手"
 APP_DESCRIPTION = "专为中老年朋友设计的温暖贴心的旅行规划伙伴"
@@ -89,6 +108,41 @@ CHECKLIST_SYSTEM_PROMPT = """你是一个专为银发族设计的旅行清单助
 **重要：你必须返回纯JSON格式的数据，不要包含任何额外的文字说明，不要使用Markdown代码块标记（不要使用```json或```），直接返回JSON数据即可。**
 """
 
+TOUR_GUIDE_SYSTEM_PROMPT = "你是一个专业的导游，为银发族游客提供详细、生动的景点讲解。讲解内容要通俗易懂，富有感染力，同时考虑老年人的特点，语速适中，重点突出历史文化和景点特色。"
+
+TOUR_GUIDE_USER_PROMPT = "请为{poi_name}编写一段导游讲解词，适合银发族游客。讲解要详细介绍景点的历史背景、主要特色和参观要点。"
+
+# Pre-generation Settings (see core/pregenerate.py)
+# 预生成推荐时使用的常见兴趣组合，空列表对应"暂无特别偏好"
+PREGENERATE_INTEREST_SETS = [
+    [],
+    ["避寒康养", "温泉养生"],
+    ["文化历史", "传统建筑"],
+    ["自然风光", "摄影采风"],
+    ["海岛度假", "海滨漫步"],
+    ["美食体验", "休闲购物"],
+    ["温泉养生", "健康养生"],
+    ["古镇风情", "民俗体验"],
+    ["茶文化", "慢节奏游"],
+    ["寺庙祈福", "文化历史"],
+    ["森林浴", "田园风光"],
+    ["中医理疗", "健康养生"],
+]
+PREGENERATE_TTL = int(os.getenv("PREGENERATE_TTL", str(30 * 24 * 3600)))  # 30天
+PREGENERATE_CONCURRENCY = int(os.getenv("PREGENERATE_CONCURRENCY", "8"))
+PREGENERATE_RATE = float(os.getenv("PREGENERATE_RATE", "2"))  # 每秒最多发起的请求数
+
+# Tour Guide Explanation Store
+TOUR_EXPLANATION_STORE_PATH = os.getenv("TOUR_EXPLANATION_STORE_PATH", os.path.join("cache", "tour_explanations.sqlite3"))
+TOUR_EXPLANATION_REFRESH_AFTER = int(os.getenv("TOUR_EXPLANATION_REFRESH_AFTER", str(7 * 24 * 3600)))  # 超过7天后台刷新
+TOUR_EXPLANATION_MAX_BYTES = int(os.getenv("TOUR_EXPLANATION_MAX_BYTES", str(100 * 1024 * 1024)))  # 100MB
+
+# POI Spatial Index Configuration (build with: python src/data/poi_index.py build pois.csv)
+POI_INDEX_PATH = os.getenv("POI_INDEX_PATH", os.path.join("data", "poi_index"))
+POI_INDEX_CELL_SIZE = 0.01  # 网格边长（度），约1.1公里
+POI_QUERY_MAX_RADIUS = 50000  # 单次查询最大半径（米）
+POI_QUERY_MAX_LIMIT = 200  # 单次查询最多返回条数
+
 # Default Values
 DEFAULT_INTERESTS = ["避寒康养", "温泉养生"]
 DEFAULT_HEALTH_FOCUS = ["避免过度疲劳", "饮食清淡", "定期休息"]
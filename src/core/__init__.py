@@ -4,6 +4,13 @@ from .travel_functions import (
     generate_destination_recommendation,
     generate_itinerary_plan,
     generate_checklist,
+    generate_destination_recommendation_async,
+    generate_itinerary_plan_async,
+    generate_checklist_async,
+    stream_destination_recommendation,
+    stream_itinerary_plan,
+    stream_checklist,
+    format_checklist_response,
 )
 from .video_editor import (
     create_video_from_images,
@@ -14,6 +21,13 @@ __all__ = [
     'generate_destination_recommendation',
     'generate_itinerary_plan',
     'generate_checklist',
+    'generate_destination_recommendation_async',
+    'generate_itinerary_plan_async',
+    'generate_checklist_async',
+    'stream_destination_recommendation',
+    'stream_itinerary_plan',
+    'stream_checklist',
+    'format_checklist_response',
     'create_video_from_images',
     'validate_media_files'
 ]
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""
+FFmpeg filtergraph renderer module for the travel assistant application.
+Expresses a slideshow (still images, fade, zoom, pan, crossfades and audio
+fades) as one ffmpeg filtergraph, so all per-frame work runs inside ffmpeg
+and no frames pass through Python.
+"""
+
+import os
+import subprocess
+import tempfile
+from typing import Callable, List, Optional
+from moviepy.config import get_setting
+try:
+    from .frame_renderer import ZOOM_RATE, PAN_SCALE, CLIP_FADE
+except ImportError:
+    from core.frame_renderer import ZOOM_RATE, PAN_SCALE, CLIP_FADE
+
+# Animation types this renderer implements; others fall back to moviepy
+SUPPORTED_ANIMATIONS = ("fade", "zoom", "pan")
+
+ZOOM_OVERSAMPLE = 2  # zoompan按整数像素取景，先放大2倍以减轻缩放抖动
+
+
+def crossfade_duration(count: int, duration_per_image: float, transition_duration: float) -> float:
+    """Length of each xfade, at most one image long; 0 means plain concatenation."""
+    if count < 2 or transition_duration <= 0:
+        return 0.0
+    return min(transition_duration, duration_per_image)
+
+
+def build_filtergraph(
+    count: int,
+    fps: int,
+    duration_per_image: float,
+    transition_duration: float,
+    animation_type: str,
+    target_width: int,
+    target_height: int,
+    has_audio: bool
+) -> str:
+    """
+    Build the ``-filter_complex`` graph for ``count`` looped image inputs.
+
+    Every image after the first starts ``transition_duration`` early and is
+    joined to the previous one with an ``xfade`` fade through black that ends
+    on the image boundary, so the total length stays
+    ``count * duration_per_image`` as in the other renderers.
+    The audio input (index ``count``) is faded in and out with ``afade``.
+
+    Returns:
+        Filtergraph with output pads ``[v]`` and, with audio, ``[a]``
+    """
+    width, height = target_width, target_height
+    total = count * duration_per_image
+    crossfade = crossfade_duration(count, duration_per_image, transition_duration)
+    chains = []
+
+    for i in range(count):
+        length = duration_per_image + (crossfade if i > 0 else 0.0)
+        if animation_type == "zoom":
+            ow, oh = width * ZOOM_OVERSAMPLE, height * ZOOM_OVERSAMPLE
+            motion = (
+                f"scale={ow}:{oh}:force_original_aspect_ratio=increase,crop={ow}:{oh},"
+                f"zoompan=z='1+{ZOOM_RATE}*on/{fps}':x='iw/2-iw/zoom/2':y='ih/2-ih/zoom/2'"
+                f":d=1:s={width}x{height}:fps={fps}"
+            )
+        elif animation_type == "pan":
+            pw, ph = round(width * PAN_SCALE), round(height * PAN_SCALE)
+            motion = (
+                f"scale={pw}:{ph}:force_original_aspect_ratio=increase,crop={pw}:{ph},"
+                f"crop={width}:{height}:x='(iw-ow)*min(t/{duration_per_image},1)':y='(ih-oh)/2'"
+            )
+        else:
+            motion = f"scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height}"
+            motion += f",fade=t=in:st=0:d={CLIP_FADE},fade=t=out:st={duration_per_image - CLIP_FADE}:d={CLIP_FADE}"
+        chains.append(f"[{i}:v]{motion},setsar=1,format=yuv420p,trim=duration={length:.3f},fps={fps}[s{i}]")
+
+    if count == 1:
+        video = "s0"
+        finish = f"fade=t=in:st=0:d={CLIP_FADE},fade=t=out:st={total - CLIP_FADE}:d={CLIP_FADE}"
+    else:
+        if crossfade > 0:
+            previous = "s0"
+            for i in range(1, count):
+                output = f"x{i}"
+                chains.append(f"[{previous}][s{i}]xfade=transition=fadeblack:duration={crossfade}"
+                              f":offset={i * duration_per_image - crossfade:.3f}[{output}]")
+                previous = output
+            video = previous
+        else:
+            chains.append("".join(f"[s{i}]" for i in range(count)) + f"concat=n={count}:v=1:a=0[joined]")
+            video = "joined"
+        finish = f"fade=t=in:st=0:d={transition_duration}" if transition_duration > 0 else "null"
+    chains.append(f"[{video}]{finish}[v]")
+
+    if has_audio:
+        chains.append(f"[{count}:a]atrim=duration={total:.3f},afade=t=in:st=0:d={CLIP_FADE},"
+                      f"afade=t=out:st={max(total - CLIP_FADE, 0):.3f}:d={CLIP_FADE}[a]")
+    return ";".join(chains)
+
+
+def render_with_filtergraph(
+    images: List[str],
+    audio: Optional[str] = None,
+    fps: int = 24,
+    duration_per_image: float = 3.0,
+    transition_duration: float = 0.5,
+    animation_type: str = "fade",
+    target_width: int = 720,
+    target_height: int = 1280,
+    threads: int = 4,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    preset: str = "medium",
+    crf: Optional[int] = None,
+    keyframe_interval: Optional[int] = None,
+    output_path: Optional[str] = None
+) -> str:
+    """
+    Render a slideshow with a single ffmpeg filtergraph.
+
+    Takes the same arguments as ``create_video_from_images``. Progress is
+    read from ffmpeg's ``-progress`` output.
+
+    Returns:
+        Path to the created video file
+    """
+    if animation_type not in SUPPORTED_ANIMATIONS:
+        raise ValueError(f"不支持的动画效果: {animation_type}")
+
+    count = len(images)
+    total = count * duration_per_image
+    crossfade = crossfade_duration(count, duration_per_image, transition_duration)
+    frame_count = int(round(total * fps))
+
+    if output_path is None:
+        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp:
+            output_path = tmp.name
+
+    command = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", "-nostats", "-progress", "pipe:1"]
+    for i, image in enumerate(images):
+        length = duration_per_image + (crossfade if i > 0 else 0.0)
+        command += ["-loop", "1", "-framerate", str(fps), "-t", f"{length:.3f}", "-i", image]
+    if audio:
+        command += ["-stream_loop", "-1", "-i", audio]
+    command += ["-filter_complex", build_filtergraph(count, fps, duration_per_image, transition_duration,
+                                                     animation_type, target_width, target_height, bool(audio)),
+                "-map", "[v]"]
+    if audio:
+        command += ["-map", "[a]", "-c:a", "aac"]
+    command += [
+        "-c:v", "libx264", "-preset", preset, "-pix_fmt", "yuv420p", "-threads", str(threads)
+    ]
+    if crf is not None:
+        command += ["-crf", str(crf)]
+    if keyframe_interval is not None:
+        command += ["-g", str(keyframe_interval), "-keyint_min", str(keyframe_interval), "-sc_threshold", "0"]
+    command += ["-t", f"{total:.3f}", "-movflags", "+faststart", output_path]
+
+    with tempfile.TemporaryFile() as errors:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=errors, text=True)
+        try:
+            for line in process.stdout:
+                if progress_callback is not None and line.startswith("frame="):
+                    progress_callback(min(int(line.split("=", 1)[1]) / frame_count, 1.0))
+            if process.wait() != 0:
+                errors.seek(0)
+                raise RuntimeError(f"ffmpeg编码失败: {errors.read().decode('utf-8', 'replace').strip()}")
+            return output_path
+        except BaseException:
+            process.kill()
+            process.wait()
+            if os.path.exists(output_path):
+                os.unlink(output_path)
+            raise
+        finally:
+            process.stdout.close()
@@ -0,0 +1,203 @@
+"""
+Frame renderer module for the travel assistant application.
+Generates slideshow frames (fade, zoom, pan) with NumPy and pipes them as raw
+RGB into a single ffmpeg encoder, instead of compositing every frame through
+moviepy's per-frame Python callbacks.
+"""
+
+import os
+import subprocess
+import tempfile
+from typing import Callable, List, Optional
+import numpy as np
+from PIL import Image
+from moviepy.config import get_setting
+
+# Animation types this renderer implements; others fall back to moviepy
+SUPPORTED_ANIMATIONS = ("fade", "zoom", "pan")
+
+ZOOM_RATE = 0.05  # 每秒放大5%，与moviepy路径一致
+PAN_SCALE = 1.2  # 平移时图片放大到1.2倍，窗口从左向右移动
+CLIP_FADE = 0.5  # fade动画和单张图片的淡入淡出时长（秒）
+
+
+def load_working_image(path: str, width: int, height: int) -> np.ndarray:
+    """
+    Decode an image once and center-crop it to cover ``width`` x ``height``.
+
+    Args:
+        path: Image file path
+        width: Working width
+        height: Working height
+
+    Returns:
+        uint8 RGB array of shape (height, width, 3)
+    """
+    with Image.open(path) as img:
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        if img.size != (width, height):
+            scale = max(width / img.width, height / img.height)
+            crop_w, crop_h = width / scale, height / scale
+            left, top = (img.width - crop_w) / 2, (img.height - crop_h) / 2
+            img = img.resize((width, height), Image.LANCZOS, box=(left, top, left + crop_w, top + crop_h))
+        return np.asarray(img)
+
+
+class SlideRenderer:
+    """Produces the frames of one image for a given animation type."""
+
+    def __init__(self, path: str, animation_type: str, duration: float, width: int, height: int):
+        self.animation_type = animation_type
+        self.duration = duration
+        self.width = width
+        self.height = height
+        if animation_type == "zoom":
+            # 按最大放大倍数预先缩放一次，每帧只需从中裁剪并缩小
+            self.max_scale = 1 + ZOOM_RATE * duration
+            self.source = Image.fromarray(load_working_image(
+                path, round(width * self.max_scale), round(height * self.max_scale)))
+        elif animation_type == "pan":
+            self.image = load_working_image(path, round(width * PAN_SCALE), round(height * PAN_SCALE))
+            self.top = (self.image.shape[0] - height) // 2
+            self.travel = self.image.shape[1] - width
+        else:
+            self.image = np.ascontiguousarray(load_working_image(path, width, height))
+
+    def frame(self, t: float) -> np.ndarray:
+        """Return the frame at ``t`` seconds into this image (before fades)."""
+        if self.animation_type == "zoom":
+            scale = (1 + ZOOM_RATE * t) / self.max_scale
+            crop_w, crop_h = self.source.width * scale, self.source.height * scale
+            left, top = (self.source.width - crop_w) / 2, (self.source.height - crop_h) / 2
+            return np.asarray(self.source.resize((self.width, self.height), Image.BILINEAR,
+                                                 box=(left, top, left + crop_w, top + crop_h)))
+        if self.animation_type == "pan":
+            x = round(self.travel * min(t / self.duration, 1.0))
+            return self.image[self.top:self.top + self.height, x:x + self.width]
+        return self.image
+
+
+def brightness(index: int, count: int, t: float, global_t: float, total: float,
+               duration: float, transition_duration: float, animation_type: str) -> float:
+    """
+    Fade-to-black multiplier for a frame, matching the moviepy path.
+
+    Each image fades in and out over CLIP_FADE seconds for the "fade" type;
+    every image except the last fades out over ``transition_duration``, and
+    the whole video fades in over ``transition_duration``. A single image
+    fades in and out over CLIP_FADE seconds.
+    """
+    alpha = 1.0
+    if animation_type == "fade":
+        alpha = min(alpha, t / CLIP_FADE, (duration - t) / CLIP_FADE)
+    if count > 1:
+        if index < count - 1 and transition_duration > 0:
+            alpha = min(alpha, (duration - t) / transition_duration)
+        if transition_duration > 0:
+            alpha = min(alpha, global_t / transition_duration)
+    else:
+        alpha = min(alpha, global_t / CLIP_FADE, (total - global_t) / CLIP_FADE)
+    return max(0.0, min(alpha, 1.0))
+
+
+def render_slideshow(
+    images: List[str],
+    audio: Optional[str] = None,
+    fps: int = 24,
+    duration_per_image: float = 3.0,
+    transition_duration: float = 0.5,
+    animation_type: str = "fade",
+    target_width: int = 720,
+    target_height: int = 1280,
+    threads: int = 4,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    preset: str = "medium",
+    crf: Optional[int] = None,
+    keyframe_interval: Optional[int] = None,
+    output_path: Optional[str] = None
+) -> str:
+    """
+    Render a slideshow by piping NumPy frames into ffmpeg.
+
+    Takes the same arguments as ``create_video_from_images``. Audio is looped
+    or trimmed to the video length by ffmpeg.
+
+    Returns:
+        Path to the created video file
+    """
+    if animation_type not in SUPPORTED_ANIMATIONS:
+        raise ValueError(f"不支持的动画效果: {animation_type}")
+
+    count = len(images)
+    total = count * duration_per_image
+    frame_count = int(round(total * fps))
+
+    if output_path is None:
+        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp:
+            output_path = tmp.name
+
+    command = [
+        get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", "-nostats",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{target_width}x{target_height}", "-r", str(fps), "-i", "-"
+    ]
+    if audio:
+        command += ["-stream_loop", "-1", "-i", audio, "-map", "0:v", "-map", "1:a", "-c:a", "aac"]
+    command += [
+        "-c:v", "libx264", "-preset", preset, "-pix_fmt", "yuv420p", "-threads", str(threads)
+    ]
+    if crf is not None:
+        command += ["-crf", str(crf)]
+    if keyframe_interval is not None:
+        command += ["-g", str(keyframe_interval), "-keyint_min", str(keyframe_interval), "-sc_threshold", "0"]
+    command += ["-t", f"{total:.3f}", "-movflags", "+faststart", output_path]
+
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    black = np.zeros((target_height, target_width, 3), dtype=np.uint8)
+    scaled = np.empty((target_height, target_width, 3), dtype=np.uint16)
+    faded = np.empty((target_height, target_width, 3), dtype=np.uint8)
+    try:
+        slide, slide_index = None, -1
+        for n in range(frame_count):
+            global_t = n / fps
+            index = min(int(global_t // duration_per_image), count - 1)
+            if index != slide_index:
+                # 每张图片只在用到时解码一次，前一张随即释放
+                slide, slide_index = SlideRenderer(images[index], animation_type, duration_per_image,
+                                                   target_width, target_height), index
+            t = global_t - index * duration_per_image
+
+            frame = slide.frame(t)
+            alpha = brightness(index, count, t, global_t, total, duration_per_image,
+                               transition_duration, animation_type)
+            if alpha <= 0.0:
+                frame = black
+            elif alpha < 1.0:
+                # 定点数淡入淡出：frame * alpha/256
+                np.multiply(frame, int(alpha * 256), out=scaled, dtype=np.uint16)
+                np.right_shift(scaled, 8, out=scaled)
+                np.copyto(faded, scaled, casting="unsafe")
+                frame = faded
+            try:
+                process.stdin.write(np.ascontiguousarray(frame).data)
+            except BrokenPipeError:
+                break  # ffmpeg已退出，错误信息在下面读取
+
+            if progress_callback is not None:
+                progress_callback((n + 1) / frame_count)
+
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg编码失败: {process.stderr.read().decode('utf-8', 'replace').strip()}")
+        return output_path
+    except BaseException:
+        process.kill()
+        process.wait()
+        if os.path.exists(output_path):
+            os.unlink(output_path)
+        raise
+    finally:
+        process.stderr.close()
@@ -0,0 +1,114 @@
+"""
+HLS packaging module for the travel assistant application.
+Splits a rendered MP4 into fMP4 segments with a master playlist, so players
+can start after the first segments and switch to a lower-bitrate rendition
+on slow mobile connections.
+"""
+
+import os
+import subprocess
+import tempfile
+from typing import Callable, Optional
+from moviepy.config import get_setting
+
+SEGMENT_DURATION = 2  # 每个分片2秒，首个分片下载完即可开始播放
+MASTER_PLAYLIST = "master.m3u8"
+
+# Lower-bitrate rendition for slow connections: half resolution, capped bitrate
+LOW_RENDITION_VIDEO_KBPS = 600
+LOW_RENDITION_AUDIO_KBPS = 64
+
+
+def keyframe_interval(fps: int) -> int:
+    """Frames between forced keyframes, so segments can be cut without re-encoding."""
+    return max(int(round(fps * SEGMENT_DURATION)), 1)
+
+
+def package_hls(
+    video_path: str,
+    output_dir: str,
+    width: int,
+    height: int,
+    fps: int,
+    duration: float,
+    has_audio: bool,
+    low_rendition: bool = True,
+    threads: int = 4,
+    preset: str = "medium",
+    progress_callback: Optional[Callable[[float], None]] = None
+) -> str:
+    """
+    Write HLS output for a rendered video.
+
+    The full-quality rendition is remuxed without re-encoding (the video must
+    have a keyframe every ``keyframe_interval(fps)`` frames); the optional
+    low rendition is encoded at half resolution.
+
+    Args:
+        video_path: Rendered MP4
+        output_dir: Directory for the playlists and segments (created if missing)
+        width: Video width
+        height: Video height
+        fps: Video frame rate
+        duration: Video length in seconds
+        has_audio: Whether the video has an audio track
+        low_rendition: Also write a lower-bitrate rendition
+        threads: Number of ffmpeg encoder threads
+        preset: x264 preset for the low rendition
+        progress_callback: Optional callable receiving the fraction done
+
+    Returns:
+        Path to the master playlist
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    gop = keyframe_interval(fps)
+
+    command = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error", "-nostats", "-progress", "pipe:1",
+               "-i", video_path]
+    variants = ["v:0,a:0,name:high" if has_audio else "v:0,name:high"]
+    command += ["-map", "0:v"] + (["-map", "0:a"] if has_audio else [])
+    if low_rendition:
+        # 低码率档不超过原视频码率的一半，保证带宽自适应时确实更省流量
+        source_kbps = os.path.getsize(video_path) * 8 / 1000 / max(duration, 0.1)
+        video_kbps = int(max(min(LOW_RENDITION_VIDEO_KBPS, source_kbps / 2), 32))
+        command += ["-filter_complex", f"[0:v]scale={width // 4 * 2}:{height // 4 * 2},setsar=1[low]",
+                    "-map", "[low]"] + (["-map", "0:a"] if has_audio else [])
+        command += [
+            "-c:v:1", "libx264", "-preset", preset, "-b:v:1", f"{video_kbps}k",
+            "-maxrate:v:1", f"{int(video_kbps * 1.1)}k", "-bufsize:v:1", f"{video_kbps * 2}k",
+            "-g:v:1", str(gop), "-keyint_min:v:1", str(gop), "-sc_threshold:v:1", "0",
+            "-pix_fmt:v:1", "yuv420p", "-threads", str(threads)
+        ]
+        if has_audio:
+            command += ["-c:a:1", "aac", "-b:a:1", f"{LOW_RENDITION_AUDIO_KBPS}k"]
+        variants.append("v:1,a:1,name:low" if has_audio else "v:1,name:low")
+    command += ["-c:v:0", "copy"] + (["-c:a:0", "copy"] if has_audio else [])
+    command += [
+        "-f", "hls", "-hls_time", str(SEGMENT_DURATION), "-hls_playlist_type", "vod",
+        "-hls_segment_type", "fmp4", "-hls_flags", "independent_segments",
+        "-hls_fmp4_init_filename", "init.mp4",
+        "-hls_segment_filename", os.path.join(output_dir, "%v", "segment_%03d.m4s"),
+        "-master_pl_name", MASTER_PLAYLIST, "-var_stream_map", " ".join(variants),
+        os.path.join(output_dir, "%v", "index.m3u8")
+    ]
+
+    with tempfile.TemporaryFile() as errors:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=errors, text=True)
+        try:
+            for line in process.stdout:
+                if progress_callback is not None and line.startswith("out_time_us="):
+                    value = line.split("=", 1)[1].strip()
+                    if value.isdigit():
+                        progress_callback(min(int(value) / 1e6 / duration, 1.0))
+            if process.wait() != 0:
+                errors.seek(0)
+                raise RuntimeError(f"HLS分片失败: {errors.read().decode('utf-8', 'replace').strip()}")
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            process.stdout.close()
+    if progress_callback is not None:
+        progress_callback(1.0)
+    return os.path.join(output_dir, MASTER_PLAYLIST)
@@ -0,0 +1,167 @@
+"""
+Offline pre-generation job for destination recommendations.
+
+Walks every season × health status × budget combination together with the
+common interest sets from the configuration, generates the recommendations
+concurrently under a rate limit and writes them into the response cache that
+``/api/recommend-destinations`` reads before calling the model.
+
+The job is resumable: every result is stored as soon as it completes, and
+entries that are still fresh are skipped on the next run.
+
+Usage:
+    python src/core/pregenerate.py [--concurrency 8] [--rate 2] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from typing import List, Dict, Any, Optional
+try:
+    from ..api.openai_client import AsyncOpenAIClient, build_destination_prompt
+    from ..config.config import (
+        SEASON_OPTIONS, HEALTH_STATUS_OPTIONS, BUDGET_OPTIONS, DESTINATION_SYSTEM_PROMPT,
+        PREGENERATE_INTEREST_SETS, PREGENERATE_TTL, PREGENERATE_CONCURRENCY, PREGENERATE_RATE
+    )
+    from ..utils.cache import get_response_cache
+    from ..utils.concurrency import AsyncRateLimiter
+    from ..utils.helpers import format_interests
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from api.openai_client import AsyncOpenAIClient, build_destination_prompt
+    from config.config import (
+        SEASON_OPTIONS, HEALTH_STATUS_OPTIONS, BUDGET_OPTIONS, DESTINATION_SYSTEM_PROMPT,
+        PREGENERATE_INTEREST_SETS, PREGENERATE_TTL, PREGENERATE_CONCURRENCY, PREGENERATE_RATE
+    )
+    from utils.cache import get_response_cache
+    from utils.concurrency import AsyncRateLimiter
+    from utils.helpers import format_interests
+
+
+def build_recommendation_matrix(interest_sets: List[List[str]]) -> List[Dict[str, Any]]:
+    """
+    Build every recommendation request the job should cover.
+
+    Args:
+        interest_sets: Interest combinations to pair with each season/health/budget
+
+    Returns:
+        List of dicts with season, health_status, budget and interests
+    """
+    return [
+        {'season': season, 'health_status': health, 'budget': budget, 'interests': list(interests)}
+        for season, health, budget, interests in itertools.product(
+            SEASON_OPTIONS, HEALTH_STATUS_OPTIONS, BUDGET_OPTIONS, interest_sets
+        )
+    ]
+
+
+def is_fresh(entry: Optional[Dict[str, Any]], min_remaining: float) -> bool:
+    """Return True if a cache entry exists and stays valid for at least ``min_remaining`` seconds."""
+    if entry is None:
+        return False
+    if entry['expires_at'] is None:
+        return True
+    return entry['expires_at'] - time.time() > min_remaining
+
+
+async def pregenerate(interest_sets: List[List[str]],
+                      concurrency: int = PREGENERATE_CONCURRENCY,
+                      rate: float = PREGENERATE_RATE,
+                      ttl: int = PREGENERATE_TTL,
+                      min_remaining: float = 24 * 3600,
+                      dry_run: bool = False) -> Dict[str, int]:
+    """
+    Generate and store recommendations for the whole matrix.
+
+    Args:
+        interest_sets: Interest combinations to cover
+        concurrency: Maximum number of model calls in flight
+        rate: Maximum number of model calls started per second
+        ttl: Time-to-live of the stored entries in seconds
+        min_remaining: Regenerate entries that expire within this many seconds
+        dry_run: Only count what would be generated
+
+    Returns:
+        Dict with total, skipped, generated and failed counts
+    """
+    cache = get_response_cache()
+    if cache is None:
+        raise RuntimeError("响应缓存已禁用（RESPONSE_CACHE_ENABLED），无法写入预生成结果")
+
+    client = AsyncOpenAIClient()
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = AsyncRateLimiter(rate)
+    counts = {'total': 0, 'skipped': 0, 'generated': 0, 'failed': 0}
+
+    pending = []
+    for item in build_recommendation_matrix(interest_sets):
+        counts['total'] += 1
+        user_prompt = build_destination_prompt(item['season'], item['health_status'], item['budget'],
+                                               format_interests(item['interests']))
+        key = client.cache_key(DESTINATION_SYSTEM_PROMPT, user_prompt)
+        if is_fresh(cache.peek(key), min_remaining):
+            counts['skipped'] += 1
+        else:
+            pending.append((item, user_prompt, key))
+
+    print(f"[Pregenerate] 共 {counts['total']} 项，已是最新 {counts['skipped']} 项，待生成 {len(pending)} 项")
+    if dry_run or not pending:
+        await client.close()
+        return counts
+
+    async def generate_one(item: Dict[str, Any], user_prompt: str, key: str):
+        async with semaphore:
+            await limiter.acquire()
+            label = f"{item['season']}/{item['health_status']}/{item['budget']}/{format_interests(item['interests'])}"
+            try:
+                response = await client.generate_response(DESTINATION_SYSTEM_PROMPT, user_prompt)
+                await asyncio.to_thread(cache.set, key, response, ttl)
+                counts['generated'] += 1
+                print(f"[Pregenerate] ✅ {label} ({counts['generated']}/{len(pending)})")
+            except Exception as e:
+                counts['failed'] += 1
+                print(f"[Pregenerate] ❌ {label}: {e}")
+
+    try:
+        await asyncio.gather(*(generate_one(*args) for args in pending))
+    finally:
+        await client.close()
+
+    return counts
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="预生成目的地推荐，写入响应缓存")
+    parser.add_argument("--concurrency", type=int, default=PREGENERATE_CONCURRENCY, help="同时进行的模型调用数")
+    parser.add_argument("--rate", type=float, default=PREGENERATE_RATE, help="每秒最多发起的模型调用数")
+    parser.add_argument("--ttl", type=int, default=PREGENERATE_TTL, help="结果有效期（秒）")
+    parser.add_argument("--min-remaining", type=float, default=24 * 3600,
+                        help="剩余有效期少于该值（秒）的条目会重新生成")
+    parser.add_argument("--interest-sets", help="JSON文件，内容为兴趣组合列表，覆盖默认配置")
+    parser.add_argument("--dry-run", action="store_true", help="只统计需要生成的条目")
+    args = parser.parse_args()
+
+    interest_sets = PREGENERATE_INTEREST_SETS
+    if args.interest_sets:
+        with open(args.interest_sets, "r", encoding="utf-8") as f:
+            interest_sets = json.load(f)
+
+    counts = asyncio.run(pregenerate(
+        interest_sets,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        ttl=args.ttl,
+        min_remaining=args.min_remaining,
+        dry_run=args.dry_run
+    ))
+    print(f"[Pregenerate] 完成: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Render pool module for the travel assistant application.
+
+Runs video renders in a dedicated pool of worker processes so encoding never
+competes with the API process for the GIL. The pool is sized from the CPU
+count and the number of concurrent render jobs, so that workers × ffmpeg
+threads does not oversubscribe the host. Workers are replaced after a number
+of renders to bound memory growth from moviepy clips.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+try:
+    from .video_editor import create_video_from_images, usable_cpu_count
+except ImportError:
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from core.video_editor import create_video_from_images, usable_cpu_count
+
+
+# 取消后等待渲染进程停止的秒数；超时（如ffmpeg无响应）则结束进程
+RENDER_STOP_TIMEOUT = 30
+
+
+class RenderCancelled(Exception):
+    """Raised inside a worker when its render has been cancelled."""
+
+
+def plan_render_capacity(concurrent_jobs: int, cpu_count: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Split the host's cores between concurrent renders.
+
+    Args:
+        concurrent_jobs: Maximum number of renders running at once
+        cpu_count: Number of usable cores (defaults to the process's CPU affinity)
+
+    Returns:
+        (worker processes, ffmpeg threads per render)
+    """
+    if cpu_count is None:
+        cpu_count = usable_cpu_count()
+    workers = max(1, min(concurrent_jobs, cpu_count))
+    return workers, max(1, cpu_count // workers)
+
+
+def _render_in_worker(kwargs: Dict[str, Any], progress, cancel) -> str:
+    """Worker entry point: render and publish progress through manager proxies."""
+    last_reported = [0.0]
+
+    def report(fraction: float):
+        # 每推进1%才做一次跨进程通信
+        if fraction - last_reported[0] < 0.01 and fraction < 1.0:
+            return
+        if cancel.is_set():
+            raise RenderCancelled("渲染已取消")
+        progress.value = fraction
+        last_reported[0] = fraction
+
+    return create_video_from_images(**kwargs, progress_callback=report)
+
+
+class RenderPool:
+    """Process pool for ``create_video_from_images`` with worker recycling."""
+
+    def __init__(self, workers: int, threads: int, recycle_after: int = 10):
+        """
+        Args:
+            workers: Number of worker processes
+            threads: ffmpeg threads per render
+            recycle_after: Replace each worker process after it has run this many renders
+        """
+        self.workers = workers
+        self.threads = threads
+        self.recycle_after = recycle_after
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+
+    def render(self, progress_callback: Optional[Callable[[float], None]] = None, **kwargs) -> str:
+        """
+        Render a video in a worker process; same arguments as ``create_video_from_images``.
+
+        Blocks the calling thread while polling progress. If ``progress_callback``
+        raises (e.g. the job was cancelled), the worker is told to stop and the
+        exception is re-raised once the worker has stopped, so the caller can
+        safely remove the output files.
+
+        Returns:
+            Path to the rendered video
+        """
+        kwargs.setdefault("threads", self.threads)
+        executor, manager = self._acquire()
+        progress = manager.Value("d", 0.0)
+        cancel = manager.Event()
+        try:
+            future = executor.submit(_render_in_worker, kwargs, progress, cancel)
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise RuntimeError("渲染进程异常退出，请重试")
+
+        while True:
+            try:
+                return future.result(timeout=0.5)
+            except FutureTimeoutError:
+                pass
+            except BrokenProcessPool:
+                self._reset(executor)
+                raise RuntimeError("渲染进程异常退出（可能内存不足），请重试")
+            if progress_callback is not None:
+                try:
+                    progress_callback(progress.value)
+                except BaseException:
+                    self._stop(executor, future, cancel)
+                    raise
+
+    def shutdown(self):
+        """Stop the workers and the progress manager."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+
+    def _acquire(self):
+        with self._lock:
+            if self._manager is None:
+                self._manager = self._context.Manager()
+            if self._executor is None:
+                # 每个进程完成recycle_after个渲染后退出，由进程池补充新进程
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=self._context,
+                                                     max_tasks_per_child=self.recycle_after)
+            return self._executor, self._manager
+
+    def _reset(self, executor: ProcessPoolExecutor):
+        """Discard a broken executor; a replacement created meanwhile by another render is kept."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _stop(self, executor: ProcessPoolExecutor, future, cancel):
+        """
+        Cancel a render and wait for its worker to stop; remove the output if it still completed.
+
+        A worker that does not stop within ``RENDER_STOP_TIMEOUT`` is terminated
+        together with the rest of its executor.
+        """
+        cancel.set()
+        if future.cancel():
+            return
+        # 渲染进程在下一次进度回调时退出（ffmpeg随之结束），之后才能删除输出文件
+        try:
+            path = future.result(timeout=RENDER_STOP_TIMEOUT)
+        except FutureTimeoutError:
+            # 同一进程池中的其他渲染会因进程池异常而报错重试
+            processes = list((executor._processes or {}).values())
+            self._reset(executor)
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join(5)
+            return
+        except Exception:
+            return
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
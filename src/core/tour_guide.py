@@ -0,0 +1,161 @@
+"""
+Tour guide explanation module for the travel assistant application.
+Serves POI explanations from a persistent store with stale-while-revalidate
+semantics: stored text is returned immediately and refreshed in the
+background once it is older than the configured age.
+"""
+
+import asyncio
+import re
+import time
+import unicodedata
+from typing import Dict, Any, List, Optional
+try:
+    from ..api.openai_client import get_async_client
+    from ..config.config import (
+        TOUR_GUIDE_SYSTEM_PROMPT, TOUR_GUIDE_USER_PROMPT,
+        TOUR_EXPLANATION_STORE_PATH, TOUR_EXPLANATION_REFRESH_AFTER, TOUR_EXPLANATION_MAX_BYTES
+    )
+    from ..utils.cache import DiskCache, hash_text
+    from ..utils.concurrency import SingleFlight
+except ImportError:
+    import sys
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from api.openai_client import get_async_client
+    from config.config import (
+        TOUR_GUIDE_SYSTEM_PROMPT, TOUR_GUIDE_USER_PROMPT,
+        TOUR_EXPLANATION_STORE_PATH, TOUR_EXPLANATION_REFRESH_AFTER, TOUR_EXPLANATION_MAX_BYTES
+    )
+    from utils.cache import DiskCache, hash_text
+    from utils.concurrency import SingleFlight
+
+
+# Changing either prompt starts a new set of entries
+PROMPT_VERSION = hash_text(TOUR_GUIDE_SYSTEM_PROMPT + "\n" + TOUR_GUIDE_USER_PROMPT)[:12]
+
+
+def normalize_poi_name(poi_name: str) -> str:
+    """
+    Normalize a POI name for use as a store key.
+
+    Applies NFKC (full-width to half-width), removes whitespace and lowercases
+    Latin letters, so "故宫 博物院" and "故宫博物院" share one entry.
+
+    Args:
+        poi_name: POI name as sent by the client
+
+    Returns:
+        Normalized POI name
+    """
+    name = unicodedata.normalize("NFKC", poi_name)
+    name = re.sub(r'\s+', '', name)
+    return name.lower()
+
+
+class ExplanationStore:
+    """Persistent per-POI explanation store with background refresh."""
+
+    def __init__(self, path: str = TOUR_EXPLANATION_STORE_PATH,
+                 refresh_after: float = TOUR_EXPLANATION_REFRESH_AFTER,
+                 max_bytes: Optional[int] = TOUR_EXPLANATION_MAX_BYTES):
+        """
+        Args:
+            path: SQLite database file path
+            refresh_after: Age in seconds after which an entry is refreshed in the background
+            max_bytes: Maximum total size of stored explanations
+        """
+        self.cache = DiskCache(path, max_bytes=max_bytes)
+        # 讲解词按规范化的POI名称打标签，清除某个POI时走索引删除
+        self.cache.tag_untagged(lambda key: key.split(":", 1)[1] if ":" in key else None)
+        self.refresh_after = refresh_after
+        self._generating = SingleFlight()
+        self._refreshing = {}
+
+    @staticmethod
+    def key_for(poi_name: str) -> str:
+        """Return the store key for a POI under the current prompt version."""
+        return f"{PROMPT_VERSION}:{normalize_poi_name(poi_name)}"
+
+    async def get_explanation(self, poi_name: str) -> Dict[str, Any]:
+        """
+        Return the explanation for a POI, generating it on first request.
+
+        Args:
+            poi_name: POI name
+
+        Returns:
+            Dict with explanation, cached flag, age in seconds and refreshing flag
+        """
+        key = self.key_for(poi_name)
+        entry = await asyncio.to_thread(self.cache.get_entry, key)
+        if entry is None:
+            explanation = await self._generating.do(key, lambda: self._generate(poi_name, key))
+            return {"explanation": explanation, "cached": False, "age": 0, "refreshing": False}
+
+        age = time.time() - entry['created_at']
+        refreshing = age > self.refresh_after
+        if refreshing:
+            self._refresh_in_background(poi_name, key)
+        return {"explanation": entry['value'], "cached": True, "age": int(age), "refreshing": refreshing}
+
+    def list_entries(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """List stored explanations for the current prompt version, most recently used first."""
+        prefix = f"{PROMPT_VERSION}:"
+        return [
+            {
+                'poi': entry['key'][len(prefix):],
+                'size': entry['size'],
+                'created_at': entry['created_at'],
+                'accessed_at': entry['accessed_at']
+            }
+            for entry in self.cache.entries(prefix=prefix, limit=limit)
+        ]
+
+    def purge(self, poi_name: Optional[str] = None) -> int:
+        """
+        Remove stored explanations.
+
+        Args:
+            poi_name: Only remove this POI (all prompt versions); None removes everything
+
+        Returns:
+            Number of entries removed
+        """
+        if poi_name is None:
+            return self.cache.clear()
+        return self.cache.delete_tag(normalize_poi_name(poi_name))
+
+    async def _generate(self, poi_name: str, key: str) -> str:
+        client = get_async_client()
+        user_prompt = TOUR_GUIDE_USER_PROMPT.format(poi_name=poi_name)
+        explanation = await client.generate_response(TOUR_GUIDE_SYSTEM_PROMPT, user_prompt, use_modelscope=True)
+        if explanation:
+            await asyncio.to_thread(self.cache.set, key, explanation, tag=normalize_poi_name(poi_name))
+        return explanation
+
+    def _refresh_in_background(self, poi_name: str, key: str):
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                await self._generating.do(key, lambda: self._generate(poi_name, key))
+                print(f"[TourGuide] 讲解词已后台刷新: {poi_name}")
+            except Exception as e:
+                # 刷新失败时继续使用旧内容
+                print(f"[TourGuide] 后台刷新失败 {poi_name}: {e}")
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+        self._refreshing[key].add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+
+# Global store instance
+_store_instance = None
+
+def get_explanation_store() -> ExplanationStore:
+    """Get the global tour guide explanation store."""
+    global _store_instance
+    if _store_instance is None:
+        _store_instance = ExplanationStore()
+    return _store_instance
@@ -4,16 +4,16 @@ Contains the main business logic for travel planning functionality.
 """
 
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, AsyncIterator, Callable
 try:
-    from ..api.openai_client import get_client
-    from ..utils.helpers import clean_response, validate_inputs, safe_json_parse, format_interests, format_health_focus, is_valid_chinese_location
+    from ..api.openai_client import get_client, get_async_client
+    from ..utils.helpers import clean_response, StreamingResponseCleaner, validate_inputs, safe_json_parse, format_interests, format_health_focus, is_valid_chinese_location
 except ImportError:
     import sys
     import os
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from api.openai_client import get_client
-    from utils.helpers import clean_response, validate_inputs, safe_json_parse, format_interests, format_health_focus, is_valid_chinese_location
+    from api.openai_client import get_client, get_async_client
+    from utils.helpers import clean_response, StreamingResponseCleaner, validate_inputs, safe_json_parse, format_interests, format_health_focus, is_valid_chinese_location
 
 
 def generate_destination_recommendation(season: str, 
@@ -33,15 +33,9 @@ def generate_destination_recommendation(season: str,
         Formatted destination recommendations
     """
     # Validate inputs
-    inputs = {
-        'season': season,
-        'health_status': health_status,
-        'budget': budget
-    }
-    
-    errors = validate_inputs(inputs)
-    if errors:
-        return f"输入验证失败: {', '.join(errors.values())}"
+    error = _validate_destination_inputs(season, health_status, budget)
+    if error:
+        return error
     
     # Format interests
     interests_str = format_interests(interests)
@@ -78,19 +72,9 @@ def generate_itinerary_plan(destination: str,
         Formatted itinerary plan
     """
     # Validate inputs
-    inputs = {
-        'destination': destination,
-        'duration': duration,
-        'mobility': mobility
-    }
-    
-    errors = validate_inputs(inputs)
-    if errors:
-        return f"输入验证失败: {', '.join(errors.values())}"
-    
-    # Validate destination
-    if not is_valid_chinese_location(destination):
-        return "请输入有效的中文地名"
+    error = _validate_itinerary_inputs(destination, duration, mobility)
+    if error:
+        return error
     
     # Format health focus
     health_focus_str = format_health_focus(health_focus)
@@ -131,6 +115,251 @@ def generate_checklist(origin: str,
         HTML formatted checklist
     """
     # Validate inputs
+    error = _validate_checklist_inputs(origin, destination, duration)
+    if error:
+        return error
+    
+    try:
+        client = get_client()
+        response = client.generate_checklist(
+            origin=origin,
+            destination=destination,
+            duration=duration,
+            departure_date=departure_date,
+            special_needs=special_needs,
+            itinerary_text=itinerary_text
+        )
+        
+        return format_checklist_response(response, departure_date, origin, destination, duration)
+        
+    except Exception as e:
+        return f"抱歉，生成清单时出现了错误: {str(e)}"
+
+
+async def generate_destination_recommendation_async(season: str, 
+                                                    health_status: str, 
+                                                    budget: str, 
+                                                    interests: List[str]) -> str:
+    """
+    Async variant of :func:`generate_destination_recommendation`.
+    
+    Awaits the model call so the FastAPI event loop stays free while it runs.
+    """
+    error = _validate_destination_inputs(season, health_status, budget)
+    if error:
+        return error
+    
+    interests_str = format_interests(interests)
+    
+    try:
+        client = get_async_client()
+        response = await client.generate_destination_recommendations(
+            season=season,
+            health_status=health_status,
+            budget=budget,
+            interests=interests_str
+        )
+        
+        return clean_response(response)
+        
+    except Exception as e:
+        return f"抱歉，生成推荐时出现了错误: {str(e)}"
+
+
+async def generate_itinerary_plan_async(destination: str, 
+                                        duration: str, 
+                                        mobility: str, 
+                                        health_focus: List[str]) -> str:
+    """
+    Async variant of :func:`generate_itinerary_plan`.
+    
+    Awaits the model call so the FastAPI event loop stays free while it runs.
+    """
+    error = _validate_itinerary_inputs(destination, duration, mobility)
+    if error:
+        return error
+    
+    health_focus_str = format_health_focus(health_focus)
+    
+    try:
+        client = get_async_client()
+        response = await client.generate_itinerary_plan(
+            destination=destination,
+            duration=duration,
+            mobility=mobility,
+            health_focus=health_focus_str
+        )
+        
+        return clean_response(response)
+        
+    except Exception as e:
+        return f"抱歉，制定行程时出现了错误: {str(e)}"
+
+
+async def generate_checklist_async(origin: str, 
+                                   destination: str, 
+                                   duration: str, 
+                                   departure_date: str = "",
+                                   special_needs: str = "",
+                                   itinerary_text: str = "") -> str:
+    """
+    Async variant of :func:`generate_checklist`.
+    
+    Awaits the model call so the FastAPI event loop stays free while it runs.
+    """
+    error = _validate_checklist_inputs(origin, destination, duration)
+    if error:
+        return error
+    
+    try:
+        client = get_async_client()
+        response = await client.generate_checklist(
+            origin=origin,
+            destination=destination,
+            duration=duration,
+            departure_date=departure_date,
+            special_needs=special_needs,
+            itinerary_text=itinerary_text
+        )
+        
+        return format_checklist_response(response, departure_date, origin, destination, duration)
+        
+    except Exception as e:
+        return f"抱歉，生成清单时出现了错误: {str(e)}"
+
+
+async def stream_destination_recommendation(season: str, 
+                                            health_status: str, 
+                                            budget: str, 
+                                            interests: List[str]) -> AsyncIterator[str]:
+    """
+    Streaming variant of :func:`generate_destination_recommendation`.
+    
+    Yields cleaned text chunks as the model produces them. Validation and API
+    errors are yielded as a message, matching the non-streaming functions.
+    """
+    error = _validate_destination_inputs(season, health_status, budget)
+    if error:
+        yield error
+        return
+    
+    open_stream = lambda client: client.stream_destination_recommendations(
+        season=season,
+        health_status=health_status,
+        budget=budget,
+        interests=format_interests(interests)
+    )
+    async for chunk in _clean_stream(open_stream, "抱歉，生成推荐时出现了错误"):
+        yield chunk
+
+
+async def stream_itinerary_plan(destination: str, 
+                                duration: str, 
+                                mobility: str, 
+                                health_focus: List[str]) -> AsyncIterator[str]:
+    """
+    Streaming variant of :func:`generate_itinerary_plan`.
+    
+    Yields cleaned text chunks as the model produces them. Validation and API
+    errors are yielded as a message, matching the non-streaming functions.
+    """
+    error = _validate_itinerary_inputs(destination, duration, mobility)
+    if error:
+        yield error
+        return
+    
+    open_stream = lambda client: client.stream_itinerary_plan(
+        destination=destination,
+        duration=duration,
+        mobility=mobility,
+        health_focus=format_health_focus(health_focus)
+    )
+    async for chunk in _clean_stream(open_stream, "抱歉，制定行程时出现了错误"):
+        yield chunk
+
+
+async def stream_checklist(origin: str, 
+                           destination: str, 
+                           duration: str, 
+                           departure_date: str = "",
+                           special_needs: str = "",
+                           itinerary_text: str = "") -> AsyncIterator[str]:
+    """
+    Streaming variant of :func:`generate_checklist`.
+    
+    Yields the cleaned raw checklist text as it arrives. The caller collects it
+    and passes it to :func:`format_checklist_response` once the stream ends.
+    """
+    error = _validate_checklist_inputs(origin, destination, duration)
+    if error:
+        yield error
+        return
+    
+    open_stream = lambda client: client.stream_checklist(
+        origin=origin,
+        destination=destination,
+        duration=duration,
+        departure_date=departure_date,
+        special_needs=special_needs,
+        itinerary_text=itinerary_text
+    )
+    async for chunk in _clean_stream(open_stream, "抱歉，生成清单时出现了错误"):
+        yield chunk
+
+
+async def _clean_stream(open_stream: Callable[[Any], AsyncIterator[str]], error_prefix: str) -> AsyncIterator[str]:
+    """Open a raw model stream on the async client and apply :class:`StreamingResponseCleaner`."""
+    cleaner = StreamingResponseCleaner()
+    try:
+        async for delta in open_stream(get_async_client()):
+            chunk = cleaner.feed(delta)
+            if chunk:
+                yield chunk
+    except Exception as e:
+        yield f"{error_prefix}: {str(e)}"
+        return
+    
+    tail = cleaner.flush()
+    if tail:
+        yield tail
+
+
+def _validate_destination_inputs(season: str, health_status: str, budget: str) -> Optional[str]:
+    """Return an error message if the destination inputs are invalid, otherwise None."""
+    inputs = {
+        'season': season,
+        'health_status': health_status,
+        'budget': budget
+    }
+    
+    errors = validate_inputs(inputs)
+    if errors:
+        return f"输入验证失败: {', '.join(errors.values())}"
+    
+    return None
+
+
+def _validate_itinerary_inputs(destination: str, duration: str, mobility: str) -> Optional[str]:
+    """Return an error message if the itinerary inputs are invalid, otherwise None."""
+    inputs = {
+        'destination': destination,
+        'duration': duration,
+        'mobility': mobility
+    }
+    
+    errors = validate_inputs(inputs)
+    if errors:
+        return f"输入验证失败: {', '.join(errors.values())}"
+    
+    # Validate destination
+    if not is_valid_chinese_location(destination):
+        return "请输入有效的中文地名"
+    
+    return None
+
+
+def _validate_checklist_inputs(origin: str, destination: str, duration: str) -> Optional[str]:
+    """Return an error message if the checklist inputs are invalid, otherwise None."""
     inputs = {
         'origin': origin,
         'destination': destination,
@@ -148,27 +377,30 @@ def generate_checklist(origin: str,
     if not is_valid_chinese_location(destination):
         return "请输入有效的目的地名称"
     
-    try:
-        client = get_client()
-        response = client.generate_checklist(
-            origin=origin,
-            destination=destination,
-            duration=duration,
-            departure_date=departure_date,
-            special_needs=special_needs,
-            itinerary_text=itinerary_text
-        )
-        
-        # Parse JSON response and format as HTML
-        checklist_data = safe_json_parse(response)
-        if checklist_data:
-            return format_checklist_html(checklist_data, departure_date, origin, destination, duration)
-        else:
-            # Fallback to text formatting
-            return format_checklist_text(response)
+    return None
+
+
+def format_checklist_response(response: str, departure_date: str = "", origin: str = "", destination: str = "", duration: str = "") -> str:
+    """
+    Format a raw checklist model response as HTML.
+    
+    Args:
+        response: Raw response text from the model
+        departure_date: Departure date
+        origin: Departure location
+        destination: Travel destination
+        duration: Trip duration
         
-    except Exception as e:
-        return f"抱歉，生成清单时出现了错误: {str(e)}"
+    Returns:
+        HTML formatted checklist
+    """
+    # Parse JSON response and format as HTML
+    checklist_data = safe_json_parse(response)
+    if checklist_data:
+        return format_checklist_html(checklist_data, departure_date, origin, destination, duration)
+    else:
+        # Fallback to text formatting
+        return format_checklist_text(response)
 
 
 def format_checklist_html(data: Dict[str, Any], departure_date: str = "", origin: str = "", destination: str = "", duration: str = "") -> str:
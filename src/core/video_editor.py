@@ -7,9 +7,11 @@ import os
 import tempfile
 import re
 import sys
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable
 import moviepy.editor as mpy
 from moviepy.video.fx.all import fadein, fadeout
+from PIL import Image
+from proglog import ProgressBarLogger
 
 # Add the src directory to Python path
 src_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -18,6 +20,123 @@ if src_path not in sys.path:
 
 # Import AI client
 from api.openai_client import OpenAIClient
+from core import frame_renderer, ffmpeg_renderer, hls
+
+# Render backends for create_video_from_images: name -> (render function, supported animation types);
+# "moviepy" is the built-in fallback
+RENDER_BACKENDS = {
+    "numpy": (frame_renderer.render_slideshow, frame_renderer.SUPPORTED_ANIMATIONS),
+    "ffmpeg": (ffmpeg_renderer.render_with_filtergraph, ffmpeg_renderer.SUPPORTED_ANIMATIONS),
+}
+RENDERERS = ("numpy", "ffmpeg", "moviepy")
+
+# Render profiles: output size, x264 preset and CRF, and the highest frame rate used
+RENDER_PROFILES = {
+    "draft": {"width": 360, "height": 640, "preset": "ultrafast", "crf": 30, "max_fps": 15},
+    "standard": {"width": 720, "height": 1280, "preset": "medium", "crf": 23, "max_fps": 30},
+    "high": {"width": 1080, "height": 1920, "preset": "slow", "crf": 18, "max_fps": 30},
+}
+
+# Share of create_video_from_images progress spent rendering when HLS output is
+# requested; packaging (mostly encoding the low rendition) reports the rest
+HLS_RENDER_SHARE = 0.8
+
+# Bump whenever rendering output changes, so cached videos from older renderers are not reused
+RENDERER_VERSION = "1"
+
+
+def usable_cpu_count() -> int:
+    """Number of cores this process may run on (respects CPU affinity)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class RenderProgressLogger(ProgressBarLogger):
+    """
+    Forwards moviepy's frame counter to a progress callback.
+
+    The callback receives the fraction of frames written (0.0-1.0). It may
+    raise to abort the render, e.g. when the job has been cancelled.
+    """
+
+    def __init__(self, callback: Callable[[float], None]):
+        super().__init__()
+        # Not named "callback": ProgressLogger already defines that method
+        self.progress_callback = callback
+
+    def bars_callback(self, bar, attr, value, old_value=None):
+        # "t" is the video frame bar; audio is written first under "chunk"
+        if bar == "t" and attr == "index":
+            total = self.bars[bar].get("total") or 0
+            if total:
+                self.progress_callback(value / total)
+
+
+# EXIF Orientation -> transpose that displays the image upright
+_EXIF_TRANSPOSE = {
+    2: Image.FLIP_LEFT_RIGHT,
+    3: Image.ROTATE_180,
+    4: Image.FLIP_TOP_BOTTOM,
+    5: Image.TRANSPOSE,
+    6: Image.ROTATE_270,
+    7: Image.TRANSVERSE,
+    8: Image.ROTATE_90,
+}
+
+
+def normalize_image(
+    source: str,
+    output_path: str,
+    target_width: int = 720,
+    target_height: int = 1280
+) -> str:
+    """
+    Decode an uploaded image once and store it as an upright target-sized frame.
+
+    JPEGs are decoded with draft mode so the decoder itself downscales by up to
+    8x; the remaining scale and the center crop are done in a single resize on
+    the reduced image, before applying the EXIF orientation. The renderer then
+    uses the frame as-is without resizing again.
+    
+    Args:
+        source: Path to the uploaded image
+        output_path: Path of the normalized JPEG frame
+        target_width: Frame width
+        target_height: Frame height
+        
+    Returns:
+        output_path
+    """
+    try:
+        with Image.open(source) as img:
+            transpose = _EXIF_TRANSPOSE.get(img.getexif().get(0x0112, 1))
+            # 旋转90度的照片在原始方向上宽高互换
+            if transpose in (Image.TRANSPOSE, Image.ROTATE_270,
+                             Image.TRANSVERSE, Image.ROTATE_90):
+                width, height = target_height, target_width
+            else:
+                width, height = target_width, target_height
+
+            img.draft("RGB", (width, height))
+            if img.mode not in ("RGB", "RGBA", "L"):
+                img = img.convert("RGB")
+
+            # 按目标比例居中裁剪（cover），裁剪和缩放一次完成
+            scale = max(width / img.width, height / img.height)
+            crop_w, crop_h = width / scale, height / scale
+            left, top = (img.width - crop_w) / 2, (img.height - crop_h) / 2
+            frame = img.resize((width, height), Image.LANCZOS,
+                               box=(left, top, left + crop_w, top + crop_h), reducing_gap=3.0)
+
+        if frame.mode != "RGB":
+            frame = frame.convert("RGB")
+        if transpose is not None:
+            frame = frame.transpose(transpose)
+        frame.save(output_path, "JPEG", quality=92)
+        return output_path
+    except Exception as e:
+        raise ValueError(f"无法读取图片 {os.path.basename(source)}: {str(e)}") from e
 
 
 def validate_media_files(images: List[str], audio: Optional[str] = None) -> Dict[str, Any]:
@@ -56,6 +175,137 @@ def validate_media_files(images: List[str], audio: Optional[str] = None) -> Dict
     }
 
 
+def _render_with_moviepy(
+    images: List[str],
+    audio: Optional[str],
+    fps: int,
+    duration_per_image: float,
+    transition_duration: float,
+    animation_type: str,
+    target_width: int,
+    target_height: int,
+    threads: int,
+    progress_callback: Optional[Callable[[float], None]],
+    preset: str,
+    crf: Optional[int],
+    keyframe_interval: Optional[int],
+    output_path: Optional[str]
+) -> str:
+    """Composite the clips with moviepy; takes the same arguments as the render backends."""
+    # Create image clips with animations
+    image_clips = []
+    for i, img_path in enumerate(images):
+        # Create base image clip
+        clip = mpy.ImageClip(img_path)
+        
+        # Frames from normalize_image already have the target size
+        if (clip.w, clip.h) != (target_width, target_height):
+            # Resize and crop to fit target dimensions (maintaining aspect ratio)
+            # First, resize the image to fit within target dimensions
+            clip = clip.resize(height=target_height) if clip.h < clip.w else clip.resize(width=target_width)
+        
+        # Then, center and crop if necessary
+        if clip.w > target_width:
+            x_center = clip.w // 2
+            y_center = clip.h // 2
+            clip = clip.crop(x_center=x_center, y_center=y_center, width=target_width, height=target_height)
+        
+        # Set duration for each clip
+        clip = clip.set_duration(duration_per_image)
+        
+        # Add animations based on selected type
+        if animation_type == "fade":
+            # Fade in and out
+            clip = clip.fx(fadein, 0.5)
+            clip = clip.fx(fadeout, 0.5)
+        elif animation_type == "zoom":
+            # Zoom in effect
+            clip = clip.resize(lambda t: 1 + 0.05 * t)  # Zoom in over time
+            clip = clip.set_position("center")
+        elif animation_type == "pan":
+            # Pan effect (slow movement)
+            clip = clip.resize(1.2)  # Resize to allow panning
+            def pan_position(t):
+                # Move from left to right slowly
+                return (int(100 * t), "center")
+            clip = clip.set_position(pan_position)
+        
+        image_clips.append(clip)
+    
+    # Add transitions between clips
+    if len(image_clips) > 1:
+        # Use concatenate_videoclips with transition effect
+        # First, we'll create a list of clips with fade out for all except last
+        clips_with_transitions = []
+        
+        for i, clip in enumerate(image_clips):
+            if i < len(image_clips) - 1:
+                # Add fade out to all clips except the last one
+                clip = clip.fx(fadeout, transition_duration)
+            clips_with_transitions.append(clip)
+        
+        # Concatenate all clips
+        video = mpy.concatenate_videoclips(clips_with_transitions, method="compose")
+        
+        # Add fade in to the first clip
+        video = video.fx(fadein, transition_duration)
+    else:
+        # Only one clip, add fade in and out
+        video = image_clips[0]
+        video = video.fx(fadein, 0.5)
+        video = video.fx(fadeout, 0.5)
+    
+    # Add audio if provided
+    if audio:
+        audio_clip = mpy.AudioFileClip(audio)
+        
+        # If audio is longer than video, trim audio
+        # If audio is shorter than video, loop audio
+        if audio_clip.duration > video.duration:
+            audio_clip = audio_clip.subclip(0, video.duration)
+        elif audio_clip.duration < video.duration:
+            # Calculate how many times to loop the audio
+            loop_count = int(video.duration / audio_clip.duration) + 1
+            audio_clip = mpy.concatenate_audioclips([audio_clip] * loop_count)
+            audio_clip = audio_clip.subclip(0, video.duration)
+        
+        # Set the audio to the video
+        video = video.set_audio(audio_clip)
+    
+    # Set FPS and ensure target resolution
+    video = video.set_fps(fps)
+    video = video.resize(width=target_width, height=target_height)
+    
+    ffmpeg_params = ["-crf", str(crf)] if crf is not None else []
+    if keyframe_interval is not None:
+        ffmpeg_params += ["-g", str(keyframe_interval), "-keyint_min", str(keyframe_interval), "-sc_threshold", "0"]
+    
+    # Create temporary file to save the video unless the caller chose the location
+    if output_path is None:
+        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp:
+            output_path = tmp.name
+    
+    # Write the video file
+    video.write_videofile(
+        output_path,
+        codec="libx264",
+        audio_codec="aac",
+        threads=threads,
+        preset=preset,
+        ffmpeg_params=ffmpeg_params or None,
+        logger=RenderProgressLogger(progress_callback) if progress_callback else "bar"
+    )
+    
+    # Close all clips to release resources
+    video.close()
+    for clip in image_clips:
+        clip.close()
+    if audio:
+        audio_clip.close()
+    
+    return output_path
+
+
 def create_video_from_images(
     images: List[str],
     audio: Optional[str] = None,
@@ -64,7 +314,15 @@ def create_video_from_images(
     transition_duration: float = 0.5,
     animation_type: str = "fade",
     target_width: int = 720,
-    target_height: int = 1280  # 9:16 竖屏比例，适合手机播放
+    target_height: int = 1280,  # 9:16 竖屏比例，适合手机播放
+    threads: Optional[int] = None,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    renderer: str = "numpy",
+    preset: str = "medium",
+    crf: Optional[int] = None,
+    output_path: Optional[str] = None,
+    hls_dir: Optional[str] = None,
+    hls_low_rendition: bool = True
 ) -> str:
     """
     Create a video from images with optional audio, transitions, and animations.
@@ -76,6 +334,22 @@ def create_video_from_images(
         duration_per_image: Duration to display each image (in seconds)
         transition_duration: Duration of transitions between images (in seconds)
         animation_type: Type of animation/transition to use
+        threads: Number of ffmpeg encoder threads (defaults to the usable cores)
+        progress_callback: Optional callable receiving the fraction of frames
+            written; raising from it aborts the render
+        renderer: "numpy" pipes NumPy-generated frames into ffmpeg, "ffmpeg"
+            renders everything in one ffmpeg filtergraph (both fall back to
+            moviepy for animation types they do not support), "moviepy"
+            composites the clips with moviepy
+        preset: x264 preset
+        crf: x264 constant rate factor (None keeps the encoder default)
+        output_path: File to write (must end in .mp4); defaults to a new
+            temporary file, which the caller is responsible for removing
+        hls_dir: Optional directory for HLS output (fMP4 segments, one
+            playlist per rendition and ``master.m3u8``), written in addition
+            to the MP4; keyframes are placed on segment boundaries
+        hls_low_rendition: Add a half-resolution, lower-bitrate HLS rendition
+            so players can adapt to slow connections
         
     Returns:
         Path to the created video file
@@ -85,108 +359,37 @@ def create_video_from_images(
         validation = validate_media_files(images, audio)
         if not validation['valid']:
             raise ValueError(f"输入验证失败: {', '.join(validation['errors'])}")
+        if renderer not in RENDERERS:
+            raise ValueError(f"未知的渲染方式: {renderer}")
+        threads = threads or usable_cpu_count()
         
-        # Create image clips with animations
-        image_clips = []
-        for i, img_path in enumerate(images):
-            # Create base image clip
-            clip = mpy.ImageClip(img_path)
-            
-            # Resize and crop to fit target dimensions (maintaining aspect ratio)
-            # First, resize the image to fit within target dimensions
-            clip = clip.resize(height=target_height) if clip.h < clip.w else clip.resize(width=target_width)
-            
-            # Then, center and crop if necessary
-            if clip.w > target_width:
-                x_center = clip.w // 2
-                y_center = clip.h // 2
-                clip = clip.crop(x_center=x_center, y_center=y_center, width=target_width, height=target_height)
-            
-            # Set duration for each clip
-            clip = clip.set_duration(duration_per_image)
-            
-            # Add animations based on selected type
-            if animation_type == "fade":
-                # Fade in and out
-                clip = clip.fx(fadein, 0.5)
-                clip = clip.fx(fadeout, 0.5)
-            elif animation_type == "zoom":
-                # Zoom in effect
-                clip = clip.resize(lambda t: 1 + 0.05 * t)  # Zoom in over time
-                clip = clip.set_position("center")
-            elif animation_type == "pan":
-                # Pan effect (slow movement)
-                clip = clip.resize(1.2)  # Resize to allow panning
-                def pan_position(t):
-                    # Move from left to right slowly
-                    return (int(100 * t), "center")
-                clip = clip.set_position(pan_position)
-            
-            image_clips.append(clip)
+        backend, supported = RENDER_BACKENDS.get(renderer, (None, ()))
+        if animation_type not in supported:
+            backend = _render_with_moviepy
         
-        # Add transitions between clips
-        if len(image_clips) > 1:
-            # Use concatenate_videoclips with transition effect
-            # First, we'll create a list of clips with fade out for all except last
-            clips_with_transitions = []
-            
-            for i, clip in enumerate(image_clips):
-                if i < len(image_clips) - 1:
-                    # Add fade out to all clips except the last one
-                    clip = clip.fx(fadeout, transition_duration)
-                clips_with_transitions.append(clip)
-            
-            # Concatenate all clips
-            video = mpy.concatenate_videoclips(clips_with_transitions, method="compose")
-            
-            # Add fade in to the first clip
-            video = video.fx(fadein, transition_duration)
-        else:
-            # Only one clip, add fade in and out
-            video = image_clips[0]
-            video = video.fx(fadein, 0.5)
-            video = video.fx(fadeout, 0.5)
-        
-        # Add audio if provided
-        if audio:
-            audio_clip = mpy.AudioFileClip(audio)
-            
-            # If audio is longer than video, trim audio
-            # If audio is shorter than video, loop audio
-            if audio_clip.duration > video.duration:
-                audio_clip = audio_clip.subclip(0, video.duration)
-            elif audio_clip.duration < video.duration:
-                # Calculate how many times to loop the audio
-                loop_count = int(video.duration / audio_clip.duration) + 1
-                audio_clip = mpy.concatenate_audioclips([audio_clip] * loop_count)
-                audio_clip = audio_clip.subclip(0, video.duration)
-            
-            # Set the audio to the video
-            video = video.set_audio(audio_clip)
+        render_progress = progress_callback
+        if hls_dir is not None and progress_callback is not None:
+            # The HLS step reports the remaining share of the progress
+            render_progress = lambda fraction: progress_callback(fraction * HLS_RENDER_SHARE)
         
-        # Set FPS and ensure target resolution
-        video = video.set_fps(fps)
-        video = video.resize(width=target_width, height=target_height)
-        
-        # Create temporary file to save the video
-        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as tmp:
-            output_path = tmp.name
-        
-        # Write the video file
-        video.write_videofile(
-            output_path,
-            codec="libx264",
-            audio_codec="aac",
-            threads=4,
-            preset="medium"
+        output_path = backend(
+            images, audio, fps=fps, duration_per_image=duration_per_image,
+            transition_duration=transition_duration, animation_type=animation_type,
+            target_width=target_width, target_height=target_height,
+            threads=threads, progress_callback=render_progress, preset=preset, crf=crf,
+            keyframe_interval=hls.keyframe_interval(fps) if hls_dir is not None else None,
+            output_path=output_path
         )
         
-        # Close all clips to release resources
-        video.close()
-        for clip in image_clips:
-            clip.close()
-        if audio:
-            audio_clip.close()
+        if hls_dir is not None:
+            hls.package_hls(
+                output_path, hls_dir, target_width, target_height, fps,
+                duration=len(images) * duration_per_image, has_audio=bool(audio),
+                low_rendition=hls_low_rendition, threads=threads, preset=preset,
+                progress_callback=(lambda fraction: progress_callback(
+                    HLS_RENDER_SHARE + (1.0 - HLS_RENDER_SHARE) * fraction
+                )) if progress_callback is not None else None
+            )
         
         return output_path
         
@@ -197,8 +400,17 @@ def create_video_from_images(
 def create_ai_video(
     images: List[str],
     audio: Optional[str] = None,
-    target_width: int = 720,
-    target_height: int = 1280
+    target_width: Optional[int] = None,
+    target_height: Optional[int] = None,
+    progress_callback: Optional[Callable[[str, float], None]] = None,
+    render: Optional[Callable[..., str]] = None,
+    renderer: str = "numpy",
+    profile: str = "standard",
+    preview_callback: Optional[Callable[[str], None]] = None,
+    output_path: Optional[str] = None,
+    preview_path: Optional[str] = None,
+    hls_dir: Optional[str] = None,
+    hls_low_rendition: bool = True
 ) -> Dict[str, Any]:
     """
     Create a video using AI to analyze images and generate a script.
@@ -206,8 +418,25 @@ def create_ai_video(
     Args:
         images: List of image file paths
         audio: Optional audio file path
-        target_width: Target video width
-        target_height: Target video height
+        target_width: Target video width (defaults to the profile's width)
+        target_height: Target video height (defaults to the profile's height)
+        progress_callback: Optional callable receiving (stage, overall progress);
+            raising from it aborts the pipeline
+        render: Optional replacement for ``create_video_from_images`` with the
+            same signature (e.g. ``RenderPool.render`` to render in a worker process)
+        renderer: Render backend passed to ``create_video_from_images``
+            ("numpy", "ffmpeg" or "moviepy")
+        profile: Render profile name from RENDER_PROFILES
+        preview_callback: Optional callable receiving the path of a quick
+            "draft" preview, rendered before the full-quality video; the
+            callee takes ownership of the file
+        output_path: File the final video is rendered into (defaults to a
+            temporary file)
+        preview_path: File the preview is rendered into (defaults to a
+            temporary file)
+        hls_dir: Optional directory for HLS output of the final video (see
+            ``create_video_from_images``)
+        hls_low_rendition: Add a lower-bitrate HLS rendition
         
     Returns:
         Dict with video path and generated script
@@ -220,26 +449,59 @@ def create_ai_video(
         validation = validate_media_files(images, audio)
         if not validation['valid']:
             raise ValueError(f"输入验证失败: {', '.join(validation['errors'])}")
+        if profile not in RENDER_PROFILES:
+            raise ValueError(f"未知的渲染档位: {profile}")
+        
+        report = progress_callback or (lambda stage, progress: None)
+        render = render or create_video_from_images
         
         # Initialize AI client
         ai_client = OpenAIClient()
         
         # Step 1: Analyze images using Qwen3-VL model
+        report("analyzing", 0.0)
         image_descriptions = ai_client.analyze_images(images)
         
         # Step 2: Generate video script based on image descriptions
+        report("scripting", 0.3)
         video_script = ai_client.generate_video_script(image_descriptions, audio)
         
         # Step 3: Parse the script to extract video parameters
         video_params = parse_video_script(video_script)
         
+        def render_profile(name: str, stage: str, start: float, span: float, width: int, height: int,
+                           path: Optional[str], **outputs) -> str:
+            settings = RENDER_PROFILES[name]
+            report(stage, start)
+            return render(
+                images=images,
+                audio=audio,
+                **{**video_params, 'fps': min(video_params['fps'], settings['max_fps'])},
+                target_width=width,
+                target_height=height,
+                progress_callback=lambda fraction: report(stage, start + span * fraction),
+                renderer=renderer,
+                preset=settings['preset'],
+                crf=settings['crf'],
+                output_path=path,
+                **outputs
+            )
+        
         # Step 4: Create video using the extracted parameters
-        video_path = create_video_from_images(
-            images=images,
-            audio=audio,
-            **video_params,
-            target_width=target_width,
-            target_height=target_height
+        # (rendering covers the remaining 60% of the overall progress; a
+        # preview, when requested, takes the first 10% of it)
+        start = 0.4
+        if preview_callback is not None and profile != "draft":
+            draft = RENDER_PROFILES["draft"]
+            preview_callback(render_profile("draft", "previewing", 0.4, 0.1, draft['width'], draft['height'],
+                                            preview_path))
+            start = 0.5
+        video_path = render_profile(
+            profile, "rendering", start, 1.0 - start,
+            target_width or RENDER_PROFILES[profile]['width'],
+            target_height or RENDER_PROFILES[profile]['height'],
+            output_path,
+            **({'hls_dir': hls_dir, 'hls_low_rendition': hls_low_rendition} if hls_dir is not None else {})
         )
         
         return {
@@ -0,0 +1,302 @@
+"""
+POI spatial index module for the travel assistant application.
+
+Builds a compact, array-backed grid index from a local POI dataset (CSV, or
+Parquet when ``pyarrow`` is installed) and answers radius queries with
+haversine filtering. Rows are sorted by grid cell, so every latitude row of
+the query window maps to one contiguous slice of the arrays. The index is a
+directory of ``.npy`` files opened with ``mmap_mode="r"``, which lets every
+worker process share the same pages.
+
+Usage:
+    python src/data/poi_index.py build pois.csv data/poi_index [--cell-size 0.01]
+    python src/data/poi_index.py query data/poi_index 116.397 39.908 --radius 1000
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+try:
+    from ..config.config import POI_INDEX_PATH, POI_INDEX_CELL_SIZE
+except ImportError:
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from config.config import POI_INDEX_PATH, POI_INDEX_CELL_SIZE
+
+
+EARTH_RADIUS = 6371008.8  # 地球平均半径（米）
+INDEX_VERSION = 1
+STRING_COLUMNS = ("id", "name", "address")
+
+
+def _cell_row(lat, cell_size: float):
+    return np.floor((np.asarray(lat) + 90.0) / cell_size).astype(np.int64)
+
+
+def _cell_col(lng, cell_size: float):
+    return np.floor((np.asarray(lng) + 180.0) / cell_size).astype(np.int64)
+
+
+def _read_rows(path: str) -> Iterable[Dict[str, Any]]:
+    """Yield POI rows from a CSV or Parquet file."""
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("读取Parquet需要安装pyarrow: pip install pyarrow")
+        table = pq.read_table(path)
+        columns = table.to_pydict()
+        for i in range(table.num_rows):
+            yield {name: values[i] for name, values in columns.items()}
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            yield from csv.DictReader(f)
+
+
+def _pack_strings(values: List[str], order: np.ndarray, directory: str, column: str):
+    """Store strings as one UTF-8 blob plus int64 offsets, in index order."""
+    encoded = [values[i].encode("utf-8") for i in order]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    np.save(os.path.join(directory, f"{column}_offsets.npy"), offsets)
+    np.save(os.path.join(directory, f"{column}_blob.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+
+def build_index(source: str, directory: str, cell_size: float = POI_INDEX_CELL_SIZE) -> int:
+    """
+    Build a POI index directory from a dataset file.
+
+    The dataset needs ``name``, ``lng`` and ``lat`` columns; ``id``, ``type``
+    and ``address`` are optional. Rows with missing or out-of-range
+    coordinates are skipped.
+
+    Args:
+        source: CSV or Parquet file path
+        directory: Output directory
+        cell_size: Grid cell size in degrees
+
+    Returns:
+        Number of indexed POIs
+    """
+    lats, lngs, type_codes = [], [], []
+    strings = {column: [] for column in STRING_COLUMNS}
+    types: Dict[str, int] = {}
+
+    for row in _read_rows(source):
+        try:
+            lng, lat = float(row["lng"]), float(row["lat"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+            continue
+        lats.append(lat)
+        lngs.append(lng)
+        type_codes.append(types.setdefault(row.get("type") or "", len(types)))
+        for column in STRING_COLUMNS:
+            strings[column].append(str(row.get(column) or ""))
+        if not strings["id"][-1]:
+            strings["id"][-1] = str(len(lats))
+
+    lat_array = np.asarray(lats, dtype=np.float64)
+    lng_array = np.asarray(lngs, dtype=np.float64)
+    ncols = math.ceil(360.0 / cell_size) + 1
+    keys = _cell_row(lat_array, cell_size) * ncols + _cell_col(lng_array, cell_size)
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+
+    # 每个非空网格的键和起始行号（末尾附加总行数作为哨兵）
+    cell_keys, cell_starts = np.unique(keys, return_index=True)
+    cell_starts = np.append(cell_starts, len(keys)).astype(np.int64)
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "lat.npy"), lat_array[order])
+    np.save(os.path.join(directory, "lng.npy"), lng_array[order])
+    np.save(os.path.join(directory, "type.npy"), np.asarray(type_codes, dtype=np.int32)[order])
+    np.save(os.path.join(directory, "cell_keys.npy"), cell_keys.astype(np.int64))
+    np.save(os.path.join(directory, "cell_starts.npy"), cell_starts)
+    for column in STRING_COLUMNS:
+        _pack_strings(strings[column], order, directory, column)
+
+    meta = {
+        "version": INDEX_VERSION,
+        "count": len(lats),
+        "cell_size": cell_size,
+        "ncols": ncols,
+        "types": sorted(types, key=types.get)
+    }
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    return len(lats)
+
+
+class POIIndex:
+    """Memory-mapped grid index over POI coordinates."""
+
+    def __init__(self, directory: str):
+        """
+        Open an index directory built by :func:`build_index`.
+
+        Args:
+            directory: Index directory
+        """
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"POI索引版本不匹配: {meta.get('version')}，请重新构建")
+
+        def load(name: str) -> np.ndarray:
+            # 以普通ndarray视图使用内存映射，避免np.memmap逐次索引的额外开销
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r").view(np.ndarray)
+
+        self.cell_size = meta["cell_size"]
+        self.ncols = meta["ncols"]
+        self.types = meta["types"]
+        self._type_codes = {name: code for code, name in enumerate(self.types)}
+        self.lat = load("lat")
+        self.lng = load("lng")
+        self.type = load("type")
+        self.cell_keys = load("cell_keys")
+        self.cell_starts = load("cell_starts")
+        self._strings = {
+            column: (load(f"{column}_offsets"), memoryview(load(f"{column}_blob")))
+            for column in STRING_COLUMNS
+        }
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def query(self, lng: float, lat: float, radius: float,
+              types: Optional[List[str]] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Find POIs within ``radius`` metres, nearest first.
+
+        Args:
+            lng: Longitude of the centre
+            lat: Latitude of the centre
+            radius: Search radius in metres
+            types: Only return POIs of these types (None = all)
+            limit: Maximum number of results
+
+        Returns:
+            List of dicts with id, name, type, lng, lat, address and distance (metres)
+        """
+        candidates = self._candidates(lng, lat, radius)
+        if types is not None:
+            codes = [self._type_codes[t] for t in types if t in self._type_codes]
+            candidates = candidates[np.isin(self.type[candidates], codes)]
+        if len(candidates) == 0 or limit <= 0:
+            return []
+
+        distances = self._haversine(lng, lat, self.lng[candidates], self.lat[candidates])
+        within = distances <= radius
+        candidates, distances = candidates[within], distances[within]
+        if len(candidates) > limit:
+            nearest = np.argpartition(distances, limit - 1)[:limit]
+            candidates, distances = candidates[nearest], distances[nearest]
+        order = np.argsort(distances, kind="stable")
+        candidates, distances = candidates[order], distances[order]
+
+        columns = {column: self._strings_at(column, candidates) for column in STRING_COLUMNS}
+        return [
+            {
+                "id": columns["id"][k],
+                "name": columns["name"][k],
+                "type": self.types[type_code],
+                "lng": lng_value,
+                "lat": lat_value,
+                "address": columns["address"][k],
+                "distance": round(distance, 1)
+            }
+            for k, (type_code, lng_value, lat_value, distance) in enumerate(zip(
+                self.type[candidates].tolist(), self.lng[candidates].tolist(),
+                self.lat[candidates].tolist(), distances.tolist()
+            ))
+        ]
+
+    def _candidates(self, lng: float, lat: float, radius: float) -> np.ndarray:
+        """Row numbers in the grid cells covering the query circle's bounding box."""
+        if radius <= 0:
+            return np.empty(0, dtype=np.int64)
+        dlat = math.degrees(radius / EARTH_RADIUS)
+        dlng = min(dlat / max(math.cos(math.radians(lat)), 1e-6), 180.0)
+
+        rows = np.arange(_cell_row(max(lat - dlat, -90.0), self.cell_size),
+                         _cell_row(min(lat + dlat, 90.0), self.cell_size) + 1)
+        col_lo = max(int(_cell_col(lng - dlng, self.cell_size)), 0)
+        col_hi = min(int(_cell_col(lng + dlng, self.cell_size)), self.ncols - 1)
+
+        # 同一纬度行内相邻网格的键连续，对应排序后数组中的一段
+        lo = np.searchsorted(self.cell_keys, rows * self.ncols + col_lo, side="left")
+        hi = np.searchsorted(self.cell_keys, rows * self.ncols + col_hi, side="right")
+        starts, ends = self.cell_starts[lo], self.cell_starts[hi]
+        nonempty = ends > starts
+        if not nonempty.any():
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(s, e) for s, e in zip(starts[nonempty], ends[nonempty])])
+
+    @staticmethod
+    def _haversine(lng: float, lat: float, lngs: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        lat1, lat2 = math.radians(lat), np.radians(lats)
+        dlat = lat2 - lat1
+        dlng = np.radians(lngs) - math.radians(lng)
+        a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+        return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def _strings_at(self, column: str, rows: np.ndarray) -> List[str]:
+        offsets, blob = self._strings[column]
+        return [
+            str(blob[start:end], "utf-8")
+            for start, end in zip(offsets[rows].tolist(), offsets[rows + 1].tolist())
+        ]
+
+
+# Global index instance (None when no dataset has been built)
+_index_instance = None
+_index_loaded = False
+
+def get_poi_index() -> Optional[POIIndex]:
+    """Get the global POI index, or None if ``POI_INDEX_PATH`` has not been built."""
+    global _index_instance, _index_loaded
+    if not _index_loaded:
+        _index_loaded = True
+        if os.path.exists(os.path.join(POI_INDEX_PATH, "meta.json")):
+            _index_instance = POIIndex(POI_INDEX_PATH)
+            print(f"[POI] 已加载POI索引: {POI_INDEX_PATH}，共 {len(_index_instance)} 条")
+        else:
+            print(f"[POI] 未找到POI索引 {POI_INDEX_PATH}，使用示例数据")
+    return _index_instance
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="构建或查询POI空间索引")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="从CSV/Parquet构建索引")
+    build.add_argument("source", help="POI数据文件（需包含name、lng、lat列，可选id、type、address）")
+    build.add_argument("directory", nargs="?", default=POI_INDEX_PATH, help="索引输出目录")
+    build.add_argument("--cell-size", type=float, default=POI_INDEX_CELL_SIZE, help="网格边长（度）")
+
+    query = subparsers.add_parser("query", help="查询索引")
+    query.add_argument("directory", help="索引目录")
+    query.add_argument("lng", type=float)
+    query.add_argument("lat", type=float)
+    query.add_argument("--radius", type=float, default=1000, help="半径（米）")
+    query.add_argument("--type", action="append", help="POI类型，可重复")
+    query.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args()
+    if args.command == "build":
+        count = build_index(args.source, args.directory, args.cell_size)
+        print(f"[POI] 索引构建完成: {args.directory}，共 {count} 条")
+    else:
+        for poi in POIIndex(args.directory).query(args.lng, args.lat, args.radius, args.type, args.limit):
+            print(f"{poi['distance']:>9.1f}m  {poi['name']}  [{poi['type']}]  {poi['address']}")
+
+
+if __name__ == "__main__":
+    main()
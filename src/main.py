@@ -5,8 +5,6 @@ This module creates and launches the Gradio application.
 
 import gradio as gr
 import os
-import tempfile
-import shutil
 from typing import Optional, Dict, Any, List
 
 # Import modules
@@ -226,19 +224,8 @@ def create_app() -> gr.Blocks:
                 if not video_path or not os.path.exists(video_path):
                     return None
                 
-                try:
-                    # Create a temporary file for download
-                    with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False, dir=tempfile.gettempdir()) as tmp:
-                        download_path = tmp.name
-                    
-                    # Copy file to ensure permissions are correct
-                    shutil.copy2(video_path, download_path)
-                    
-                    # Return the file object for download
-                    return gr.File(value=download_path, label="旅行视频.mp4")
-                except Exception as e:
-                    print(f"下载视频时出错: {str(e)}")
-                    return None
+                # Serve the rendered file itself; Gradio streams it from disk, no per-click copy
+                return gr.File(value=video_path, label="旅行视频.mp4")
             
             video_section['download_button'].click(
                 fn=handle_download,
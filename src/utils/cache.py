@@ -0,0 +1,294 @@
+"""
+Disk-backed cache module for the travel assistant application.
+Provides a small SQLite key/value store with TTL, size-bounded LRU eviction
+and hit/miss counters, shared by every worker process on the host.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Build a canonical cache key from arbitrary JSON-serializable parts.
+
+    Dictionaries are serialized with sorted keys so that logically equal
+    inputs always map to the same key.
+
+    Args:
+        parts: Values that identify the cached item
+
+    Returns:
+        Hex SHA-256 digest of the canonical JSON encoding
+    """
+    canonical = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    """Return the hex SHA-256 digest of a text, e.g. a system prompt."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    """
+    SQLite-backed text cache with TTL and LRU eviction by total size.
+
+    The database runs in WAL mode so several uvicorn workers can share one
+    file. Hit and miss counters are kept per process.
+    """
+
+    def __init__(self, path: str, default_ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        """
+        Open (or create) a disk cache.
+
+        Args:
+            path: SQLite database file path
+            default_ttl: Default time-to-live in seconds (None = never expires)
+            max_bytes: Maximum total size of stored values (None = unbounded)
+        """
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                expires_at REAL,
+                tag TEXT
+            )
+        """)
+        # 早期创建的数据库没有tag列
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(entries)")]
+        if "tag" not in columns:
+            self._conn.execute("ALTER TABLE entries ADD COLUMN tag TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries (expires_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_tag ON entries (tag)")
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a value and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        entry = self.get_entry(key)
+        return entry['value'] if entry else None
+
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an entry with its metadata and mark it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Dict with value, created_at, accessed_at and expires_at, or None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._select(key)
+            if entry and entry['expires_at'] is not None and entry['expires_at'] <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            entry['accessed_at'] = now
+            return entry
+
+    def peek(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return an entry's metadata without counting a hit or refreshing its LRU position."""
+        with self._lock:
+            return self._select(key)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None, tag: Optional[str] = None):
+        """
+        Store a value, evicting least recently used entries if over budget.
+
+        Args:
+            key: Cache key
+            value: Text to store
+            ttl: Time-to-live in seconds (defaults to ``default_ttl``)
+            tag: Optional indexed label for deleting related entries together
+        """
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl else None
+        size = len(value.encode('utf-8'))
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at, expires_at, tag) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, value, size, now, now, expires_at, tag)
+            )
+            if self.max_bytes is not None:
+                self._evict(now)
+
+    def delete(self, key: str) -> bool:
+        """Delete an entry. Returns True if it existed."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return cursor.rowcount > 0
+
+    def delete_tag(self, tag: str) -> int:
+        """Delete all entries stored with ``tag``. Returns the number removed."""
+        with self._lock:
+            return self._conn.execute("DELETE FROM entries WHERE tag = ?", (tag,)).rowcount
+
+    def tag_untagged(self, tag_for: Callable[[str], Optional[str]]) -> int:
+        """
+        Assign tags to entries stored without one (e.g. before tags were used).
+
+        Args:
+            tag_for: Returns the tag for a key, or None to leave it untagged
+
+        Returns:
+            Number of entries tagged
+        """
+        with self._lock:
+            keys = [row[0] for row in self._conn.execute("SELECT key FROM entries WHERE tag IS NULL")]
+            tags = [(tag_for(key), key) for key in keys]
+            tags = [pair for pair in tags if pair[0] is not None]
+            self._conn.executemany("UPDATE entries SET tag = ? WHERE key = ?", tags)
+        return len(tags)
+
+    def entries(self, prefix: str = "", limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        List entry metadata, most recently used first.
+
+        Args:
+            prefix: Only list keys starting with this prefix
+            limit: Maximum number of entries to return
+
+        Returns:
+            List of dicts with key, size, created_at, accessed_at and expires_at
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, size, created_at, accessed_at, expires_at FROM entries "
+                "WHERE substr(key, 1, ?) = ? ORDER BY accessed_at DESC LIMIT ?",
+                (len(prefix), prefix, limit)
+            ).fetchall()
+        return [
+            {'key': r[0], 'size': r[1], 'created_at': r[2], 'accessed_at': r[3], 'expires_at': r[4]}
+            for r in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count, total size and this process's hit/miss counters."""
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'path': self.path,
+            'entries': count,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def clear(self) -> int:
+        """Remove every entry. Returns the number removed."""
+        with self._lock:
+            return self._conn.execute("DELETE FROM entries").rowcount
+
+    def _select(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            "SELECT value, created_at, accessed_at, expires_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'value': row[0], 'created_at': row[1], 'accessed_at': row[2], 'expires_at': row[3]}
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones until under ``max_bytes``."""
+        self._conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at ASC"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+
+# Global response cache instance
+_response_cache = None
+
+def get_response_cache() -> Optional[DiskCache]:
+    """Get the global model response cache, or None if caching is disabled."""
+    global _response_cache
+    if _response_cache is None:
+        try:
+            from ..config.config import (
+                RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_PATH, RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_BYTES
+            )
+        except ImportError:
+            from config.config import (
+                RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_PATH, RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_BYTES
+            )
+        if not RESPONSE_CACHE_ENABLED:
+            return None
+        _response_cache = DiskCache(RESPONSE_CACHE_PATH, default_ttl=RESPONSE_CACHE_TTL,
+                                    max_bytes=RESPONSE_CACHE_MAX_BYTES)
+    return _response_cache
+
+
+# Global image description cache instance
+_image_description_cache = None
+
+def get_image_description_cache() -> Optional[DiskCache]:
+    """Get the global image description cache, or None if caching is disabled."""
+    global _image_description_cache
+    if _image_description_cache is None:
+        try:
+            from ..config.config import (
+                RESPONSE_CACHE_ENABLED, IMAGE_DESCRIPTION_CACHE_PATH, IMAGE_DESCRIPTION_CACHE_TTL,
+                IMAGE_DESCRIPTION_CACHE_MAX_BYTES
+            )
+        except ImportError:
+            from config.config import (
+                RESPONSE_CACHE_ENABLED, IMAGE_DESCRIPTION_CACHE_PATH, IMAGE_DESCRIPTION_CACHE_TTL,
+                IMAGE_DESCRIPTION_CACHE_MAX_BYTES
+            )
+        if not RESPONSE_CACHE_ENABLED:
+            return None
+        _image_description_cache = DiskCache(IMAGE_DESCRIPTION_CACHE_PATH, default_ttl=IMAGE_DESCRIPTION_CACHE_TTL,
+                                             max_bytes=IMAGE_DESCRIPTION_CACHE_MAX_BYTES)
+    return _image_description_cache
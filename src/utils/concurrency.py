@@ -0,0 +1,80 @@
+"""
+Concurrency utilities module for the travel assistant application.
+Contains asyncio helpers for rate limiting and bounding upstream calls.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+
+class AsyncRateLimiter:
+    """
+    Spaces out calls so that at most ``rate`` of them start per second.
+
+    Callers await :meth:`acquire` before each upstream request. Slots are
+    handed out in order, so bursts are smoothed rather than rejected.
+    """
+
+    def __init__(self, rate: float):
+        """
+        Args:
+            rate: Maximum number of calls started per second
+        """
+        if rate <= 0:
+            raise ValueError("rate必须大于0")
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until the next call slot is available."""
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one upstream call.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same task and receive its result (or exception).
+    The task is shielded, so a caller that disconnects does not cancel the
+    call for everyone else. Keys are forgotten as soon as the call finishes.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``func`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the call
+            func: Zero-argument coroutine factory performing the call
+
+        Returns:
+            The shared result of ``func``
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        """Return the number of distinct calls currently running."""
+        return len(self._calls)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every caller went away
+        if not task.cancelled():
+            task.exception()
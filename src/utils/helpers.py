@@ -38,6 +38,64 @@ def clean_response(response_text: str) -> str:
     return response_text
 
 
+class StreamingResponseCleaner:
+    """
+    Incremental counterpart of :func:`clean_response` for streamed responses.
+    
+    Chunks are fed as they arrive from the model. Text that could still be part
+    of a code fence or a run of blank lines is held back until the next chunk
+    decides it, so the concatenated output equals ``clean_response`` applied to
+    the full text.
+    """
+    
+    _FENCE_PREFIXES = tuple('```json'[:i] for i in range(7, 0, -1))
+    
+    def __init__(self):
+        self._pending = ""
+        self._started = False
+    
+    def feed(self, chunk: str) -> str:
+        """
+        Add a chunk of raw model output.
+        
+        Args:
+            chunk: Raw text delta from the model
+            
+        Returns:
+            Cleaned text that is safe to emit now (may be empty)
+        """
+        text = self._pending + chunk
+        
+        # Hold back trailing whitespace/backticks and any partial ```json fence
+        cut = len(text)
+        while True:
+            new_cut = len(text[:cut].rstrip(' \t\r\n`'))
+            for prefix in self._FENCE_PREFIXES:
+                if text[:new_cut].endswith(prefix):
+                    new_cut -= len(prefix)
+                    break
+            if new_cut == cut:
+                break
+            cut = new_cut
+        
+        self._pending = text[cut:]
+        return self._emit(text[:cut])
+    
+    def flush(self) -> str:
+        """Return the remaining cleaned text at the end of the stream."""
+        text, self._pending = self._pending, ""
+        return self._emit(text).rstrip()
+    
+    def _emit(self, text: str) -> str:
+        text = re.sub(r'```json\n?', '', text)
+        text = re.sub(r'\n?```', '', text)
+        text = re.sub(r'\n{3,}', '\n\n', text)
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+
 def validate_inputs(inputs: Dict[str, Any]) -> Dict[str, str]:
     """
     Validate user inputs for safety and correctness.
@@ -104,6 +162,9 @@ def format_interests(interests: List[str]) -> str:
     """
     Format interests list into a readable string.
     
+    Interests are de-duplicated and sorted so that the same selection always
+    produces the same prompt (and therefore the same response cache key).
+    
     Args:
         interests: List of interest strings
         
@@ -113,13 +174,15 @@ def format_interests(interests: List[str]) -> str:
     if not interests:
         return "暂无特别偏好"
     
-    return "、".join(interests)
+    return "、".join(sorted(set(interests)))
 
 
 def format_health_focus(health_focus: List[str]) -> str:
     """
     Format health focus list into a readable string.
     
+    Health focuses are de-duplicated and sorted, like :func:`format_interests`.
+    
     Args:
         health_focus: List of health focus strings
         
@@ -129,7 +192,7 @@ def format_health_focus(health_focus: List[str]) -> str:
     if not health_focus:
         return "暂无特别关注点"
     
-    return "、".join(health_focus)
+    return "、".join(sorted(set(health_focus)))
 
 
 def sanitize_filename(filename: str) -> str:
@@ -0,0 +1,218 @@
+"""
+Shared HTTP client module for the travel assistant application.
+Keeps long-lived ``httpx.AsyncClient`` instances with keep-alive connection
+pools (HTTP/2 when the ``h2`` package is installed) and records per-host
+request and connection metrics, so pool limits can be sized from real traffic.
+Synchronous callers running in worker threads share ``httpx.Client`` pools.
+"""
+
+import importlib.util
+import threading
+import time
+from typing import Any, Dict, Optional
+import httpx
+try:
+    from ..config.config import (
+        HTTP_POOL_MAX_CONNECTIONS, HTTP_POOL_MAX_KEEPALIVE, HTTP_POOL_KEEPALIVE_EXPIRY, HTTP_CLIENT_HTTP2
+    )
+except ImportError:
+    from config.config import (
+        HTTP_POOL_MAX_CONNECTIONS, HTTP_POOL_MAX_KEEPALIVE, HTTP_POOL_KEEPALIVE_EXPIRY, HTTP_CLIENT_HTTP2
+    )
+
+
+def http2_available() -> bool:
+    """Return True if the optional ``h2`` package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps an ``httpx.AsyncHTTPTransport`` and counts requests per host.
+
+    New TCP connections are counted through the httpcore ``trace`` extension,
+    so ``requests - connections_opened`` is the number of requests that
+    reused a pooled connection. Timings cover the period until response
+    headers arrive; streamed bodies are not included.
+    """
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport, http2: bool = False):
+        self._transport = transport
+        self.http2 = http2
+        self.hosts: Dict[str, Dict[str, Any]] = {}
+
+    def _host_stats(self, host: str) -> Dict[str, Any]:
+        if host not in self.hosts:
+            self.hosts[host] = {
+                'requests': 0,
+                'errors': 0,
+                'in_flight': 0,
+                'max_in_flight': 0,
+                'connections_opened': 0,
+                'total_seconds': 0.0
+            }
+        return self.hosts[host]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stats = self._host_stats(request.url.host)
+        previous_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: Dict[str, Any]):
+            if event_name == "connection.connect_tcp.complete":
+                stats['connections_opened'] += 1
+            if previous_trace is not None:
+                await previous_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        stats['requests'] += 1
+        stats['in_flight'] += 1
+        stats['max_in_flight'] = max(stats['max_in_flight'], stats['in_flight'])
+        start = time.perf_counter()
+        try:
+            return await self._transport.handle_async_request(request)
+        except Exception:
+            stats['errors'] += 1
+            raise
+        finally:
+            stats['in_flight'] -= 1
+            stats['total_seconds'] += time.perf_counter() - start
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+    def pool_connections(self) -> Dict[str, Dict[str, int]]:
+        """
+        Return open and idle connection counts per host.
+
+        Reads the httpcore pool behind the transport; returns an empty dict if
+        its layout is not the expected one.
+        """
+        pool = getattr(self._transport, "_pool", None)
+        result: Dict[str, Dict[str, int]] = {}
+        for connection in getattr(pool, "connections", []):
+            origin = getattr(connection, "_origin", None)
+            host = origin.host.decode("ascii") if origin is not None else "unknown"
+            counts = result.setdefault(host, {'open': 0, 'idle': 0})
+            counts['open'] += 1
+            if connection.is_idle():
+                counts['idle'] += 1
+        return result
+
+
+# Named application-lifetime clients
+_clients: Dict[str, httpx.AsyncClient] = {}
+_sync_clients: Dict[str, httpx.Client] = {}
+_sync_lock = threading.Lock()
+
+
+def get_http_client(name: str,
+                    max_connections: int = HTTP_POOL_MAX_CONNECTIONS,
+                    max_keepalive: int = HTTP_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry: float = HTTP_POOL_KEEPALIVE_EXPIRY,
+                    http2: bool = HTTP_CLIENT_HTTP2,
+                    timeout: Optional[float] = 60.0) -> httpx.AsyncClient:
+    """
+    Get the shared client for ``name``, creating it on first use.
+
+    Pool options only apply when the client is created; callers that need a
+    different timeout should pass it per request.
+
+    Args:
+        name: Pool name, e.g. "tts", "dashscope" or "model"
+        max_connections: Maximum number of open connections
+        max_keepalive: Maximum number of idle connections kept alive
+        keepalive_expiry: Seconds an idle connection is kept
+        http2: Negotiate HTTP/2 when ``h2`` is installed
+        timeout: Default request timeout in seconds
+
+    Returns:
+        Shared ``httpx.AsyncClient``
+    """
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+        http2 = http2 and http2_available()
+        transport = MeteredTransport(httpx.AsyncHTTPTransport(limits=limits, http2=http2), http2=http2)
+        client = httpx.AsyncClient(transport=transport, timeout=timeout)
+        _clients[name] = client
+    return client
+
+
+def get_sync_http_client(name: str,
+                         max_connections: int = HTTP_POOL_MAX_CONNECTIONS,
+                         max_keepalive: int = HTTP_POOL_MAX_KEEPALIVE,
+                         keepalive_expiry: float = HTTP_POOL_KEEPALIVE_EXPIRY,
+                         timeout: Optional[float] = 60.0) -> httpx.Client:
+    """
+    Get the shared thread-safe ``httpx.Client`` for ``name``, creating it on first use.
+
+    For blocking code that runs in executor threads (e.g. the video pipeline),
+    where the event-loop-bound async clients cannot be used.
+
+    Args:
+        name: Pool name, e.g. "vision"
+        max_connections: Maximum number of open connections
+        max_keepalive: Maximum number of idle connections kept alive
+        keepalive_expiry: Seconds an idle connection is kept
+        timeout: Default request timeout in seconds
+
+    Returns:
+        Shared ``httpx.Client``
+    """
+    with _sync_lock:
+        client = _sync_clients.get(name)
+        if client is None or client.is_closed:
+            limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry
+            )
+            client = httpx.Client(limits=limits, timeout=timeout)
+            _sync_clients[name] = client
+        return client
+
+
+async def close_http_clients():
+    """Close every shared client and forget it."""
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
+    with _sync_lock:
+        for client in _sync_clients.values():
+            client.close()
+        _sync_clients.clear()
+
+
+def http_client_stats() -> Dict[str, Any]:
+    """
+    Return per-pool, per-host metrics.
+
+    Returns:
+        Dict mapping pool name to its HTTP/2 flag, request counters and
+        current connection counts per host
+    """
+    stats = {}
+    for name, client in _clients.items():
+        transport = client._transport
+        if not isinstance(transport, MeteredTransport):
+            continue
+        hosts = {}
+        for host, counters in transport.hosts.items():
+            requests = counters['requests']
+            hosts[host] = {
+                **counters,
+                'total_seconds': round(counters['total_seconds'], 3),
+                'avg_seconds': round(counters['total_seconds'] / requests, 3) if requests else 0.0,
+                'reuse_rate': round(1 - counters['connections_opened'] / requests, 4) if requests else 0.0
+            }
+        stats[name] = {
+            'http2': transport.http2,
+            'closed': client.is_closed,
+            'hosts': hosts,
+            'connections': transport.pool_connections()
+        }
+    return stats
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Test the ffmpeg filtergraph render backend."""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from PIL import Image
+
+# moviepy 1.0.3的resize依赖Image.ANTIALIAS，Pillow 10起已移除
+if not hasattr(Image, "ANTIALIAS"):
+    Image.ANTIALIAS = Image.LANCZOS
+
+from core.ffmpeg_renderer import build_filtergraph, render_with_filtergraph
+from core.video_editor import create_video_from_images
+
+
+def test_filtergraph_crossfades_end_on_image_boundaries():
+    graph = build_filtergraph(3, 24, 3.0, 0.5, "zoom", 720, 1280, has_audio=True)
+    assert graph.count("zoompan=") == 3
+    assert "xfade=transition=fadeblack:duration=0.5:offset=2.500" in graph
+    assert "xfade=transition=fadeblack:duration=0.5:offset=5.500" in graph
+    assert "afade=t=out:st=8.500" in graph
+    assert graph.endswith("[a]")
+
+
+def test_filtergraph_without_transition_concatenates():
+    graph = build_filtergraph(2, 24, 2.0, 0.0, "pan", 720, 1280, has_audio=False)
+    assert "xfade" not in graph and "concat=n=2" in graph
+    assert "[1:a]" not in graph and "[2:a]" not in graph
+
+
+def test_render_and_moviepy_fallback():
+    """Supported effects render through the filtergraph; unknown ones fall back to moviepy."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        images = []
+        for i, color in enumerate([(200, 30, 30), (30, 30, 200)]):
+            path = os.path.join(temp_dir, f"{i}.jpg")
+            Image.new("RGB", (160, 288), color).save(path, "JPEG")
+            images.append(path)
+
+        progress = []
+        output = render_with_filtergraph(images, fps=10, duration_per_image=1.0, animation_type="pan",
+                                         target_width=160, target_height=288, threads=1,
+                                         progress_callback=progress.append)
+        assert os.path.getsize(output) > 0 and progress[-1] == 1.0
+        os.unlink(output)
+
+        output = create_video_from_images(images, fps=10, duration_per_image=1.0, animation_type="none",
+                                          target_width=160, target_height=288, threads=1,
+                                          progress_callback=lambda fraction: None, renderer="ffmpeg")
+        assert os.path.getsize(output) > 0
+        os.unlink(output)
+
+
+if __name__ == "__main__":
+    print("Testing ffmpeg filtergraph renderer...")
+    test_filtergraph_crossfades_end_on_image_boundaries()
+    print("✅ Crossfade offsets and audio fades")
+    test_filtergraph_without_transition_concatenates()
+    print("✅ Concatenation without transitions")
+    test_render_and_moviepy_fallback()
+    print("✅ Filtergraph render and moviepy fallback")
+    print("\n🎉 All ffmpeg renderer tests passed!")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Test the NumPy frame renderer used for slideshow videos."""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+from PIL import Image
+from core.frame_renderer import SlideRenderer, brightness, render_slideshow
+
+
+def make_image(directory: str, name: str, color, size=(200, 360)) -> str:
+    path = os.path.join(directory, name)
+    Image.new("RGB", size, color).save(path, "JPEG")
+    return path
+
+
+def test_brightness_matches_moviepy_fades():
+    """Video fades in from black, non-final images fade out, the last one does not."""
+    kwargs = dict(count=2, total=6.0, duration=3.0, transition_duration=0.5, animation_type="zoom")
+    assert brightness(0, t=0.0, global_t=0.0, **kwargs) == 0.0
+    assert brightness(0, t=0.25, global_t=0.25, **kwargs) == 0.5
+    assert brightness(0, t=1.5, global_t=1.5, **kwargs) == 1.0
+    assert brightness(0, t=2.75, global_t=2.75, **kwargs) == 0.5
+    assert brightness(1, t=2.9, global_t=5.9, **kwargs) == 1.0
+    # fade动画：每张图片自身也淡入淡出
+    assert brightness(1, t=0.1, global_t=3.1, **{**kwargs, "animation_type": "fade"}) < 0.5
+    # 单张图片：整体淡入淡出0.5秒
+    single = dict(count=1, total=3.0, duration=3.0, transition_duration=0.5, animation_type="pan")
+    assert brightness(0, t=2.9, global_t=2.9, **single) < 0.5
+
+
+def test_slide_frames_have_target_shape():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = make_image(temp_dir, "a.jpg", (10, 200, 30), size=(300, 200))
+        for animation_type in ("fade", "zoom", "pan"):
+            slide = SlideRenderer(path, animation_type, 3.0, 160, 288)
+            for t in (0.0, 1.5, 3.0):
+                frame = slide.frame(t)
+                assert frame.shape == (288, 160, 3)
+                assert frame.dtype == np.uint8
+
+
+def test_render_slideshow_writes_video_and_reports_progress():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        images = [make_image(temp_dir, "a.jpg", (200, 30, 30)), make_image(temp_dir, "b.jpg", (30, 30, 200))]
+        progress = []
+        output = render_slideshow(images, fps=10, duration_per_image=1.0, animation_type="zoom",
+                                  target_width=160, target_height=288, threads=1,
+                                  progress_callback=progress.append)
+        try:
+            assert os.path.getsize(output) > 0
+            assert len(progress) == 20 and progress[-1] == 1.0
+        finally:
+            os.unlink(output)
+
+
+def test_render_slideshow_cancellation_removes_output():
+    """Raising from the progress callback stops ffmpeg and deletes the partial file."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        images = [make_image(temp_dir, "a.jpg", (200, 30, 30))]
+
+        def cancel(fraction):
+            raise KeyboardInterrupt()
+
+        before = set(name for name in os.listdir(tempfile.gettempdir()) if name.endswith(".mp4"))
+        try:
+            render_slideshow(images, fps=10, duration_per_image=1.0, target_width=160, target_height=288,
+                             threads=1, progress_callback=cancel)
+        except KeyboardInterrupt:
+            pass
+        else:
+            raise AssertionError("render was not cancelled")
+        after = set(name for name in os.listdir(tempfile.gettempdir()) if name.endswith(".mp4"))
+        assert after <= before
+
+
+if __name__ == "__main__":
+    print("Testing frame renderer...")
+    test_brightness_matches_moviepy_fades()
+    print("✅ Fade curves match the moviepy path")
+    test_slide_frames_have_target_shape()
+    print("✅ Fade, zoom and pan frames have the target size")
+    test_render_slideshow_writes_video_and_reports_progress()
+    print("✅ Slideshow encoded through ffmpeg")
+    test_render_slideshow_cancellation_removes_output()
+    print("✅ Cancelled render cleaned up")
+    print("\n🎉 All frame renderer tests passed!")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Test HLS output of create_video_from_images."""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from PIL import Image
+from core.hls import SEGMENT_DURATION, MASTER_PLAYLIST, keyframe_interval
+from core.video_editor import create_video_from_images
+
+
+def make_images(directory: str):
+    paths = []
+    for i, color in enumerate([(200, 30, 30), (30, 30, 200), (30, 200, 30)]):
+        path = os.path.join(directory, f"{i}.jpg")
+        Image.new("RGB", (160, 288), color).save(path, "JPEG")
+        paths.append(path)
+    return paths
+
+
+def segment_durations(playlist: str):
+    with open(playlist) as f:
+        return [float(line.split(":", 1)[1].rstrip(",\n")) for line in f if line.startswith("#EXTINF:")]
+
+
+def test_keyframe_interval_matches_segments():
+    assert keyframe_interval(24) == 24 * SEGMENT_DURATION
+    assert keyframe_interval(15) == 15 * SEGMENT_DURATION
+
+
+def test_hls_output_with_low_rendition():
+    """The MP4 is kept, the master playlist lists both renditions and segments are cut on keyframes."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        hls_dir = os.path.join(temp_dir, "hls")
+        progress = []
+        output = create_video_from_images(
+            make_images(temp_dir), fps=10, duration_per_image=2.0, animation_type="zoom",
+            target_width=160, target_height=288, threads=1, progress_callback=progress.append,
+            hls_dir=hls_dir
+        )
+        try:
+            assert os.path.getsize(output) > 0
+            with open(os.path.join(hls_dir, MASTER_PLAYLIST)) as f:
+                master = f.read()
+            assert "high/index.m3u8" in master and "low/index.m3u8" in master
+            assert "RESOLUTION=160x288" in master and "RESOLUTION=80x144" in master
+
+            durations = segment_durations(os.path.join(hls_dir, "high", "index.m3u8"))
+            assert abs(sum(durations) - 6.0) < 0.2
+            assert max(durations) <= SEGMENT_DURATION + 0.01
+            assert any(name.startswith("init") for name in os.listdir(os.path.join(hls_dir, "low")))
+            assert progress[-1] == 1.0 and progress == sorted(progress)
+        finally:
+            os.unlink(output)
+
+
+def test_hls_single_rendition():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        hls_dir = os.path.join(temp_dir, "hls")
+        output = create_video_from_images(
+            make_images(temp_dir)[:1], fps=10, duration_per_image=3.0, target_width=160, target_height=288,
+            threads=1, renderer="ffmpeg", hls_dir=hls_dir, hls_low_rendition=False
+        )
+        os.unlink(output)
+        assert sorted(os.listdir(hls_dir)) == ["high", MASTER_PLAYLIST]
+
+
+if __name__ == "__main__":
+    print("Testing HLS output...")
+    test_keyframe_interval_matches_segments()
+    print("✅ Keyframes placed on segment boundaries")
+    test_hls_output_with_low_rendition()
+    print("✅ Two renditions with a master playlist")
+    test_hls_single_rendition()
+    print("✅ Single rendition without the low-bitrate variant")
+    print("\n🎉 All HLS tests passed!")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Test the content-hash cache for image descriptions."""
+
+import sys
+import os
+import tempfile
+from types import SimpleNamespace
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from PIL import Image
+import api.openai_client as openai_client
+from utils.cache import DiskCache
+
+
+class FakeVisionClient:
+    """Stands in for openai.OpenAI and counts completion calls."""
+
+    base_url = "https://example.invalid/v1/"
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=f" 第{self.calls}次描述 ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def run_with_cache(temp_dir: str, func):
+    cache = DiskCache(os.path.join(temp_dir, "descriptions.sqlite3"), max_bytes=1024 * 1024)
+    original = openai_client.get_image_description_cache
+    openai_client.get_image_description_cache = lambda: cache
+    try:
+        return func()
+    finally:
+        openai_client.get_image_description_cache = original
+
+
+def test_same_image_content_is_described_once():
+    """Identical photos under different file names reuse one description."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first, copy, other = (os.path.join(temp_dir, name) for name in ("a.jpg", "b.jpg", "c.jpg"))
+        Image.new("RGB", (2000, 1500), (30, 120, 200)).save(first, "JPEG")
+        with open(first, "rb") as src, open(copy, "wb") as dst:
+            dst.write(src.read())
+        Image.new("RGB", (2000, 1500), (200, 120, 30)).save(other, "JPEG")
+        client = FakeVisionClient()
+
+        def describe():
+            return [openai_client.describe_image(client, path) for path in (first, copy, other)]
+
+        descriptions = run_with_cache(temp_dir, describe)
+        assert descriptions[0] == descriptions[1] == "第1次描述"
+        assert descriptions[2] == "第2次描述"
+        assert client.calls == 2
+        # 缓存持久化：重新打开后全部命中
+        run_with_cache(temp_dir, describe)
+        assert client.calls == 2
+
+
+def test_key_depends_on_model_and_prompt():
+    image_bytes = b"jpeg"
+    base = openai_client.image_description_cache_key("u", "model-a", "prompt", image_bytes)
+    assert base == openai_client.image_description_cache_key("u", "model-a", "prompt", image_bytes)
+    assert base != openai_client.image_description_cache_key("u", "model-b", "prompt", image_bytes)
+    assert base != openai_client.image_description_cache_key("u", "model-a", "prompt 2", image_bytes)
+    assert base != openai_client.image_description_cache_key("u", "model-a", "prompt", b"other")
+
+
+if __name__ == "__main__":
+    print("Testing image description cache...")
+    test_same_image_content_is_described_once()
+    print("✅ Repeated images skip the model call")
+    test_key_depends_on_model_and_prompt()
+    print("✅ Cache key covers model and prompt")
+    print("\n🎉 All image description cache tests passed!")
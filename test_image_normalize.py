@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Test single-pass decoding of uploaded images into target-sized video frames."""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from PIL import Image
+from core.video_editor import normalize_image
+
+
+def make_split_image(path: str, size, orientation: int = 1, fmt: str = "JPEG", mode: str = "RGB"):
+    """Left half red, right half blue, optionally tagged with an EXIF orientation."""
+    img = Image.new(mode, size, (0, 0, 255, 255)[:len(mode)])
+    img.paste((255, 0, 0, 255)[:len(mode)], (0, 0, size[0] // 2, size[1]))
+    exif = Image.Exif()
+    if orientation != 1:
+        exif[0x0112] = orientation
+    if fmt == "JPEG":
+        img.save(path, fmt, exif=exif.tobytes())
+    else:
+        img.save(path, fmt)
+
+
+def dominant(pixel) -> str:
+    r, _, b = pixel
+    return "red" if r > b else "blue"
+
+
+def test_large_landscape_photo_is_cropped_to_portrait_frame():
+    """A 48MP-class landscape JPEG becomes an exact 720x1280 center crop."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "upload")
+        make_split_image(source, (8000, 6000))
+        output = normalize_image(source, os.path.join(temp_dir, "frame.jpg"))
+        with Image.open(output) as frame:
+            assert frame.size == (720, 1280)
+            assert frame.mode == "RGB"
+            # 居中裁剪：左边缘仍是红色，右边缘是蓝色
+            assert dominant(frame.getpixel((10, 640))) == "red"
+            assert dominant(frame.getpixel((710, 640))) == "blue"
+
+
+def test_exif_orientation_is_applied():
+    """A landscape-stored photo tagged 'rotate 90° CW' comes out upright."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "upload")
+        make_split_image(source, (1600, 900), orientation=6)
+        with Image.open(normalize_image(source, os.path.join(temp_dir, "frame.jpg"))) as frame:
+            assert frame.size == (720, 1280)
+            # 顺时针旋转后，原来的左半边在上方
+            assert dominant(frame.getpixel((360, 50))) == "red"
+            assert dominant(frame.getpixel((360, 1230))) == "blue"
+
+
+def test_png_with_alpha_and_palette_images():
+    """RGBA and palette PNGs are converted to RGB frames."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for mode in ("RGBA", "P"):
+            source = os.path.join(temp_dir, f"upload_{mode}")
+            if mode == "P":
+                make_split_image(source + ".rgb", (400, 300), fmt="PNG")
+                Image.open(source + ".rgb").convert("P").save(source, "PNG")
+            else:
+                make_split_image(source, (400, 300), fmt="PNG", mode=mode)
+            with Image.open(normalize_image(source, os.path.join(temp_dir, f"frame_{mode}.jpg"), 360, 640)) as frame:
+                assert frame.size == (360, 640)
+                assert frame.mode == "RGB"
+
+
+def test_invalid_upload_raises_value_error():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "upload")
+        with open(source, "wb") as f:
+            f.write(b"not an image")
+        try:
+            normalize_image(source, os.path.join(temp_dir, "frame.jpg"))
+        except ValueError as e:
+            assert "无法读取图片" in str(e)
+        else:
+            raise AssertionError("invalid image accepted")
+
+
+if __name__ == "__main__":
+    print("Testing image normalization...")
+    test_large_landscape_photo_is_cropped_to_portrait_frame()
+    print("✅ Large photo downscaled and cropped")
+    test_exif_orientation_is_applied()
+    print("✅ EXIF orientation applied")
+    test_png_with_alpha_and_palette_images()
+    print("✅ RGBA and palette images converted")
+    test_invalid_upload_raises_value_error()
+    print("✅ Invalid upload rejected")
+    print("\n🎉 All image normalization tests passed!")
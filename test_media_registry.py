@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Test the generated media registry."""
+
+import sys
+import os
+import time
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from media_registry import MediaRegistry
+from media_store import MediaStore, classify_static_file
+
+
+def write_file(directory: str, name: str, size: int) -> str:
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return path
+
+
+def test_expiry_and_usage():
+    """Expired files are deleted and the per-kind usage totals follow inserts and deletes."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        registry = MediaRegistry(os.path.join(temp_dir, "media.sqlite3"), {"video": 10 ** 6})
+        old = write_file(temp_dir, "old.mp4", 10)
+        new = write_file(temp_dir, "new.mp4", 20)
+        registry.register(old, "video", ttl=0)
+        registry.register(new, "video", ttl=60)
+        assert registry.usage("video") == {"bytes": 30, "files": 2}
+
+        assert registry.sweep() == {"expired": 1, "evicted": 0}
+        assert not os.path.exists(old) and os.path.exists(new)
+        assert registry.usage("video") == {"bytes": 20, "files": 1}
+    print("✅ 到期删除与占用统计正常")
+
+
+def test_quota_evicts_least_recently_used():
+    """Files over the quota are evicted oldest access first."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        registry = MediaRegistry(os.path.join(temp_dir, "media.sqlite3"), {"audio": 25})
+        paths = []
+        for name in ("a.mp3", "b.mp3", "c.mp3"):
+            paths.append(write_file(temp_dir, name, 10))
+            registry.register(paths[-1], "audio")
+            time.sleep(0.01)
+        registry.touch(paths[0])  # a is now more recently used than b
+
+        assert registry.sweep() == {"expired": 0, "evicted": 1}
+        assert [os.path.exists(path) for path in paths] == [True, False, True]
+    print("✅ 配额LRU淘汰正常")
+
+
+def test_legacy_files_adopted_and_swept():
+    """Pre-upgrade tour_audio_*.mp3 files are adopted already expired; stale audio cache .tmp files are removed."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        registry = MediaRegistry(os.path.join(temp_dir, "media.sqlite3"), {"audio": 10 ** 6})
+        store = MediaStore(os.path.join(temp_dir, "static"), registry)
+        os.makedirs(store.path_for(os.path.join("tts", "ab", "cd")))
+        legacy = write_file(store.root, "tour_audio_x.mp3", 10)
+        cached = write_file(store.path_for(os.path.join("tts", "ab", "cd")), "abcd.mp3", 10)
+        orphan = write_file(store.path_for(os.path.join("tts", "ab", "cd")), "tmpabc.tmp", 10)
+        os.utime(orphan, (time.time() - 7200, time.time() - 7200))
+
+        assert registry.adopt_directory(store.root, lambda path: classify_static_file(path, video_ttl=3600)) == 2
+        assert store.remove_orphans(3600) == 1
+        assert registry.sweep() == {"expired": 1, "evicted": 0}
+        assert not os.path.exists(legacy) and not os.path.exists(orphan)
+        assert os.path.exists(cached) and registry.usage("audio") == {"bytes": 10, "files": 1}
+    print("✅ 旧版音频与遗留临时文件清理正常")
+
+
+if __name__ == "__main__":
+    try:
+        test_expiry_and_usage()
+        test_quota_evicts_least_recently_used()
+        test_legacy_files_adopted_and_swept()
+        print("\n🎉 媒体登记测试通过!")
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        sys.exit(1)
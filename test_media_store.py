@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Test the generated media store."""
+
+import sys
+import os
+import time
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from media_registry import MediaRegistry
+from media_store import MediaStore, is_public_static_path
+
+
+def make_store(temp_dir: str) -> MediaStore:
+    registry = MediaRegistry(os.path.join(temp_dir, "media.sqlite3"), {"video": 10 ** 6})
+    return MediaStore(os.path.join(temp_dir, "static"), registry)
+
+
+def test_writer_commits_in_place():
+    """Files are written next to their final path and only resolvable after commit."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = make_store(temp_dir)
+        writer = store.writer("clips/a.mp4", "video", ttl=60)
+        assert os.path.dirname(writer.tmp_path) == os.path.dirname(writer.path)
+        assert writer.tmp_path.endswith(".mp4")  # ffmpeg按扩展名选择封装格式
+        with open(writer.tmp_path, "wb") as f:
+            f.write(b"video")
+        assert store.resolve(os.path.relpath(writer.tmp_path, store.root)) is None
+        assert store.resolve("clips/a.mp4") is None
+
+        writer.commit()
+        writer.abort()  # 提交后再放弃不影响正式文件
+        assert store.resolve("clips/a.mp4") == writer.path
+        assert store.registry.usage("video") == {"bytes": 5, "files": 1}
+        assert store.resolve("../media.sqlite3") is None
+    print("✅ 原地写入与原子发布正常")
+
+
+def test_dir_writer_publishes_directory():
+    """Multi-file output (HLS) is published and evicted as one entry; files inside it are resolvable."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = make_store(temp_dir)
+        writer = store.dir_writer("videos/key_hls", "video")
+        os.makedirs(os.path.join(writer.tmp_path, "high"))
+        with open(os.path.join(writer.tmp_path, "high", "segment_000.m4s"), "wb") as f:
+            f.write(b"segment")
+        assert store.resolve("videos/key_hls/high/segment_000.m4s") is None
+
+        writer.commit()
+        assert store.resolve("videos/key_hls/high/segment_000.m4s") is not None
+        assert store.registry.usage("video") == {"bytes": 7, "files": 1}
+
+        store.registry.quotas["video"] = 0
+        assert store.registry.sweep()["evicted"] == 1
+        assert not os.path.exists(writer.path)
+    print("✅ 目录整体发布与淘汰正常")
+
+
+def test_remove_orphans():
+    """Only temp files older than max_age are removed."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = make_store(temp_dir)
+        stale = store.writer("videos/old.mp4", "video")
+        fresh = store.writer("videos/new.mp4", "video")
+        stale_dir = store.dir_writer("videos/old_hls", "video")
+        past = time.time() - 7200
+        os.utime(stale.tmp_path, (past, past))
+        os.utime(stale_dir.tmp_path, (past, past))
+
+        assert store.remove_orphans(3600) == 2
+        assert not os.path.exists(stale.tmp_path) and os.path.exists(fresh.tmp_path)
+        assert not os.path.exists(stale_dir.tmp_path)
+    print("✅ 遗留临时文件清理正常")
+
+
+def test_public_static_paths():
+    """Only TTS audio is public under /static; generated videos and temp files are not."""
+    assert is_public_static_path(os.path.join("tts", "ab", "cd", "abcd.mp3"))
+    assert not is_public_static_path(os.path.join("tts", "ab", "cd", "tmpabc.tmp"))
+    assert not is_public_static_path(os.path.join("videos", "ab", "ab.mp4"))
+    assert not is_public_static_path(os.path.join("videos", "ab", "ab_hls", "master.m3u8"))
+    assert not is_public_static_path(os.path.join("videos", "..", "videos", "ab", "ab.mp4"))
+    assert not is_public_static_path("travel_video_1_preview.mp4")
+    assert not is_public_static_path("travel_video_1_preview.x1.part.mp4")
+    print("✅ static公开范围正确")
+
+
+if __name__ == "__main__":
+    try:
+        test_writer_commits_in_place()
+        test_dir_writer_publishes_directory()
+        test_remove_orphans()
+        test_public_static_paths()
+        print("\n🎉 媒体存储测试通过!")
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        sys.exit(1)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Test the POI spatial index against a brute-force haversine scan."""
+
+import sys
+import os
+import csv
+import random
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import numpy as np
+from data.poi_index import build_index, POIIndex
+
+
+def build_sample_index(temp_dir: str, count: int = 5000) -> POIIndex:
+    rng = random.Random(7)
+    source = os.path.join(temp_dir, "pois.csv")
+    with open(source, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "type", "lng", "lat", "address"])
+        for i in range(count):
+            writer.writerow([f"p{i}", f"景点{i}", rng.choice(["旅游景点", "餐饮", "医院"]),
+                             116.2 + rng.random() * 0.4, 39.7 + rng.random() * 0.4, f"北京市{i}号"])
+        writer.writerow(["bad", "坐标缺失", "旅游景点", "", "", ""])
+    build_index(source, os.path.join(temp_dir, "index"))
+    return POIIndex(os.path.join(temp_dir, "index"))
+
+
+def test_radius_query_matches_brute_force():
+    """Radius queries return exactly the POIs a full haversine scan finds, nearest first."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index = build_sample_index(temp_dir)
+        assert len(index) == 5000
+        lngs, lats = np.array(index.lng), np.array(index.lat)
+        rng = random.Random(3)
+        for _ in range(30):
+            lng, lat = 116.2 + rng.random() * 0.4, 39.7 + rng.random() * 0.4
+            radius = rng.choice([200, 1000, 3000])
+            result = index.query(lng, lat, radius, limit=10 ** 6)
+            expected = (POIIndex._haversine(lng, lat, lngs, lats) <= radius).sum()
+            assert len(result) == expected
+            distances = [poi["distance"] for poi in result]
+            assert distances == sorted(distances)
+    print("✅ 半径查询与暴力扫描一致")
+
+
+def test_type_filter_and_limit():
+    """Type filters and result limits are applied."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index = build_sample_index(temp_dir)
+        result = index.query(116.4, 39.9, 5000, types=["医院"], limit=5)
+        assert len(result) == 5
+        assert all(poi["type"] == "医院" for poi in result)
+        assert result[0]["name"].startswith("景点") and result[0]["address"].startswith("北京市")
+        assert index.query(116.4, 39.9, 5000, types=["不存在的类型"]) == []
+    print("✅ 类型过滤与数量限制正常")
+
+
+if __name__ == "__main__":
+    try:
+        test_radius_query_matches_brute_force()
+        test_type_filter_and_limit()
+        print("\n🎉 POI索引测试通过!")
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        sys.exit(1)
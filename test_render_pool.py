@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Test the render process pool."""
+
+import sys
+import os
+import time
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from PIL import Image
+import core.render_pool as render_pool
+from core.render_pool import RenderPool, plan_render_capacity
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def make_images(directory: str):
+    paths = []
+    for i, color in enumerate([(200, 40, 40), (40, 200, 40), (40, 40, 200)]):
+        paths.append(os.path.join(directory, f"{i}.jpg"))
+        Image.new("RGB", (320, 240), color).save(paths[-1], "JPEG")
+    return paths
+
+
+def test_plan_render_capacity():
+    """Workers never exceed the cores and threads split the cores between workers."""
+    assert plan_render_capacity(2, cpu_count=8) == (2, 4)
+    assert plan_render_capacity(4, cpu_count=2) == (2, 1)
+    assert plan_render_capacity(0, cpu_count=1) == (1, 1)
+    print("✅ 进程数与线程数规划正确")
+
+
+def test_workers_recycled_after_renders():
+    """Each worker process is replaced after recycle_after tasks."""
+    pool = RenderPool(workers=1, threads=1, recycle_after=2)
+    try:
+        executor, _ = pool._acquire()
+        pids = [executor.submit(os.getpid).result() for _ in range(3)]
+        assert pids[0] == pids[1] != pids[2]
+    finally:
+        pool.shutdown()
+    print("✅ 渲染进程按任务数替换")
+
+
+def test_reset_keeps_replacement_pool():
+    """Resetting a broken executor again does not shut down the pool that replaced it."""
+    pool = RenderPool(workers=1, threads=1)
+    try:
+        broken, _ = pool._acquire()
+        pool._reset(broken)
+        replacement, _ = pool._acquire()
+        assert replacement is not broken
+        pool._reset(broken)  # 另一个渲染稍后才发现旧进程池异常
+        assert pool._executor is replacement
+        assert replacement.submit(os.getpid).result() != os.getpid()
+    finally:
+        pool.shutdown()
+    print("✅ 重置只影响异常的进程池")
+
+
+def test_cancel_waits_for_worker():
+    """A cancelled render raises only after the worker stopped, so no output is left behind."""
+    pool = RenderPool(workers=1, threads=1)
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "out.mp4")
+            calls = []
+
+            def progress(fraction: float):
+                calls.append(fraction)
+                if fraction > 0:
+                    raise JobCancelled()
+
+            try:
+                pool.render(images=make_images(temp_dir), duration_per_image=20.0, fps=24,
+                            target_width=320, target_height=240, output_path=output_path,
+                            progress_callback=progress)
+            except JobCancelled:
+                pass
+            else:
+                raise AssertionError("渲染未被取消")
+
+            # 抛出异常时渲染进程已停止写入：输出文件已删除且之后不再出现
+            for _ in range(2):
+                assert sorted(os.listdir(temp_dir)) == ["0.jpg", "1.jpg", "2.jpg"]
+                time.sleep(1.0)
+    finally:
+        pool.shutdown()
+    print("✅ 取消渲染后等待进程停止")
+
+
+def test_hung_worker_is_terminated():
+    """A worker that ignores cancellation is terminated after RENDER_STOP_TIMEOUT."""
+    pool = RenderPool(workers=1, threads=1)
+    original = render_pool.RENDER_STOP_TIMEOUT
+    render_pool.RENDER_STOP_TIMEOUT = 0.5
+    try:
+        executor, manager = pool._acquire()
+        future = executor.submit(time.sleep, 60)
+        while not future.running():
+            time.sleep(0.05)
+        time.sleep(1.0)  # 等待进程开始执行
+        workers = list(executor._processes.values())
+
+        started = time.monotonic()
+        pool._stop(executor, future, manager.Event())
+        assert time.monotonic() - started < 10
+        assert pool._executor is None
+        assert workers and not any(process.is_alive() for process in workers)
+    finally:
+        render_pool.RENDER_STOP_TIMEOUT = original
+        pool.shutdown()
+    print("✅ 无响应的渲染进程被结束")
+
+
+if __name__ == "__main__":
+    try:
+        test_plan_render_capacity()
+        test_workers_recycled_after_renders()
+        test_reset_keeps_replacement_pool()
+        test_cancel_waits_for_worker()
+        test_hung_worker_is_terminated()
+        print("\n🎉 渲染进程池测试通过!")
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        sys.exit(1)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Test the disk-backed response cache."""
+
+import sys
+import os
+import sqlite3
+import time
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from utils.cache import DiskCache, make_cache_key
+from utils.helpers import format_interests
+
+
+def test_canonical_keys():
+    """Equal inputs map to one key, regardless of dict or selection order."""
+    assert make_cache_key({'a': 1, 'b': 2}) == make_cache_key({'b': 2, 'a': 1})
+    assert make_cache_key({'a': 1}) != make_cache_key({'a': 2})
+    assert format_interests(["温泉养生", "茶文化", "温泉养生"]) == format_interests(["茶文化", "温泉养生"])
+    print("✅ 缓存键规范化正常")
+
+
+def test_ttl_and_persistence():
+    """Entries expire after their TTL and survive reopening the database."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "cache.sqlite3")
+        cache = DiskCache(path, default_ttl=60)
+        cache.set("fresh", "推荐内容")
+        cache.set("stale", "过期内容", ttl=0.05)
+        time.sleep(0.1)
+
+        reopened = DiskCache(path)
+        assert reopened.get("fresh") == "推荐内容"
+        assert reopened.get("stale") is None
+        assert reopened.stats()['hits'] == 1
+        assert reopened.stats()['misses'] == 1
+    print("✅ TTL与持久化正常")
+
+
+def test_lru_eviction():
+    """The least recently used entries are evicted once over the size budget."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = DiskCache(os.path.join(temp_dir, "cache.sqlite3"), max_bytes=30)
+        cache.set("a", "x" * 10)
+        time.sleep(0.01)
+        cache.set("b", "x" * 10)
+        time.sleep(0.01)
+        cache.get("a")  # a is now more recently used than b
+        time.sleep(0.01)
+        cache.set("c", "x" * 15)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        assert cache.stats()['bytes'] <= 30
+    print("✅ LRU淘汰正常")
+
+
+def test_delete_tag():
+    """Entries are deleted by tag through its index; untagged entries from older databases can be tagged."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "cache.sqlite3")
+        # 没有tag列的旧数据库
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                     "created_at REAL NOT NULL, accessed_at REAL NOT NULL, expires_at REAL)")
+        conn.execute("INSERT INTO entries VALUES ('v1:故宫', '讲解词', 9, 0, 0, NULL)")
+        conn.commit()
+        conn.close()
+
+        cache = DiskCache(path)
+        assert cache.tag_untagged(lambda key: key.split(":", 1)[1]) == 1
+        cache.set("v2:故宫", "讲解词", tag="故宫")
+        cache.set("v2:颐和园", "讲解词", tag="颐和园")
+
+        plan = cache._conn.execute("EXPLAIN QUERY PLAN DELETE FROM entries WHERE tag = ?", ("故宫",)).fetchall()
+        assert "idx_entries_tag" in str(plan)
+        assert cache.delete_tag("故宫") == 2
+        assert [entry['key'] for entry in cache.entries(limit=10)] == ["v2:颐和园"]
+        assert cache.clear() == 1
+    print("✅ 按标签删除正常")
+
+
+if __name__ == "__main__":
+    try:
+        test_canonical_keys()
+        test_ttl_and_persistence()
+        test_lru_eviction()
+        test_delete_tag()
+        print("\n🎉 响应缓存测试通过!")
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        sys.exit(1)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Test the TTS text segmenter."""
+
+import sys
+import os
+import random
+import asyncio
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+import aliyun_tts
+from aliyun_tts import AliyunTTSClient, split_text_for_tts
+
+
+def test_packs_sentences_up_to_limit():
+    """Sentences are packed greedily and every segment stays within the limit."""
+    sentence = "今天我们参观故宫博物院，" + "讲解" * 20 + "。"
+    text = sentence * 30
+    segments = split_text_for_tts(text, 300)
+    assert "".join(segments) == text
+    assert all(len(segment) <= 300 for segment in segments)
+    assert all(segment.endswith("。") for segment in segments)
+    # 贪心打包：除最后一段外，再加一句就会超长
+    assert all(len(segment) + len(sentence) > 300 for segment in segments[:-1])
+    print("✅ 句子贪心打包正常")
+
+
+def test_keeps_numbers_and_markdown_intact():
+    """Forced cuts never land inside a number or a Markdown token."""
+    tokens = ["门票120.50元", "**颐和园**", "`08:30`", "[地图](https://example.com/a.b)", "海拔1,234.5米", "，"]
+    rng = random.Random(42)
+    for _ in range(200):
+        text = "".join(rng.choice(tokens + ["步行"] * 4) for _ in range(rng.randint(50, 300)))
+        segments = split_text_for_tts(text, 40)
+        assert "".join(segments) == text
+        assert all(len(segment) <= 40 for segment in segments)
+        position = 0
+        for segment in segments[:-1]:
+            position += len(segment)
+            assert segment.count("**") % 2 == 0
+            assert segment.count("`") % 2 == 0
+            assert not (text[position - 1].isdigit() and text[position].isdigit())
+    print("✅ 数字与Markdown标记未被拆开")
+
+
+def test_western_punctuation():
+    """Western sentence punctuation splits, but decimal points do not."""
+    text = "Version 3.5 is out. " * 40
+    segments = split_text_for_tts(text, 100)
+    assert "".join(segments) == text
+    assert all(segment.endswith(". ") for segment in segments)
+    print("✅ 英文标点分句正常")
+
+
+def test_single_segment_requests_share_appkey_limit():
+    """Concurrent single-segment requests never exceed the per-AppKey concurrency limit."""
+    client = AliyunTTSClient("test-appkey-single", "id", "secret")
+    in_flight, peak = 0, 0
+
+    async def get_token():
+        return "token"
+
+    async def synthesize_single(text, token, *args):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return text.encode("utf-8")
+
+    client.get_token = get_token
+    client._synthesize_single = synthesize_single
+
+    async def run():
+        return await asyncio.gather(*(client.text_to_speech(f"第{i}句。") for i in range(20)))
+
+    results = asyncio.run(run())
+    assert results == [f"第{i}句。".encode("utf-8") for i in range(20)]
+    assert peak == aliyun_tts.TTS_MAX_CONCURRENCY
+    print("✅ 单段合成同样受AppKey并发限制")
+
+
+if __name__ == "__main__":
+    try:
+        test_packs_sentences_up_to_limit()
+        test_keeps_numbers_and_markdown_intact()
+        test_western_punctuation()
+        test_single_segment_requests_share_appkey_limit()
+        print("\n🎉 TTS分段测试通过!")
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        sys.exit(1)
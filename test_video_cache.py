@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Test the generated video cache."""
+
+import sys
+import os
+import threading
+import time
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from media_registry import MediaRegistry
+from media_store import MediaStore
+from video_cache import VideoCache
+
+
+def write_file(directory: str, name: str, data: bytes) -> str:
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def make_cache(temp_dir: str, quota: int = 10 ** 6) -> VideoCache:
+    registry = MediaRegistry(os.path.join(temp_dir, "media.sqlite3"), {VideoCache.KIND: quota})
+    store = MediaStore(os.path.join(temp_dir, "static"), registry)
+    return VideoCache(store, "videos", "/api/media/videos")
+
+
+def test_key_depends_on_content_and_params():
+    """Keys follow image and audio content, render params and renderer version, not file names."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        a = write_file(temp_dir, "a.jpg", b"image-a")
+        a_copy = write_file(temp_dir, "copy.jpg", b"image-a")
+        b = write_file(temp_dir, "b.jpg", b"image-b")
+        audio = write_file(temp_dir, "music.mp3", b"audio")
+        params = {"profile": "standard", "renderer": "numpy"}
+
+        key = VideoCache.key_for([a, b], audio, params, "1")
+        assert key == VideoCache.key_for([a_copy, b], audio, params, "1")
+        assert key != VideoCache.key_for([b, a], audio, params, "1")
+        assert key != VideoCache.key_for([a, b], None, params, "1")
+        assert key != VideoCache.key_for([a, b], audio, {**params, "profile": "high"}, "1")
+        assert key != VideoCache.key_for([a, b], audio, params, "2")
+    print("✅ 缓存键随内容与参数变化")
+
+
+def test_store_and_lookup():
+    """Videos rendered into a cache writer are published with their script; partial entries are dropped."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = make_cache(temp_dir)
+        assert cache.lookup("ab" * 32) is None
+
+        writer = cache.writer("ab" * 32)
+        with open(writer.tmp_path, "wb") as f:
+            f.write(b"video")
+        assert cache.lookup("ab" * 32) is None
+        stored = cache.commit("ab" * 32, writer, {"script": "脚本", "image_descriptions": ["描述"]})
+        assert not os.path.exists(writer.tmp_path)
+        assert stored["video_path"] == f"/api/media/videos/ab/{'ab' * 32}.mp4"
+        assert cache.lookup("ab" * 32) == stored
+        assert cache.registry.usage(VideoCache.KIND)["files"] == 2
+
+        os.unlink(cache.path_for("ab" * 32))
+        assert cache.lookup("ab" * 32) is None
+        assert not os.path.exists(cache.path_for("ab" * 32, ".json"))
+        assert cache.registry.usage(VideoCache.KIND) == {"bytes": 0, "files": 0}
+    print("✅ 视频存入与命中正常")
+
+
+def test_lock_serializes_same_key():
+    """A second job with the same key waits for the first, calling on_wait while it waits."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = make_cache(temp_dir)
+        order, waits = [], []
+
+        def first():
+            with cache.lock("k"):
+                order.append("first-start")
+                time.sleep(1.5)
+                order.append("first-end")
+
+        thread = threading.Thread(target=first)
+        thread.start()
+        time.sleep(0.1)
+        with cache.lock("k", on_wait=lambda: waits.append(1)):
+            order.append("second")
+        thread.join()
+
+        assert order == ["first-start", "first-end", "second"]
+        assert waits and cache._locks == {}
+    print("✅ 相同提交依次执行")
+
+
+if __name__ == "__main__":
+    try:
+        test_key_depends_on_content_and_params()
+        test_store_and_lookup()
+        test_lock_serializes_same_key()
+        print("\n🎉 视频缓存测试通过!")
+    except Exception as e:
+        print(f"\n❌ 测试失败: {e}")
+        sys.exit(1)
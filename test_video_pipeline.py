@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Test render profiles and the preview-then-final flow of create_ai_video."""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+import core.video_editor as video_editor
+from core.video_editor import create_ai_video, RENDER_PROFILES
+
+
+def run_pipeline(profile: str, with_preview: bool):
+    """Run create_ai_video with stubbed model calls and a recording render function."""
+    renders, stages, previews = [], [], []
+
+    def fake_render(**kwargs):
+        renders.append(kwargs)
+        kwargs["progress_callback"](1.0)
+        return f"/tmp/render_{len(renders)}.mp4"
+
+    client = video_editor.OpenAIClient
+    originals = (client._initialize_client, client.analyze_images, client.generate_video_script)
+    # 不创建真实客户端，测试结果与MODEL_API_KEY和导入顺序无关
+    client._initialize_client = lambda self: None
+    client.analyze_images = lambda self, images: ["描述"] * len(images)
+    client.generate_video_script = lambda self, descriptions, audio=None: "每张图片3秒，60fps，缩放效果"
+    try:
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as image:
+            result = create_ai_video(
+                [image.name], profile=profile, render=fake_render,
+                progress_callback=lambda stage, progress: stages.append((stage, round(progress, 2))),
+                preview_callback=previews.append if with_preview else None
+            )
+    finally:
+        client._initialize_client, client.analyze_images, client.generate_video_script = originals
+    return result, renders, stages, previews
+
+
+def test_preview_is_rendered_first_with_draft_profile():
+    result, renders, stages, previews = run_pipeline("standard", with_preview=True)
+    draft, standard = RENDER_PROFILES["draft"], RENDER_PROFILES["standard"]
+
+    assert len(renders) == 2
+    assert (renders[0]["target_width"], renders[0]["target_height"]) == (draft["width"], draft["height"])
+    assert renders[0]["preset"] == "ultrafast" and renders[0]["fps"] == draft["max_fps"]
+    assert (renders[1]["target_width"], renders[1]["target_height"]) == (standard["width"], standard["height"])
+    assert renders[1]["preset"] == standard["preset"] and renders[1]["crf"] == standard["crf"]
+    assert renders[1]["fps"] == standard["max_fps"]  # 脚本要求60fps，按档位上限
+    assert renders[1]["animation_type"] == "zoom"
+
+    assert previews == ["/tmp/render_1.mp4"]
+    assert result["video_path"] == "/tmp/render_2.mp4"
+    assert ("previewing", 0.5) in stages and ("rendering", 1.0) in stages
+
+
+def test_no_separate_preview_for_draft_or_without_callback():
+    for profile, with_preview in (("draft", True), ("high", False)):
+        _, renders, stages, previews = run_pipeline(profile, with_preview)
+        assert len(renders) == 1 and previews == []
+        assert renders[0]["target_width"] == RENDER_PROFILES[profile]["width"]
+        assert not any(stage == "previewing" for stage, _ in stages)
+
+
+if __name__ == "__main__":
+    print("Testing video pipeline profiles...")
+    test_preview_is_rendered_first_with_draft_profile()
+    print("✅ Draft preview rendered before the final video")
+    test_no_separate_preview_for_draft_or_without_callback()
+    print("✅ Single render for draft profile or without preview callback")
+    print("\n🎉 All video pipeline tests passed!")